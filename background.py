@@ -0,0 +1,165 @@
+"""
+Background jobs for the Tk visualizers
+--------------------------------------
+Parsing results files and windowing energy data can take seconds, which
+froze the window when it ran inside Tk callbacks.  A BackgroundWorker runs
+such work on a daemon thread and hands the results back to the Tk main loop,
+which polls for them with ``root.after``.  Tk widgets and variables must only
+be touched from the main thread, so jobs use ``job.post`` (or
+``post_to_main_thread``) for anything that updates the UI.
+
+Submitting a job cancels the earlier jobs of the same worker: their results
+and posted callbacks are dropped, and the job itself stops at its next
+``job.check()``.
+"""
+
+import queue
+import threading
+import traceback
+
+DEFAULT_POLL_INTERVAL_MS = 30
+
+# Job running on the current worker thread (see post_to_main_thread)
+_running = threading.local()
+
+
+class JobCancelled(Exception):
+    """Raised by Job.check() when a newer request has made the job obsolete"""
+
+
+class Job:
+    """Handle of a submitted job, passed to the job function"""
+
+    def __init__(self, worker):
+        self._worker = worker
+        self._cancelled = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def check(self):
+        """Stop the job (raise JobCancelled) if it has been cancelled"""
+        if self._cancelled.is_set():
+            raise JobCancelled()
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the Tk main thread, unless the job is cancelled by then"""
+        self._worker._results.put((self, callback, args, False))
+
+
+def post_to_main_thread(callback, *args):
+    """Queue callback(*args) for the Tk main thread when called from a background job.
+
+    Returns:
+        True if the call was queued, False if the caller is not running in a
+        background job (and may call Tk directly)
+    """
+    job = getattr(_running, "job", None)
+    if job is None:
+        return False
+    job.post(callback, *args)
+    return True
+
+
+class BackgroundWorker:
+    """Runs jobs one at a time on a daemon thread; callbacks run on the Tk main thread.
+
+    Args:
+        root: Tk root window used to poll for results
+        name: Name of the worker thread
+        poll_interval_ms: Delay between polls while jobs are outstanding
+    """
+
+    def __init__(self, root, name="background-worker", poll_interval_ms=DEFAULT_POLL_INTERVAL_MS):
+        self.root = root
+        self.name = name
+        self.poll_interval_ms = poll_interval_ms
+        self._jobs = queue.Queue()
+        self._results = queue.Queue()
+        self._thread = None
+        self._current = None
+        self._outstanding = 0
+        self._poll_scheduled = False
+
+    @property
+    def busy(self):
+        """Whether submitted jobs have not been delivered yet"""
+        return self._outstanding > 0
+
+    def submit(self, work, on_done=None, on_error=None):
+        """Run work(job) on the worker thread, cancelling the previously submitted job.
+
+        Args:
+            work: Callable taking the Job; its return value is passed to on_done
+            on_done: Called on the main thread with the result (if not cancelled)
+            on_error: Called on the main thread with the exception raised by work
+
+        Returns:
+            The submitted Job
+        """
+        self.cancel()
+        job = Job(self)
+        self._current = job
+        self._outstanding += 1
+        self._jobs.put((job, work, on_done, on_error))
+
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._schedule_poll()
+        return job
+
+    def cancel(self):
+        """Cancel the most recently submitted job"""
+        if self._current is not None:
+            self._current.cancel()
+            self._current = None
+
+    def _run(self):
+        while True:
+            job, work, on_done, on_error = self._jobs.get()
+            if job.cancelled:
+                self._results.put((job, None, (), True))
+                continue
+
+            _running.job = job
+            try:
+                result = work(job)
+                self._results.put((job, on_done, (result,), True))
+            except JobCancelled:
+                self._results.put((job, None, (), True))
+            except Exception as e:
+                if on_error is None:
+                    traceback.print_exc()
+                self._results.put((job, on_error, (e,), True))
+            finally:
+                _running.job = None
+
+    def _schedule_poll(self):
+        if not self._poll_scheduled:
+            self._poll_scheduled = True
+            self.root.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self):
+        """Deliver finished jobs and posted callbacks on the main thread"""
+        self._poll_scheduled = False
+        while True:
+            try:
+                job, callback, args, final = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if final:
+                self._outstanding -= 1
+            if job.cancelled or callback is None:
+                continue  # Stale result of a superseded request
+            try:
+                callback(*args)
+            except Exception:
+                traceback.print_exc()
+
+        if self._outstanding > 0:
+            self._schedule_poll()
@@ -0,0 +1,152 @@
+"""
+Dataset catalog
+---------------
+Experiment and run boundaries were re-derived from ``benchmark_results`` on
+every call: the chronology asked for the boundaries of every experiment, the
+"All Experiments" range did the same again, and every plot of a run walked
+the run dicts once more.  A DatasetCatalog is built in one pass over a loaded
+results file and holds everything these queries need:
+
+    run_bounds           experiment id -> [(run number, start ms, end ms)]
+    experiment_bounds    experiment id -> (start ms, end ms), from the runs
+                         (either may be None when the runs lack timestamps)
+    chronology           [(experiment id, start ms, end ms)] by start time
+    pauses               [(position, previous id, previous end ms, next id,
+                         next start ms)] between consecutive experiments
+    energy_extents_ms    energy section -> (first ms, last ms)
+    record_counts        section or "experiments"/"runs" -> number of records
+    distinct_targets     energy section -> container ids seen in the capture
+
+The catalog is a snapshot: build a new one whenever the results or the energy
+data change.
+"""
+
+from energy_store import NS_PER_MS
+
+
+def run_time_bounds(run):
+    """Start and end of one run in milliseconds (either may be None)"""
+    start_time_ms = run.get("start_timestamp")
+
+    # Get end time (either directly or calculated from start + elapsed)
+    end_time_ms = run.get("end_timestamp")
+    if end_time_ms is None and "start_timestamp" in run and "elapsed_time_ms" in run:
+        end_time_ms = run["start_timestamp"] + run["elapsed_time_ms"]
+    elif end_time_ms is None and "timestamp" in run:
+        # If only timestamp exists (likely the end time), try to estimate start
+        end_time_ms = run["timestamp"]
+        if "elapsed_time_ms" in run:
+            start_time_ms = end_time_ms - run["elapsed_time_ms"]
+    return start_time_ms, end_time_ms
+
+
+def experiment_time_bounds(runs):
+    """Start of the first run and end of the last run in milliseconds (either may be None)"""
+    first_run, last_run = runs[0], runs[-1]
+    start_time_ms = first_run.get("start_timestamp")
+    end_time_ms = last_run.get("end_timestamp")
+
+    # If end_timestamp is not available, try to calculate it from start_timestamp + elapsed_time_ms
+    if end_time_ms is None and "start_timestamp" in last_run and "elapsed_time_ms" in last_run:
+        end_time_ms = last_run["start_timestamp"] + last_run["elapsed_time_ms"]
+
+    # If we still don't have valid timestamps, fall back to timestamp field
+    if start_time_ms is None and "timestamp" in first_run:
+        # If timestamp exists, assume it's the end time and try to calculate start time
+        if "elapsed_time_ms" in first_run:
+            start_time_ms = first_run["timestamp"] - first_run["elapsed_time_ms"]
+        else:
+            start_time_ms = first_run["timestamp"]
+
+    if end_time_ms is None and "timestamp" in last_run:
+        end_time_ms = last_run["timestamp"]
+    return start_time_ms, end_time_ms
+
+
+class DatasetCatalog:
+    """Boundaries, chronology and counts of one loaded results file.
+
+    Args:
+        data: The results loaded so far (dictionary with ``benchmark_results``), or None
+        energy_stores: Dictionary of EnergyStore per energy section
+    """
+
+    def __init__(self, data, energy_stores):
+        experiments = {}
+        if data and "benchmark_results" in data and "experiments" in data["benchmark_results"]:
+            experiments = data["benchmark_results"]["experiments"] or {}
+
+        self.experiment_ids = list(experiments)
+        self.run_bounds = {}
+        self.experiment_bounds = {}
+        self.record_counts = {"experiments": len(experiments), "runs": 0}
+        for experiment_id, experiment in experiments.items():
+            runs = (experiment or {}).get("runs") or []
+            self.record_counts["runs"] += len(runs)
+
+            run_bounds = []
+            for i, run in enumerate(runs):
+                start_time_ms, end_time_ms = run_time_bounds(run)
+                # Only include if we have both start and end times
+                if start_time_ms is not None and end_time_ms is not None:
+                    run_bounds.append((i + 1, start_time_ms, end_time_ms))
+            self.run_bounds[experiment_id] = run_bounds
+            if runs:
+                self.experiment_bounds[experiment_id] = experiment_time_bounds(runs)
+
+        self.energy_extents_ms = {}
+        self.distinct_targets = {}
+        for section, store in energy_stores.items():
+            self.record_counts[section] = len(store)
+            self.distinct_targets[section] = list(store.container_ids)
+            extent = store.time_extent_ns()
+            if extent is not None:
+                self.energy_extents_ms[section] = (extent[0] / NS_PER_MS, extent[1] / NS_PER_MS)
+        if self.energy_extents_ms:
+            extents = self.energy_extents_ms.values()
+            self.energy_extent_ms = (min(extent[0] for extent in extents), max(extent[1] for extent in extents))
+        else:
+            self.energy_extent_ms = None
+
+        # Experiments without explicit boundaries span the whole energy capture
+        self.chronology = []
+        for experiment_id in self.experiment_ids:
+            start_time_ms, end_time_ms = self.resolved_bounds(experiment_id)
+            if start_time_ms is not None and end_time_ms is not None:
+                self.chronology.append((experiment_id, start_time_ms, end_time_ms))
+        self.chronology.sort(key=lambda x: x[1])
+
+        self.pauses = [
+            (i, previous_id, previous_end, next_id, next_start)
+            for i, ((previous_id, _, previous_end), (next_id, next_start, _))
+            in enumerate(zip(self.chronology, self.chronology[1:]))
+            if next_start > previous_end
+        ]
+
+        starts = [self.resolved_bounds(experiment_id)[0] for experiment_id in self.experiment_ids]
+        ends = [self.resolved_bounds(experiment_id)[1] for experiment_id in self.experiment_ids]
+        starts = [start for start in starts if start is not None]
+        ends = [end for end in ends if end is not None]
+        if starts and ends:
+            self.all_bounds = (min(starts), max(ends))
+        else:
+            # Fallback to energy data if no experiment timestamps are available
+            self.all_bounds = self.energy_extent_ms or (None, None)
+
+    def has_explicit_bounds(self, experiment_id):
+        """Return True if both boundaries of the experiment come from its runs"""
+        start_time_ms, end_time_ms = self.experiment_bounds.get(experiment_id, (None, None))
+        return start_time_ms is not None and end_time_ms is not None
+
+    def resolved_bounds(self, experiment_id):
+        """Boundaries of an experiment, falling back to the energy data range when its runs lack timestamps.
+
+        Returns:
+            (start_time_ms, end_time_ms), or (None, None) for unknown experiments
+            and experiments without runs
+        """
+        if experiment_id not in self.experiment_bounds:
+            return None, None
+        if self.has_explicit_bounds(experiment_id):
+            return self.experiment_bounds[experiment_id]
+        return self.energy_extent_ms or (None, None)
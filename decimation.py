@@ -0,0 +1,71 @@
+"""
+Pixel-aware decimation
+----------------------
+A plot is only a few hundred pixels wide, but the Line and Scatter modes can
+hand hundreds of thousands of points to Matplotlib (fine windows over long
+runs, or every single request in the Latency view).  Before drawing, each
+series is cut into about one bucket per horizontal pixel and only the
+minimum and maximum of every bucket are kept (plus the first and last
+point), so the drawn envelope and every peak look the same while the
+number of vertices is bounded by the plot width.
+"""
+
+import numpy as np
+
+# Points kept per horizontal pixel (the minimum and maximum of its bucket)
+DEFAULT_POINTS_PER_PIXEL = 2
+
+
+def minmax_indices(values, n_buckets):
+    """Indices of the points to keep so that every bucket keeps its minimum and maximum.
+
+    The series is split into at most n_buckets consecutive buckets of equal
+    point count.
+
+    Args:
+        values: 1-D array of y values in plotting order
+        n_buckets: Number of buckets (about the plot width in pixels)
+
+    Returns:
+        Sorted int64 array of indices into values (all indices if the series
+        is already small enough)
+    """
+    n = len(values)
+    if n_buckets <= 0 or n <= 2 * n_buckets:
+        return np.arange(n, dtype=np.int64)
+
+    values = np.asarray(values, dtype=np.float64)
+    bucket_size = -(-n // n_buckets)
+    n_full = n // bucket_size
+    buckets = values[:n_full * bucket_size].reshape(n_full, bucket_size)
+    offsets = np.arange(n_full, dtype=np.int64) * bucket_size
+
+    parts = [offsets + np.argmin(buckets, axis=1), offsets + np.argmax(buckets, axis=1), [0, n - 1]]
+    tail_start = n_full * bucket_size
+    if tail_start < n:
+        tail = values[tail_start:]
+        parts.append([tail_start + np.argmin(tail), tail_start + np.argmax(tail)])
+    return np.unique(np.concatenate(parts).astype(np.int64))
+
+
+def decimate(x, y, n_buckets):
+    """Reduce a series to the minimum and maximum of each bucket.
+
+    Args:
+        x: x values (array, list or pandas Series)
+        y: y values of the same length
+        n_buckets: Number of buckets (about the plot width in pixels)
+
+    Returns:
+        Tuple of (x, y) with the kept points, the inputs themselves if nothing was dropped
+    """
+    indices = minmax_indices(y, n_buckets)
+    if len(indices) == len(y):
+        return x, y
+    return _take(x, indices), _take(y, indices)
+
+
+def _take(values, indices):
+    if hasattr(values, "iloc"):
+        return values.iloc[indices]
+    return np.asarray(values)[indices]
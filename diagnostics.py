@@ -0,0 +1,141 @@
+"""
+Energy processing diagnostics
+-----------------------------
+Optional bookkeeping for the energy processing of the containers visualizer.
+It is off by default.  When enabled it keeps counters per target type
+(consumers processed/skipped, intervals without the target, windows created).
+When a capture directory is set, it also writes a small sample of the
+consumer records per call as JSON.  The files are written by a background
+thread, so redraws never wait on disk I/O; files that cannot be written are
+counted in the summary.
+
+Environment variables give the initial settings:
+
+    ENERGY_DIAGNOSTICS=1              enable the counters
+    ENERGY_DIAGNOSTICS_DIR=<path>     also capture sampled records to <path>
+"""
+
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+DEFAULT_SAMPLE_SIZE = 100
+
+# Counters kept per target type, in display order
+COUNTER_NAMES = ("calls", "processed_count", "skipped_count", "missing_consumption",
+                 "intervals_without_target", "total_windows_created")
+
+
+class EnergyDiagnostics:
+    """Counters and sampled record capture for energy processing.
+
+    Args:
+        enabled: Whether counters are collected at all
+        capture_dir: Directory for sampled record files (None = counters only)
+        sample_size: Maximum number of consumer records captured per call
+    """
+
+    def __init__(self, enabled=False, capture_dir=None, sample_size=DEFAULT_SAMPLE_SIZE):
+        self.enabled = enabled
+        self.capture_dir = capture_dir
+        self.sample_size = sample_size
+        self.counters = {}
+        # Sample files that could not be written, and the last error as "path: error"
+        self.write_errors = 0
+        self.last_write_error = None
+        self._lock = threading.Lock()
+        self._queue = None
+        self._writer = None
+
+    @classmethod
+    def from_environment(cls):
+        """Create diagnostics configured from ENERGY_DIAGNOSTICS / ENERGY_DIAGNOSTICS_DIR"""
+        capture_dir = os.environ.get("ENERGY_DIAGNOSTICS_DIR") or None
+        enabled = os.environ.get("ENERGY_DIAGNOSTICS", "").lower() in ("1", "true", "yes") or capture_dir is not None
+        return cls(enabled=enabled, capture_dir=capture_dir)
+
+    @property
+    def wants_samples(self):
+        """Whether callers should collect sampled records for record()"""
+        return self.enabled and self.capture_dir is not None and self.sample_size > 0
+
+    def record(self, target_type, counts, samples=None, details=None):
+        """Add the counts of one processing call and queue its sampled records.
+
+        Args:
+            target_type: Target the call processed (e.g. "api", "db")
+            counts: Dictionary of COUNTER_NAMES values for this call
+            samples: Optional list of sampled record dictionaries
+            details: Optional extra fields stored with the samples (e.g. window size)
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            target_counters = self.counters.setdefault(target_type, dict.fromkeys(COUNTER_NAMES, 0))
+            target_counters["calls"] += 1
+            for name, value in counts.items():
+                target_counters[name] = target_counters.get(name, 0) + value
+
+        if samples is not None and self.wants_samples:
+            timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+            document = dict(details or {}, target_type=target_type, summary=counts, sampled_records=samples)
+            path = os.path.join(self.capture_dir, f"energy_processing_debug_{target_type}_{timestamp_str}.json")
+            self._enqueue(path, document)
+
+    def _enqueue(self, path, document):
+        if self._writer is None or not self._writer.is_alive():
+            self._queue = queue.Queue()
+            self._writer = threading.Thread(target=self._write_loop, args=(self._queue,),
+                                            name="energy-diagnostics-writer", daemon=True)
+            self._writer.start()
+        self._queue.put((path, document))
+
+    def _write_loop(self, pending):
+        while True:
+            item = pending.get()
+            if item is None:
+                break
+            path, document = item
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                with open(path, "w") as f:
+                    json.dump(document, f, default=str)
+            except Exception as e:
+                with self._lock:
+                    self.write_errors += 1
+                    self.last_write_error = f"{path}: {e}"
+            finally:
+                pending.task_done()
+
+    def flush(self):
+        """Wait until all queued sample files have been written"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def reset(self):
+        """Clear the counters"""
+        with self._lock:
+            self.counters = {}
+            self.write_errors = 0
+            self.last_write_error = None
+
+    def summary_text(self):
+        """Human-readable summary of the counters per target type"""
+        if not self.enabled:
+            return "Energy diagnostics are disabled."
+        with self._lock:
+            if not self.counters:
+                return "No energy data processed since diagnostics were enabled."
+            lines = []
+            for target_type, target_counters in sorted(self.counters.items()):
+                counts = ", ".join(f"{name.replace('_', ' ')}: {target_counters.get(name, 0)}" for name in COUNTER_NAMES)
+                lines.append(f"{target_type}: {counts}")
+            write_errors, last_write_error = self.write_errors, self.last_write_error
+        if self.capture_dir:
+            lines.append(f"Sampled records are written to {self.capture_dir}")
+        if write_errors:
+            lines.append(f"{write_errors} sample files could not be written (last: {last_write_error})")
+        return "\n".join(lines)
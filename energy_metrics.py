@@ -0,0 +1,214 @@
+"""
+Energy efficiency metrics
+-------------------------
+The plots show windowed power and its running sum; this module turns the power
+samples into energy and relates it to the work done in each run.
+
+A PowerSeries integrates the power samples of one source (e.g. the API
+container or the DB host) with the trapezoidal rule.  Consecutive samples
+further apart than ``max_gap_ns`` (by default a few times the usual sampling
+interval) are not bridged, so a capture outage does not count as the average
+of the samples around it.  The running integral is kept as prefix sums, so
+the energy over any time range is two binary searches plus the partial
+segments at both ends, evaluated for all runs at once.
+
+efficiency_table() combines the runs of a results file with the power series
+of every source into one table: joules, average watts, joules per request and
+per successful request, for every run and for every experiment.
+"""
+
+import numpy as np
+import pandas as pd
+
+NS_PER_SECOND = 1_000_000_000
+
+# Samples further apart than this many median sampling intervals are not bridged
+DEFAULT_MAX_GAP_FACTOR = 5
+
+TABLE_COLUMNS = ["experiment", "run", "source", "duration_s", "covered_s", "joules", "avg_watts",
+                 "requests", "successful_requests", "joules_per_request", "joules_per_successful_request"]
+
+# Display headings and number formats of the table columns
+TABLE_HEADINGS = {
+    "experiment": "Experiment", "run": "Run", "source": "Source", "duration_s": "Duration (s)",
+    "covered_s": "Covered (s)", "joules": "Energy (J)", "avg_watts": "Avg Power (W)", "requests": "Requests",
+    "successful_requests": "Successful", "joules_per_request": "J/Request",
+    "joules_per_successful_request": "J/Successful Request",
+}
+TABLE_FORMATS = {
+    "duration_s": "{:.1f}", "covered_s": "{:.1f}", "joules": "{:.2f}", "avg_watts": "{:.2f}",
+    "requests": "{:.0f}", "successful_requests": "{:.0f}", "joules_per_request": "{:.4f}",
+    "joules_per_successful_request": "{:.4f}",
+}
+
+
+class PowerSeries:
+    """Trapezoidal integral of the power samples of one source.
+
+    Args:
+        timestamps_ns: Sample times in nanoseconds since the epoch
+        watts: Power of each sample in Watts (NaN samples are ignored)
+        max_gap_ns: Longest interval between samples that is integrated
+                    (None: DEFAULT_MAX_GAP_FACTOR times the median interval)
+    """
+
+    def __init__(self, timestamps_ns, watts, max_gap_ns=None):
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        watts = np.asarray(watts, dtype=np.float64)
+        valid = ~np.isnan(watts)
+        timestamps_ns, watts = timestamps_ns[valid], watts[valid]
+        if np.any(timestamps_ns[1:] < timestamps_ns[:-1]):
+            order = np.argsort(timestamps_ns, kind="stable")
+            timestamps_ns, watts = timestamps_ns[order], watts[order]
+
+        intervals_ns = np.diff(timestamps_ns)
+        if max_gap_ns is None:
+            max_gap_ns = DEFAULT_MAX_GAP_FACTOR * float(np.median(intervals_ns)) if len(intervals_ns) else 0
+        self.timestamps_ns = timestamps_ns
+        self.watts = watts
+        self.max_gap_ns = max_gap_ns
+
+        # Segment j runs from sample j to sample j + 1; segments over a gap contribute nothing
+        self.bridged = intervals_ns <= max_gap_ns
+        seconds = np.where(self.bridged, intervals_ns / NS_PER_SECOND, 0.0)
+        self.cumulative_joules = np.concatenate(([0.0], np.cumsum((watts[:-1] + watts[1:]) / 2 * seconds)))
+        self.cumulative_seconds = np.concatenate(([0.0], np.cumsum(seconds)))
+
+    def __len__(self):
+        return len(self.timestamps_ns)
+
+    def _integral_at(self, times_ns):
+        """Energy (J) and covered time (s) from the first sample up to each of times_ns"""
+        times_ns = np.asarray(times_ns, dtype=np.int64)
+        count = len(self.timestamps_ns)
+        if count < 2:
+            return np.zeros(len(times_ns)), np.zeros(len(times_ns))
+
+        # Sample index at or before each time (-1 before the first sample)
+        sample = np.searchsorted(self.timestamps_ns, times_ns, side="right") - 1
+        base = np.clip(sample, 0, count - 1)
+        joules = np.where(sample >= 0, self.cumulative_joules[base], 0.0)
+        seconds = np.where(sample >= 0, self.cumulative_seconds[base], 0.0)
+
+        # Partial segment from the sample to the time, with the power interpolated linearly
+        segment = np.clip(sample, 0, count - 2)
+        partial = (sample >= 0) & (sample < count - 1) & self.bridged[segment]
+        start_ns = self.timestamps_ns[segment]
+        elapsed_s = np.where(partial, (times_ns - start_ns) / NS_PER_SECOND, 0.0)
+        length_s = (self.timestamps_ns[segment + 1] - start_ns) / NS_PER_SECOND
+        start_w = self.watts[segment]
+        slope = np.divide(self.watts[segment + 1] - start_w, length_s,
+                          out=np.zeros(len(times_ns)), where=length_s > 0)
+        joules = joules + (start_w + slope * elapsed_s / 2) * elapsed_s
+        return joules, seconds + elapsed_s
+
+    def integrate(self, starts_ns, ends_ns):
+        """Energy over time ranges.
+
+        Args:
+            starts_ns: Array of range starts in nanoseconds
+            ends_ns: Array of range ends in nanoseconds
+
+        Returns:
+            (joules, covered_seconds) arrays: the energy over each range and
+            the part of the range covered by integrated segments
+        """
+        start_joules, start_seconds = self._integral_at(starts_ns)
+        end_joules, end_seconds = self._integral_at(ends_ns)
+        return end_joules - start_joules, end_seconds - start_seconds
+
+
+def sum_per_sample(timestamps_ns, values, pid):
+    """Add up the records of several processes per scaphandre sample.
+
+    Scaphandre stamps the record of every process separately, microseconds
+    apart, so the records of one sample do not share a timestamp.  The
+    sampling step is the median interval between consecutive records of the
+    same process; a record less than half a step after the previous one
+    belongs to the same sample.
+
+    Args:
+        timestamps_ns: Record times in nanoseconds since the epoch
+        values: Value of each record
+        pid: Process id of each record
+
+    Returns:
+        (timestamps_ns, sums): time of the last record and sum of the values of each sample
+    """
+    timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    pid = np.asarray(pid)
+    if not len(timestamps_ns):
+        return timestamps_ns, values
+
+    by_process = np.lexsort((timestamps_ns, pid))
+    same_process = pid[by_process][1:] == pid[by_process][:-1]
+    process_intervals = np.diff(timestamps_ns[by_process])[same_process]
+    # Without a repeated process there is a single sample
+    step_ns = float(np.median(process_intervals)) if len(process_intervals) else np.inf
+
+    order = np.argsort(timestamps_ns, kind="stable")
+    timestamps_ns, values = timestamps_ns[order], values[order]
+    sample = np.concatenate(([0], np.cumsum(np.diff(timestamps_ns) > step_ns / 2)))
+    last = np.flatnonzero(np.append(sample[1:] != sample[:-1], True))
+    return timestamps_ns[last], np.bincount(sample, weights=values, minlength=len(last))
+
+
+def efficiency_table(runs, sources):
+    """Energy efficiency of every run and experiment.
+
+    Args:
+        runs: DataFrame with one row per run and the columns experiment, run,
+              start_ms, end_ms, requests and successful_requests
+        sources: Dictionary of source name to PowerSeries
+
+    Returns:
+        DataFrame with the TABLE_COLUMNS: one row per run and source; the
+        runs of each experiment are followed by one row per source (run "All")
+        that sums them
+    """
+    starts_ns = runs["start_ms"].to_numpy(dtype=np.int64) * 1_000_000
+    ends_ns = runs["end_ms"].to_numpy(dtype=np.int64) * 1_000_000
+
+    frames = []
+    for name, series in sources.items():
+        joules, covered_s = series.integrate(starts_ns, ends_ns)
+        frame = runs[["experiment", "run", "requests", "successful_requests"]].copy()
+        frame["source"] = name
+        frame["duration_s"] = (ends_ns - starts_ns) / NS_PER_SECOND
+        frame["covered_s"] = covered_s
+        frame["joules"] = joules
+        frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+
+    per_run = pd.concat(frames, ignore_index=True)
+    per_run["run"] = per_run["run"].astype(str)
+    per_experiment = (per_run.groupby(["experiment", "source"], sort=False, as_index=False)
+                      [["duration_s", "covered_s", "joules", "requests", "successful_requests"]].sum())
+    per_experiment["run"] = "All"
+
+    # Each experiment's runs (all sources of a run together) followed by its totals
+    table = pd.concat([per_run, per_experiment], ignore_index=True)
+    experiment_order = {experiment: position for position, experiment in enumerate(runs["experiment"].unique())}
+    source_order = {name: position for position, name in enumerate(sources)}
+    run_order = np.concatenate([np.tile(np.arange(len(runs)), len(frames)), np.full(len(per_experiment), len(runs))])
+    table = table.assign(_experiment=table["experiment"].map(experiment_order), _run=run_order,
+                         _source=table["source"].map(source_order))
+    table = table.sort_values(["_experiment", "_run", "_source"], kind="stable", ignore_index=True)
+    table["avg_watts"] = table["joules"] / table["covered_s"].where(table["covered_s"] > 0)
+    table["joules_per_request"] = table["joules"] / table["requests"].where(table["requests"] > 0)
+    table["joules_per_successful_request"] = (
+        table["joules"] / table["successful_requests"].where(table["successful_requests"] > 0))
+    return table[TABLE_COLUMNS]
+
+
+def format_table(table):
+    """Rows of an efficiency table as lists of display strings ("-" for missing values)"""
+    rows = []
+    for record in table[TABLE_COLUMNS].itertuples(index=False):
+        rows.append([
+            "-" if pd.isna(value) else TABLE_FORMATS.get(column, "{}").format(value)
+            for column, value in zip(TABLE_COLUMNS, record)
+        ])
+    return rows
@@ -0,0 +1,137 @@
+"""
+Multi-resolution energy pyramid
+-------------------------------
+Aligned windows (``window_sums(..., aligned=True)``) used to be recomputed
+from the raw per-interval series every time the window size or the time range
+changed, which for an "All Experiments" view over hours of captures means
+rescanning every sample.  An EnergyPyramid pre-aggregates one series at a few
+fixed resolutions (10 ms, 100 ms, 1 s and 10 s by default) once, keeping the
+sum, minimum, maximum and sample count of every non-empty bucket.  A request
+for a window size that is a multiple of a stored level is then answered by
+rolling up the buckets of the coarsest such level; only the samples of the
+partial buckets at both ends of the requested range are read again.
+
+The series must be in chronological order (the usual case).  For such series
+the rolled-up windows are the ones ``window_sums`` builds with ``aligned``:
+one window per non-empty multiple of the window size, stamped with its start.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+# Bucket sizes of the stored levels, finest first
+DEFAULT_LEVELS_MS = (10, 100, 1000, 10000)
+
+WindowStats = namedtuple("WindowStats", "starts_ms sums mins maxs counts")
+
+
+def _empty_stats():
+    return WindowStats(np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64),
+                       np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64), np.empty(0, dtype=np.int64))
+
+
+def roll_up(stats, window_size_ms):
+    """Merge consecutive entries that fall into the same aligned window.
+
+    Args:
+        stats: WindowStats of chronological entries (samples or finer buckets)
+        window_size_ms: Size of the windows in milliseconds (a multiple of
+                        the size of the entries)
+
+    Returns:
+        (WindowStats of the windows, index of the first entry of each window)
+    """
+    if not len(stats.starts_ms):
+        return _empty_stats(), np.empty(0, dtype=np.int64)
+    window_ids = stats.starts_ms // window_size_ms
+    openers = np.flatnonzero(np.concatenate(([True], window_ids[1:] != window_ids[:-1])))
+    return WindowStats(
+        window_ids[openers] * window_size_ms,
+        np.add.reduceat(stats.sums, openers),
+        np.minimum.reduceat(stats.mins, openers),
+        np.maximum.reduceat(stats.maxs, openers),
+        np.add.reduceat(stats.counts, openers),
+    ), openers
+
+
+class EnergyPyramid:
+    """Pre-aggregated aligned windows of one series at several resolutions.
+
+    Use from_series() to build one; it checks that the series is chronological.
+
+    Args:
+        rows: int64 array with the row (e.g. host interval) of each sample in
+              its EnergyStore, used to map row ranges to samples
+        milliseconds: int64 array of sample times in milliseconds
+        values: Array of sample values
+        levels_ms: Bucket sizes of the stored levels in milliseconds
+    """
+
+    def __init__(self, rows, milliseconds, values, levels_ms=DEFAULT_LEVELS_MS):
+        self.rows = np.asarray(rows, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+        self.samples = WindowStats(np.asarray(milliseconds, dtype=np.int64), values, values, values,
+                                   np.ones(len(values), dtype=np.int64))
+
+        # Each level is rolled up from the previous one when its size is a multiple of it
+        self.levels = []
+        source, source_first, source_size = self.samples, np.arange(len(values), dtype=np.int64), None
+        for size_ms in sorted(levels_ms):
+            if source_size is None or size_ms % source_size:
+                source, source_first = self.samples, np.arange(len(values), dtype=np.int64)
+            stats, openers = roll_up(source, size_ms)
+            first = source_first[openers]
+            ends = np.append(first[1:], len(values)) if len(first) else first
+            self.levels.append((size_ms, first, ends.astype(np.int64), stats))
+            source, source_first, source_size = stats, first, size_ms
+
+    @classmethod
+    def from_series(cls, rows, milliseconds, values, levels_ms=DEFAULT_LEVELS_MS):
+        """Build a pyramid, or return None if the samples are not in chronological order"""
+        milliseconds = np.asarray(milliseconds, dtype=np.int64)
+        if np.any(milliseconds[1:] < milliseconds[:-1]):
+            return None
+        return cls(rows, milliseconds, values, levels_ms)
+
+    def level_for(self, window_size_ms):
+        """Return the coarsest level whose bucket size divides window_size_ms, or None"""
+        if window_size_ms <= 0 or window_size_ms != int(window_size_ms):
+            return None
+        for level in reversed(self.levels):
+            if int(window_size_ms) % level[0] == 0:
+                return level
+        return None
+
+    def window_stats(self, window_size_ms, first_row=0, end_row=None):
+        """Aligned windows over the samples of the rows [first_row, end_row).
+
+        Args:
+            window_size_ms: Size of the windows in milliseconds
+            first_row: First row of the range
+            end_row: End of the range (exclusive, None for all rows)
+
+        Returns:
+            WindowStats with one entry per non-empty window, or None if the
+            window size is not a multiple of a stored level
+        """
+        level = self.level_for(window_size_ms)
+        if level is None:
+            return None
+        _, first, ends, stats = level
+
+        lo = int(np.searchsorted(self.rows, first_row, side="left"))
+        hi = len(self.rows) if end_row is None else int(np.searchsorted(self.rows, end_row, side="left"))
+
+        # Buckets lying entirely in the range, plus the samples of the partial buckets at both ends
+        b0 = int(np.searchsorted(first, lo, side="left"))
+        b1 = int(np.searchsorted(ends, hi, side="right"))
+        if b0 >= b1:
+            pieces = [(self.samples, slice(lo, hi))]
+        else:
+            pieces = [(self.samples, slice(lo, int(first[b0]))), (stats, slice(b0, b1)),
+                      (self.samples, slice(int(ends[b1 - 1]), hi))]
+        combined = WindowStats(*(np.concatenate([getattr(part, field)[selector] for part, selector in pieces])
+                                 for field in WindowStats._fields))
+        windows, _ = roll_up(combined, int(window_size_ms))
+        return windows
@@ -0,0 +1,568 @@
+"""
+Columnar storage for scaphandre energy captures
+-----------------------------------------------
+The visualizers used to keep every scaphandre sample as a Python dict and walk
+those lists again in every filtering and windowing step.  This module turns a
+capture into NumPy columns once, while the results file is being read, so the
+later stages work on arrays:
+
+    timestamps_ns   int64    sample time in nanoseconds since the epoch
+    consumption     float64  consumption as reported by scaphandre (microwatts)
+    pid             int32    process id
+    category        uint8    bitmask of the CATEGORY_* flags below
+    container       int32    index into ``container_ids`` (-1 = no container)
+    process         int32    index into ``processes``, the distinct (exe, cmdline) pairs
+
+The ``exe``/``cmdline`` strings and container ids repeat in every sample, so
+each distinct value is stored once and the samples hold integer codes.
+Processes are classified once per distinct (exe, cmdline) pair and container
+ids are matched once per distinct id.
+
+Captures grouped in host intervals (``{"host": ..., "consumers": [...]}``)
+additionally carry one row per interval: the interval time, the host
+timestamp and the host consumption.  Each consumer row points to its interval.
+
+Rows stay in file order.  Time range queries go through a sorted timestamp
+index (``searchsorted``), which for the usual chronological capture is the
+timestamp column itself, so a range selection is a pair of binary searches
+and a slice.  A CumulativeEnergy holds the prefix sums of a per-row series in
+the same order, so the total over any time range is two binary searches and
+one subtraction.
+"""
+
+import numpy as np
+
+from time_utils import MILLISECONDS_THRESHOLD
+
+# Process categories, combined as a bitmask in EnergyStore.category
+CATEGORY_JAVA = 1
+CATEGORY_POSTGRES = 2
+
+NS_PER_MS = 1_000_000
+NS_PER_SECOND = 1_000_000_000
+
+
+def timestamps_to_ns(timestamps):
+    """Convert scaphandre timestamps to int64 nanoseconds since the epoch.
+
+    Args:
+        timestamps: Sequence or array of timestamps in seconds (values above
+                    1e10 are treated as milliseconds)
+
+    Returns:
+        int64 NumPy array of nanoseconds
+    """
+    ts = np.asarray(timestamps, dtype=np.float64)
+    # Scaphandre timestamps are in seconds; values above the threshold are milliseconds
+    ts = np.where(ts > MILLISECONDS_THRESHOLD, ts / 1000.0, ts)
+    return np.rint(ts * NS_PER_SECOND).astype(np.int64)
+
+
+def window_mask(timestamps_ns, windows_ns):
+    """Boolean mask of the timestamps inside any of the windows.
+
+    Args:
+        timestamps_ns: int64 array of timestamps
+        windows_ns: (starts_ns, ends_ns) int64 arrays sorted by start, inclusive at both ends
+
+    Returns:
+        Boolean array
+    """
+    starts_ns, ends_ns = windows_ns
+    if not len(starts_ns):
+        return np.zeros(len(timestamps_ns), dtype=bool)
+    # Latest end among the windows opened at or before each timestamp
+    reach = np.maximum.accumulate(ends_ns)
+    window = np.searchsorted(starts_ns, timestamps_ns, side="right") - 1
+    return (window >= 0) & (timestamps_ns <= reach[np.clip(window, 0, None)])
+
+
+def window_sums(milliseconds, values, window_size_ms, aligned=False):
+    """Sum values over consecutive time windows, in sample order.
+
+    A window opens at a sample and takes every following sample until one
+    reaches the end of the window, which then opens the next window.  The
+    window starts at the opening sample's time, or with ``aligned`` at that
+    time rounded down to a multiple of the window size
+    (``milliseconds - milliseconds % window_size_ms``).  Samples that run
+    backwards in time stay in the current window.
+
+    Args:
+        milliseconds: int64 array of sample times in milliseconds
+        values: Array of values to sum, one per sample
+        window_size_ms: Size of the windows in milliseconds
+        aligned: Whether window starts are aligned to the window size
+
+    Returns:
+        (window_starts_ms, sums) arrays with one entry per window
+    """
+    milliseconds = np.asarray(milliseconds, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    count = len(milliseconds)
+    if not count:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    starts = milliseconds - milliseconds % window_size_ms if aligned else milliseconds
+    window_ends = starts + window_size_ms
+
+    # The sample that closes the window opened at i is the first later sample at or past
+    # the window end. The running maximum is sorted, so it can be found with a binary search
+    # as long as no earlier sample already lies past that end (only for badly ordered data).
+    running_max = np.maximum.accumulate(milliseconds)
+    next_opener = np.searchsorted(running_max, window_ends, side="left").tolist()
+    searchable = (running_max < window_ends).tolist()
+    milliseconds_list = milliseconds.tolist()
+
+    # Follow the chain of window openers (one step per window)
+    openers = []
+    index = 0
+    while index < count:
+        openers.append(index)
+        if searchable[index]:
+            index = next_opener[index]
+        else:
+            window_end = window_ends[index]
+            index += 1
+            while index < count and milliseconds_list[index] < window_end:
+                index += 1
+
+    openers = np.asarray(openers, dtype=np.int64)
+    return starts[openers], np.add.reduceat(values, openers)
+
+
+class EnergyStore:
+    """Array-backed scaphandre samples for one server"""
+
+    def __init__(self, timestamps_ns, consumption, pid, category, container=None, interval=None,
+                 container_ids=(), interval_timestamps_ns=None, host_timestamps_ns=None, host_consumption=None,
+                 process=None, processes=()):
+        self.timestamps_ns = timestamps_ns
+        self.consumption = consumption
+        self.pid = pid
+        self.category = category
+        self.container = container if container is not None else np.full(len(timestamps_ns), -1, dtype=np.int32)
+        self.container_ids = list(container_ids)
+        self.process = process if process is not None else np.full(len(timestamps_ns), -1, dtype=np.int32)
+        self.processes = list(processes)
+
+        # Host interval columns (only for captures grouped in host intervals)
+        self.interval = interval
+        self.interval_timestamps_ns = interval_timestamps_ns
+        self.host_timestamps_ns = host_timestamps_ns
+        self.host_consumption = host_consumption
+
+        # Time index over the top-level entries, built on first use (see _time_index)
+        self._sorted_timestamps_ns = None
+        self._time_order = None
+
+        # Store this one is a chronological slice of and the first row in it (see base_rows),
+        # and the indexes built over the store (see derived)
+        self._base = self
+        self._base_offset = 0
+        self._derived = {}
+
+    @classmethod
+    def empty(cls, nested=False):
+        """Return a store without samples"""
+        return EnergyStoreBuilder(None, nested=nested).build()
+
+    @property
+    def nested(self):
+        """Whether the capture is grouped in host intervals"""
+        return self.interval is not None
+
+    def __len__(self):
+        """Number of top-level entries: host intervals, or samples for flat captures"""
+        if self.nested:
+            return len(self.interval_timestamps_ns)
+        return len(self.timestamps_ns)
+
+    @property
+    def row_timestamps_ns(self):
+        """Timestamps of the top-level entries counted by len()"""
+        return self.interval_timestamps_ns if self.nested else self.timestamps_ns
+
+    def _time_index(self):
+        """Return (sorted_timestamps_ns, order) for the top-level entries.
+
+        ``order`` is the stable permutation that sorts the entries by time, or
+        None when they are already in chronological order (the usual case), in
+        which case the sorted timestamps are the timestamp column itself.
+        """
+        if self._sorted_timestamps_ns is None:
+            timestamps = self.row_timestamps_ns
+            if np.all(timestamps[1:] >= timestamps[:-1]):
+                self._sorted_timestamps_ns, self._time_order = timestamps, None
+            else:
+                order = np.argsort(timestamps, kind="stable")
+                self._sorted_timestamps_ns, self._time_order = timestamps[order], order
+        return self._sorted_timestamps_ns, self._time_order
+
+    def time_extent_ns(self):
+        """Return (min, max) timestamp in nanoseconds, or None for an empty store"""
+        sorted_timestamps, _ = self._time_index()
+        if not len(sorted_timestamps):
+            return None
+        return int(sorted_timestamps[0]), int(sorted_timestamps[-1])
+
+    def _time_range_bounds(self, start_ns, end_ns):
+        """Return (lo, hi), the positions of [start_ns, end_ns] in the sorted timestamps"""
+        sorted_timestamps, _ = self._time_index()
+        lo = int(np.searchsorted(sorted_timestamps, start_ns, side="left"))
+        hi = int(np.searchsorted(sorted_timestamps, end_ns, side="right"))
+        return lo, hi
+
+    def count_time_range(self, start_ns, end_ns):
+        """Return the number of entries within [start_ns, end_ns], the len() of select_time_range"""
+        lo, hi = self._time_range_bounds(start_ns, end_ns)
+        return hi - lo
+
+    def select_time_range(self, start_ns, end_ns):
+        """Return a new store holding the entries within [start_ns, end_ns], in file order"""
+        _, order = self._time_index()
+        lo, hi = self._time_range_bounds(start_ns, end_ns)
+
+        if order is None:
+            # Chronological capture: the range is a contiguous slice
+            if not self.nested:
+                selected = self._take_samples(slice(lo, hi))
+            else:
+                # Consumers are stored interval by interval, so theirs are contiguous too
+                first, last = np.searchsorted(self.interval, [lo, hi], side="left")
+                selected = self._take_intervals(slice(lo, hi), slice(first, last), self.interval[first:last] - lo)
+            selected._sorted_timestamps_ns = selected.row_timestamps_ns
+            selected._base, selected._base_offset = self._base, self._base_offset + lo
+            return selected
+
+        return self._take_rows(np.sort(order[lo:hi]))
+
+    def _take_rows(self, rows):
+        """Return a new store with the given (sorted) top-level rows"""
+        if not self.nested:
+            selected = self._take_samples(rows)
+        else:
+            # Keep the consumers of the selected intervals and renumber their interval index
+            keep = np.zeros(len(self), dtype=bool)
+            keep[rows] = True
+            consumer_keep = keep[self.interval]
+            new_index = np.cumsum(keep, dtype=np.int64) - 1
+            selected = self._take_intervals(rows, consumer_keep, new_index[self.interval[consumer_keep]])
+        selected._base = None  # Not a contiguous range of rows
+        return selected
+
+    def base_rows(self):
+        """Return (store, first_row, end_row) locating this store as a row range of the loaded store.
+
+        Stores selected by a chronological select_time_range() are a contiguous
+        range of the rows of the store they were selected from.  Returns None
+        for selections that are not.
+        """
+        if self._base is None:
+            return None
+        return self._base, self._base_offset, self._base_offset + len(self)
+
+    def derived(self, key, build):
+        """Return the index stored under key, building it with build(store) on first use.
+
+        Indexes over the store (energy pyramids, cumulative totals) live as long
+        as the store, so they are built once per loaded file; build may return
+        None when no index can be built, which is remembered as well.
+        """
+        if key not in self._derived:
+            self._derived[key] = build(self)
+        return self._derived[key]
+
+    def cumulative(self, rows, values):
+        """Build a CumulativeEnergy over a per-row series.
+
+        Args:
+            rows: Top-level entry of each value (entries may repeat or be missing)
+            values: Values to add up
+
+        Returns:
+            CumulativeEnergy answering totals over time ranges of the entries
+        """
+        per_row = np.bincount(np.asarray(rows, dtype=np.int64), weights=np.asarray(values, dtype=np.float64),
+                              minlength=len(self))
+        sorted_timestamps, order = self._time_index()
+        return CumulativeEnergy(sorted_timestamps, per_row if order is None else per_row[order])
+
+    def _take_samples(self, selector):
+        return EnergyStore(
+            self.timestamps_ns[selector],
+            self.consumption[selector],
+            self.pid[selector],
+            self.category[selector],
+            container=self.container[selector],
+            container_ids=self.container_ids,
+            process=self.process[selector],
+            processes=self.processes,
+        )
+
+    def _take_intervals(self, interval_selector, consumer_selector, interval):
+        return EnergyStore(
+            self.timestamps_ns[consumer_selector],
+            self.consumption[consumer_selector],
+            self.pid[consumer_selector],
+            self.category[consumer_selector],
+            container=self.container[consumer_selector],
+            interval=interval.astype(np.int32, copy=False),
+            container_ids=self.container_ids,
+            interval_timestamps_ns=self.interval_timestamps_ns[interval_selector],
+            host_timestamps_ns=self.host_timestamps_ns[interval_selector],
+            host_consumption=self.host_consumption[interval_selector],
+            process=self.process[consumer_selector],
+            processes=self.processes,
+        )
+
+    def container_id(self, index):
+        """Container ID of the sample at the given index, or None"""
+        code = self.container[index]
+        return self.container_ids[code] if code >= 0 else None
+
+    def process_name(self, index):
+        """(exe, cmdline) of the sample at the given index, or None"""
+        code = self.process[index]
+        return self.processes[code] if code >= 0 else None
+
+    def category_mask(self, categories):
+        """Boolean mask of the samples matching any of the given CATEGORY_* bits"""
+        return (self.category & categories) != 0
+
+    def container_mask(self, container_id_prefix):
+        """Boolean mask of the samples whose container ID starts with the given prefix"""
+        codes = [code for code, container_id in enumerate(self.container_ids)
+                 if container_id.startswith(container_id_prefix)]
+        return np.isin(self.container, codes)
+
+    def interval_totals(self, mask):
+        """Sum the masked consumer samples per host interval.
+
+        Args:
+            mask: Boolean mask over the consumer samples
+
+        Returns:
+            (interval_timestamps_ns, totals) for the intervals with at least
+            one masked sample
+        """
+        rows, totals = self.interval_row_totals(mask)
+        return self.interval_timestamps_ns[rows], totals
+
+    def interval_row_totals(self, mask):
+        """Like interval_totals(), but return the interval indices instead of their timestamps"""
+        mask = mask & ~np.isnan(self.consumption)
+        intervals = self.interval[mask]
+        counts = np.bincount(intervals, minlength=len(self))
+        totals = np.bincount(intervals, weights=self.consumption[mask], minlength=len(self))
+        rows = np.flatnonzero(counts > 0)
+        return rows, totals[rows]
+
+    def host_series(self):
+        """Return (host_timestamps_ns, host_consumption) for the intervals that report host data"""
+        valid = ~np.isnan(self.host_consumption)
+        return self.host_timestamps_ns[valid], self.host_consumption[valid]
+
+
+class CumulativeEnergy:
+    """Prefix sums of a series over the time-ordered entries of an EnergyStore.
+
+    Args:
+        sorted_timestamps_ns: Entry timestamps in time order (the store's time index)
+        values: Value of each entry, in the same order
+    """
+
+    def __init__(self, sorted_timestamps_ns, values):
+        self.sorted_timestamps_ns = sorted_timestamps_ns
+        self.cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+
+    def _bounds(self, start_ns, end_ns):
+        lo = np.searchsorted(self.sorted_timestamps_ns, start_ns, side="left")
+        hi = np.searchsorted(self.sorted_timestamps_ns, end_ns, side="right")
+        return lo, np.maximum(hi, lo)
+
+    def total(self, start_ns=None, end_ns=None):
+        """Sum of the values of the entries within [start_ns, end_ns] (everything by default)"""
+        if start_ns is None or end_ns is None:
+            return float(self.cumulative[-1])
+        lo, hi = self._bounds(start_ns, end_ns)
+        return float(self.cumulative[hi] - self.cumulative[lo])
+
+    def totals(self, starts_ns, ends_ns):
+        """Vectorized total() for arrays of inclusive ranges"""
+        lo, hi = self._bounds(np.asarray(starts_ns, dtype=np.int64), np.asarray(ends_ns, dtype=np.int64))
+        return self.cumulative[hi] - self.cumulative[lo]
+
+
+class EnergyStoreBuilder:
+    """Accumulates chunks of scaphandre records into an EnergyStore.
+
+    Args:
+        classify: Callable (exe, cmdline) -> CATEGORY_* bitmask for a process,
+                  called once per distinct (exe, cmdline) pair
+        nested: Whether records are host intervals with a "consumers" list
+        filters: Optional LoadFilters deciding which consumers are kept
+        windows_ns: Optional (starts_ns, ends_ns) arrays; only the samples (host
+                    intervals) inside these windows are kept
+    """
+
+    def __init__(self, classify, nested=False, filters=None, windows_ns=None):
+        self.classify = classify
+        self.nested = nested
+        self.filters = filters
+        self.windows_ns = windows_ns
+        self._columns = {name: [] for name in (
+            "timestamps_ns", "consumption", "pid", "category", "container", "process", "interval",
+            "interval_timestamps_ns", "host_timestamps_ns", "host_consumption")}
+        self._container_codes = {}
+        self._process_codes = {}
+        self._process_categories = []
+        self._interval_count = 0
+
+    def append(self, records):
+        """Convert a chunk of raw records to columns; the chunk can be dropped afterwards"""
+        if not records:
+            return
+        if self.nested:
+            self._append_intervals(records)
+        else:
+            self._append_samples(records)
+
+    def _container_code(self, container):
+        if not container:
+            return -1
+        container_id = container.get("id") or ""
+        return self._container_codes.setdefault(container_id, len(self._container_codes))
+
+    def _process_code(self, exe, cmdline):
+        key = (exe, cmdline)
+        code = self._process_codes.get(key)
+        if code is None:
+            # First sample of this process: classify it once for all its samples
+            code = self._process_codes[key] = len(self._process_categories)
+            self._process_categories.append(self.classify(exe, cmdline))
+        return code
+
+    def _process_columns(self, process):
+        """Process codes of a chunk as an array, and the categories they stand for"""
+        process = np.array(process, dtype=np.int32)
+        return process, np.array(self._process_categories, dtype=np.uint8)[process]
+
+    def _append_samples(self, records):
+        process, category = self._process_columns(
+            [self._process_code(entry.get("exe") or "", entry.get("cmdline") or "") for entry in records])
+        self._append_chunk({
+            "timestamps_ns": timestamps_to_ns([entry.get("timestamp", 0.0) for entry in records]),
+            "consumption": np.array([entry.get("consumption", 0.0) for entry in records], dtype=np.float64),
+            "pid": np.array([entry.get("pid") or 0 for entry in records], dtype=np.int32),
+            "category": category,
+            "container": np.array([self._container_code(entry.get("container")) for entry in records], dtype=np.int32),
+            "process": process,
+        })
+
+    def _append_intervals(self, records):
+        timestamps, consumption, pid, process, container, interval = [], [], [], [], [], []
+        interval_timestamps, host_timestamps, host_consumption = [], [], []
+
+        for host_interval in records:
+            interval_index = len(interval_timestamps)
+            last_timestamp = None
+            for consumer in host_interval.get("consumers") or []:
+                timestamp = consumer.get("timestamp")
+                if timestamp is None:
+                    continue
+                last_timestamp = timestamp
+                value = consumer.get("consumption", 0.0)
+                timestamps.append(timestamp)
+                consumption.append(np.nan if value is None else value)
+                pid.append(consumer.get("pid") or 0)
+                process.append(self._process_code(consumer.get("exe") or "", consumer.get("cmdline") or ""))
+                container.append(self._container_code(consumer.get("container")))
+                interval.append(interval_index)
+
+            host_info = host_interval.get("host") or {}
+            host_timestamp = host_info.get("timestamp")
+            host_value = host_info.get("consumption")
+            if host_timestamp is None or host_value is None:
+                host_timestamp, host_value = last_timestamp, np.nan
+            if last_timestamp is None:
+                last_timestamp = host_timestamp
+            if last_timestamp is None:
+                continue  # Nothing in this interval carries a timestamp
+
+            interval_timestamps.append(last_timestamp)
+            host_timestamps.append(host_timestamp)
+            host_consumption.append(host_value)
+
+        process, category = self._process_columns(process)
+        self._append_chunk({
+            "timestamps_ns": timestamps_to_ns(timestamps),
+            "consumption": np.array(consumption, dtype=np.float64),
+            "pid": np.array(pid, dtype=np.int32),
+            "category": category,
+            "container": np.array(container, dtype=np.int32),
+            "process": process,
+            "interval": np.array(interval, dtype=np.int32),
+            "interval_timestamps_ns": timestamps_to_ns(interval_timestamps),
+            "host_timestamps_ns": timestamps_to_ns(host_timestamps),
+            "host_consumption": np.array(host_consumption, dtype=np.float64),
+        })
+
+    def _append_chunk(self, chunk):
+        """Apply the load filters to the columns of a chunk and append what is kept.
+
+        Args:
+            chunk: Dictionary of column arrays; for nested captures "interval"
+                   indexes the host intervals of this chunk
+        """
+        keep = self.filters.consumer_mask(chunk["consumption"], chunk["category"], chunk["container"]) \
+            if self.filters is not None else None
+        if self.windows_ns is not None:
+            if self.nested:
+                # Drop the intervals outside the windows with their consumers, and renumber the rest
+                interval_keep = window_mask(chunk["interval_timestamps_ns"], self.windows_ns)
+                in_window = interval_keep[chunk["interval"]]
+                chunk["interval"] = (np.cumsum(interval_keep) - 1)[chunk["interval"]]
+                for name in ("interval_timestamps_ns", "host_timestamps_ns", "host_consumption"):
+                    chunk[name] = chunk[name][interval_keep]
+            else:
+                in_window = window_mask(chunk["timestamps_ns"], self.windows_ns)
+            keep = in_window if keep is None else keep & in_window
+        if keep is not None:
+            for name in ("timestamps_ns", "consumption", "pid", "category", "container", "process", "interval"):
+                if name in chunk:
+                    chunk[name] = chunk[name][keep]
+
+        if self.nested:
+            chunk["interval"] = (chunk["interval"] + self._interval_count).astype(np.int32, copy=False)
+            self._interval_count += len(chunk["interval_timestamps_ns"])
+        for name, values in chunk.items():
+            self._columns[name].append(values)
+
+    def _concat(self, name, dtype):
+        parts = self._columns[name]
+        if not parts:
+            return np.empty(0, dtype=dtype)
+        return np.concatenate(parts).astype(dtype, copy=False)
+
+    def build(self):
+        """Return an EnergyStore with everything appended so far"""
+        container_ids = sorted(self._container_codes, key=self._container_codes.get)
+        store = EnergyStore(
+            self._concat("timestamps_ns", np.int64),
+            self._concat("consumption", np.float64),
+            self._concat("pid", np.int32),
+            self._concat("category", np.uint8),
+            container=self._concat("container", np.int32),
+            container_ids=container_ids,
+            process=self._concat("process", np.int32),
+            processes=sorted(self._process_codes, key=self._process_codes.get),
+        )
+        if self.nested:
+            store.interval = self._concat("interval", np.int32)
+            store.interval_timestamps_ns = self._concat("interval_timestamps_ns", np.int64)
+            store.host_timestamps_ns = self._concat("host_timestamps_ns", np.int64)
+            store.host_consumption = self._concat("host_consumption", np.float64)
+
+        # Build the time index now so range queries and extents are ready when plotting
+        store._time_index()
+        return store
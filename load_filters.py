@@ -0,0 +1,106 @@
+"""
+Load-time filters for scaphandre captures
+-----------------------------------------
+Only the timestamp, consumption, pid, process and container of a scaphandre
+record are ever kept (``resources_usage`` and the other fields are dropped
+while the records are converted to columns), but by default every record is
+kept.  Most of them never show up in a plot: kernel threads and idle
+processes reporting ``consumption: 0``, processes that are neither the API
+(java) nor the database (postgres) and run in no container, and samples
+taken between the benchmark runs.  LoadFilters drops such records while the
+capture is loaded, chunk by chunk, so the energy stores and everything built
+from them only hold what can be plotted:
+
+    drop_zero_consumption   drop consumers reporting no consumption
+    known_processes_only    keep only java/postgres processes and consumers
+                            running in a container
+    run_windows_only        keep only the samples (host intervals) inside
+                            the run of some experiment in ``benchmark_results``
+
+Host intervals stay when their consumers are dropped, so the host series are
+not affected by the first two filters.  The energy sections are parsed after
+``benchmark_results`` (see results_loader.index_members), so the run windows
+are known before the first sample is read.
+
+The environment variable ENERGY_LOAD_FILTERS gives the initial settings as a
+comma-separated list of ``nonzero``, ``processes`` and ``runs``.
+"""
+
+import os
+
+import numpy as np
+
+from dataset_catalog import run_time_bounds
+from energy_store import NS_PER_MS
+
+# Names of the filters in ENERGY_LOAD_FILTERS and in the cache key
+FILTER_NAMES = {"nonzero": "drop_zero_consumption", "processes": "known_processes_only", "runs": "run_windows_only"}
+
+
+class LoadFilters:
+    """Which records of a capture are kept while loading.
+
+    Args:
+        drop_zero_consumption: Drop consumers reporting no consumption
+        known_processes_only: Keep only classified processes and containers
+        run_windows_only: Keep only samples inside benchmark runs
+    """
+
+    def __init__(self, drop_zero_consumption=False, known_processes_only=False, run_windows_only=False):
+        self.drop_zero_consumption = drop_zero_consumption
+        self.known_processes_only = known_processes_only
+        self.run_windows_only = run_windows_only
+
+    @classmethod
+    def from_environment(cls):
+        """Create filters configured from ENERGY_LOAD_FILTERS"""
+        names = {name.strip().lower() for name in os.environ.get("ENERGY_LOAD_FILTERS", "").split(",")}
+        return cls(**{attribute: name in names for name, attribute in FILTER_NAMES.items()})
+
+    @property
+    def key(self):
+        """Enabled filters as a string, e.g. "nonzero,runs" ("" when nothing is filtered)"""
+        return ",".join(name for name, attribute in FILTER_NAMES.items() if getattr(self, attribute))
+
+    def consumer_mask(self, consumption, category, container):
+        """Boolean mask of the consumers to keep, or None to keep all of them
+
+        Args:
+            consumption: float64 array of consumption values
+            category: uint8 array of CATEGORY_* bitmasks
+            container: int32 array of container codes (-1 = no container)
+        """
+        mask = None
+        if self.drop_zero_consumption:
+            # Missing values (NaN) are kept, they are counted by the diagnostics
+            mask = consumption != 0
+        if self.known_processes_only:
+            known = (category != 0) | (container >= 0)
+            mask = known if mask is None else mask & known
+        return mask
+
+    def run_windows_ns(self, results):
+        """Start and end (nanoseconds) of every run in the results, or None when no runs are filtered.
+
+        Args:
+            results: Dictionary holding ``benchmark_results``
+
+        Returns:
+            (starts_ns, ends_ns) int64 arrays sorted by start, or None if the
+            filter is off or the results hold no run boundaries
+        """
+        if not self.run_windows_only:
+            return None
+        experiments = (results.get("benchmark_results") or {}).get("experiments") or {}
+        bounds = []
+        for experiment in experiments.values():
+            for run in (experiment or {}).get("runs") or []:
+                start_time_ms, end_time_ms = run_time_bounds(run)
+                if start_time_ms is not None and end_time_ms is not None:
+                    bounds.append((int(start_time_ms * NS_PER_MS), int(end_time_ms * NS_PER_MS)))
+        if not bounds:
+            return None
+        bounds.sort()
+        return (np.array([start for start, _ in bounds], dtype=np.int64),
+                np.array([end for _, end in bounds], dtype=np.int64))
+
@@ -0,0 +1,273 @@
+"""
+Incremental plot rendering
+--------------------------
+Redrawing used to start with ``fig.clear()``, so every refresh rebuilt the
+axes (ticks, formatters, spines) and created every line, scatter, run span,
+run boundary line and annotation again.  FigureArtists keeps them alive
+between refreshes instead:
+
+* ``begin(layout_key)`` starts a refresh.  The axes are only rebuilt when the
+  layout key (e.g. the data source and plot type) or the subplot arrangement
+  changes; otherwise the artists of the previous refresh are detached from
+  their axes and kept for reuse.
+* The axes returned by ``add_subplot`` / ``twinx`` accept the usual
+  Matplotlib calls.  ``plot``, ``scatter``, ``axvline``, ``axvspan`` and
+  ``text`` reuse a detached artist created by a call with the same style
+  arguments and only update its data (``set_data``, ``set_offsets``, ...).
+  Bars and filled areas are created fresh, other calls go to the Axes as is.
+* ``finish()`` drops the artists and axes that were not used again.
+
+Series passed to ``plot`` and ``scatter`` are decimated to the pixel width
+of their axes first (see decimation.py); ``decimation_summary()`` reports
+how many points were dropped in the last refresh.
+
+Artists are re-attached in call order, so the z-order, the legend order and
+the data limits come out the same as for a freshly built figure.
+"""
+
+import numpy as np
+
+from decimation import DEFAULT_POINTS_PER_PIXEL, decimate
+
+
+def _style_signature(method, args, kwargs):
+    """Hashable description of the style arguments of a drawing call"""
+    def freeze(value):
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            return ("id", id(value))
+    return (method, tuple(freeze(arg) for arg in args),
+            tuple(sorted((name, freeze(value)) for name, value in kwargs.items())))
+
+
+class ReusableAxes:
+    """Axes wrapper that reuses the artists of the previous refresh.
+
+    Attributes not handled here are forwarded to the wrapped Axes.
+
+    Args:
+        ax: Wrapped Matplotlib Axes
+        spec: Arguments the Axes was created with (to detect layout changes)
+        owner: FigureArtists the axes belong to
+    """
+
+    def __init__(self, ax, spec, owner):
+        self.ax = ax
+        self.spec = spec
+        self._owner = owner
+        self._pool = {}
+        self._twins = []
+        self._next_twin = 0
+
+    def __getattr__(self, name):
+        return getattr(self.ax, name)
+
+    def begin(self):
+        """Detach the artists of the previous refresh and reset the axes decorations"""
+        ax = self.ax
+        pool = {}
+        for container in list(ax.containers):
+            container.remove()
+        for artist in [*ax.lines, *ax.collections, *ax.patches, *ax.texts]:
+            artist.remove()
+            signature = getattr(artist, "_reuse_signature", None)
+            if signature is not None:
+                pool.setdefault(signature, []).append(artist)
+        self._pool = pool
+
+        if ax.get_legend() is not None:
+            ax.get_legend().remove()
+        ax.set_title("")
+        ax.set_xlabel("")
+        ax.set_ylabel("")
+        ax.grid(False)
+        ax.set_autoscale_on(True)
+        ax.relim()  # No artists attached: resets the data limits
+
+        self._next_twin = 0
+        for twin in self._twins:
+            twin.begin()
+
+    def finish(self):
+        """Drop the unused artists and twin axes"""
+        self._pool = {}
+        for twin in self._twins[self._next_twin:]:
+            twin.ax.remove()
+        del self._twins[self._next_twin:]
+        for twin in self._twins:
+            twin.finish()
+
+    def _reuse(self, method, args, kwargs):
+        signature = _style_signature(method, args, kwargs)
+        candidates = self._pool.get(signature)
+        artist = candidates.pop(0) if candidates else None
+        if artist is not None and "label" not in kwargs:
+            artist.set_label("")  # Re-adding assigns the same "_child<n>" label as a fresh artist
+        return signature, artist
+
+    def _after_update(self, scaley=True):
+        # Fresh artists request a lazy autoscale; reused ones update the view right away.
+        # Vertical lines and spans only rescale the x axis, like axvline/axvspan do.
+        self.ax.autoscale_view(scaley=scaley)
+
+    def plot(self, x, y, *fmt, **kwargs):
+        x, y = self._owner.decimate(self.ax, x, y)
+        signature, line = self._reuse("plot", fmt, kwargs)
+        if line is None:
+            lines = self.ax.plot(x, y, *fmt, **kwargs)
+            for created in lines:
+                created._reuse_signature = signature
+            return lines
+        line.set_data(np.asarray(x), np.asarray(y))
+        self.ax.add_line(line)
+        self._after_update()
+        return [line]
+
+    def scatter(self, x, y, **kwargs):
+        x, y = self._owner.decimate(self.ax, x, y)
+        signature, collection = self._reuse("scatter", (), kwargs)
+        if collection is None:
+            collection = self.ax.scatter(x, y, **kwargs)
+            collection._reuse_signature = signature
+            return collection
+        offsets = np.column_stack([np.asarray(self.ax.convert_xunits(np.asarray(x)), dtype=float),
+                                   np.asarray(self.ax.convert_yunits(np.asarray(y)), dtype=float)])
+        collection.set_offsets(offsets)
+        self.ax.add_collection(collection)
+        self._after_update()
+        return collection
+
+    def axvline(self, x=0, **kwargs):
+        signature, line = self._reuse("axvline", (), kwargs)
+        if line is None:
+            line = self.ax.axvline(x=x, **kwargs)
+            line._reuse_signature = signature
+            return line
+        line.set_xdata([x, x])
+        self.ax.add_line(line)
+        self._after_update(scaley=False)
+        return line
+
+    def axvspan(self, xmin, xmax, **kwargs):
+        signature, patch = self._reuse("axvspan", (), kwargs)
+        if patch is None:
+            patch = self.ax.axvspan(xmin, xmax, **kwargs)
+            patch._reuse_signature = signature
+            return patch
+        xmin, xmax = self.ax.convert_xunits([xmin, xmax])
+        patch.set_x(xmin)
+        patch.set_width(xmax - xmin)
+        # The span covers the whole y range in axes coordinates; keep it out of the y data limits
+        interval_y, minpos_y = self.ax.dataLim.intervaly.copy(), self.ax.dataLim.minposy
+        self.ax.add_patch(patch)
+        self.ax.dataLim.intervaly, self.ax.dataLim.minposy = interval_y, minpos_y
+        self._after_update(scaley=False)
+        return patch
+
+    def text(self, x, y, s, **kwargs):
+        signature, text = self._reuse("text", (), kwargs)
+        if text is None:
+            text = self.ax.text(x, y, s, **kwargs)
+            text._reuse_signature = signature
+            return text
+        text.set_position((x, y))
+        text.set_text(s)
+        self.ax.add_artist(text)
+        return text
+
+    def twinx(self):
+        """Return the next twin Axes of this refresh, reusing the previous one"""
+        index = self._next_twin
+        self._next_twin += 1
+        if index < len(self._twins):
+            return self._twins[index]
+        twin = ReusableAxes(self.ax.twinx(), spec=("twinx", index), owner=self._owner)
+        self._twins.append(twin)
+        self._owner.layout_changed = True
+        return twin
+
+
+class FigureArtists:
+    """Keeps the axes and artists of a figure alive between refreshes.
+
+    Args:
+        fig: Matplotlib Figure to draw into
+        points_per_pixel: Points kept per horizontal pixel of a line or
+                          scatter series (None disables decimation)
+    """
+
+    def __init__(self, fig, points_per_pixel=DEFAULT_POINTS_PER_PIXEL):
+        self.fig = fig
+        self.points_per_pixel = points_per_pixel
+        self.points_in = 0
+        self.points_out = 0
+        self.layout_changed = True
+        self._layout_key = None
+        self._axes = []
+        self._next_axes = 0
+
+    def begin(self, layout_key):
+        """Start a refresh; the figure is cleared when the layout key differs from the last one
+
+        Args:
+            layout_key: Hashable description of the figure layout
+        """
+        self.layout_changed = layout_key != self._layout_key
+        if self.layout_changed:
+            self.fig.clear()
+            self._axes = []
+            self._layout_key = layout_key
+        self._next_axes = 0
+        self.points_in = 0
+        self.points_out = 0
+        for axes in self._axes:
+            axes.begin()
+
+    def add_subplot(self, *args, **kwargs):
+        """Return the next subplot of this refresh, reusing the previous one if it has the same position"""
+        index = self._next_axes
+        self._next_axes += 1
+        spec = (args, tuple(sorted(kwargs.items())))
+        if index < len(self._axes) and self._axes[index].spec == spec:
+            return self._axes[index]
+
+        # The arrangement differs from here on
+        for stale in self._axes[index:]:
+            stale.ax.remove()
+        del self._axes[index:]
+        axes = ReusableAxes(self.fig.add_subplot(*args, **kwargs), spec=spec, owner=self)
+        self._axes.append(axes)
+        self.layout_changed = True
+        return axes
+
+    def finish(self):
+        """End a refresh: remove the axes and artists that were not used again"""
+        for stale in self._axes[self._next_axes:]:
+            stale.ax.remove()
+            self.layout_changed = True
+        del self._axes[self._next_axes:]
+        for axes in self._axes:
+            axes.finish()
+
+    def decimate(self, ax, x, y):
+        """Reduce a series to a few points per horizontal pixel of ax (see decimation.decimate)"""
+        n_points = len(y)
+        self.points_in += n_points
+        if self.points_per_pixel:
+            n_buckets = int(ax.get_window_extent().width * self.points_per_pixel / 2)
+            x, y = decimate(x, y, n_buckets)
+        self.points_out += len(y)
+        return x, y
+
+    def decimation_summary(self):
+        """Status text describing the decimation of the last refresh (None if nothing was dropped)"""
+        if self.points_out >= self.points_in:
+            return None
+        return (f"Plotted {self.points_out:,} of {self.points_in:,} points "
+                f"({self.points_in / max(self.points_out, 1):.1f}:1 decimation to the plot width)")
+
+    def reset(self):
+        """Forget the current layout so the next refresh rebuilds the figure"""
+        self._layout_key = None
@@ -0,0 +1,88 @@
+"""
+Coalesced plot updates
+----------------------
+Every control of the plot bar used to redraw the plot as soon as it changed,
+so adjusting three controls processed and drew the plot three times.  The
+visualizers route these events through a ReplotScheduler instead: requests
+made within a short delay of each other are merged into one update, and the
+control values are compared with the ones of the last drawn plot so that
+
+* nothing happens when no value actually changed,
+* only the drawing is redone when just render-only inputs changed (e.g. the
+  plot type), since the processed series are unaffected,
+* the full update (series processing and drawing) runs otherwise.
+"""
+
+DEFAULT_DELAY_MS = 150
+
+
+class ReplotScheduler:
+    """Debounces plot update requests on the Tk main loop.
+
+    Args:
+        root: Tk root window used to schedule the update
+        read_inputs: Callable returning a dictionary of the current plot inputs
+        update: Callable running the full plot update
+        render: Callable redrawing the plot from already processed series
+        render_only_inputs: Names of inputs that only affect the drawing
+        delay_ms: Quiet period after the last request before updating
+    """
+
+    def __init__(self, root, read_inputs, update, render, render_only_inputs=(), delay_ms=DEFAULT_DELAY_MS):
+        self.root = root
+        self.read_inputs = read_inputs
+        self.update = update
+        self.render = render
+        self.render_only_inputs = frozenset(render_only_inputs)
+        self.delay_ms = delay_ms
+        self._after_id = None
+        self._force = False
+        self._drawn_inputs = None
+
+    @property
+    def pending(self):
+        """Whether an update is scheduled"""
+        return self._after_id is not None
+
+    def request(self, force=False):
+        """Schedule an update, merging it with requests made shortly before.
+
+        Args:
+            force: Run the full update even if no input changed
+        """
+        self._force = self._force or force
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = self.root.after(self.delay_ms, self._fire)
+
+    def cancel(self):
+        """Drop a scheduled update (e.g. because the plot is updated directly)"""
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self._force = False
+
+    def mark_drawn(self):
+        """Remember the inputs of the plot being drawn; called by the renderer"""
+        self._drawn_inputs = self.read_inputs()
+
+    def changed_inputs(self):
+        """Names of the inputs that differ from the last drawn plot (None if nothing was drawn yet)"""
+        if self._drawn_inputs is None:
+            return None
+        inputs = self.read_inputs()
+        return {name for name, value in inputs.items() if self._drawn_inputs.get(name) != value}
+
+    def _fire(self):
+        self._after_id = None
+        force, self._force = self._force, False
+
+        changed = self.changed_inputs()
+        if force or changed is None:
+            self.update()
+        elif not changed:
+            return
+        elif changed <= self.render_only_inputs:
+            self.render()
+        else:
+            self.update()
@@ -0,0 +1,157 @@
+"""
+Per-target index of PowerAPI exports
+------------------------------------
+PowerAPI exports (``mongoexport`` dumps of the power reports) interleave the
+reports of every target.  Filtering the raw list for one target meant a scan
+of the whole export and an ISO8601 parse of the matching timestamps on every
+redraw.  A PowerAPIIndex parses all ``$date`` values in one call when the
+file is loaded and keeps, for every target, its samples sorted by time:
+
+    timestamps_ns   int64    sample time in nanoseconds since the epoch (UTC)
+    power           float64  power in Watts
+
+Selecting a target and a time range is then a dictionary lookup, two binary
+searches and a slice.
+
+Reports are validated while their fields are extracted: reports missing
+``target``, ``power`` or ``timestamp.$date``, with an unparsable date or a
+non-numeric power are skipped and counted in ``malformed`` instead of
+rejecting the file.  For trusted sources only a random sample of the reports
+is checked before the fields are read without per-report checks; the full
+validation still runs if the sample or the extraction turns up a malformed
+report.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Number of reports checked when only a sample is validated
+DEFAULT_SAMPLE_SIZE = 1000
+
+# Fields every report must have
+REQUIRED_FIELDS = ("timestamp", "power", "target")
+
+
+def _report_fields(report):
+    """(target, power, $date) of a report, or None if one of them is missing"""
+    try:
+        return report["target"], report["power"], report["timestamp"]["$date"]
+    except (KeyError, TypeError, IndexError):
+        return None
+
+
+class PowerAPIIndex:
+    """Samples of a PowerAPI export grouped by target and sorted by time.
+
+    Args:
+        targets: Sequence with the target of each report
+        timestamps_ns: int64 array of report times in nanoseconds since the epoch
+        power: Array of report power values in Watts
+        malformed: Number of reports of the export that were skipped
+    """
+
+    def __init__(self, targets, timestamps_ns, power, malformed=0):
+        self.malformed = malformed
+        timestamps_ns = np.asarray(timestamps_ns, dtype=np.int64)
+        power = np.asarray(power, dtype=np.float64)
+        codes, names = pd.factorize(pd.Series(targets, dtype=object), sort=False)
+
+        # Reports of each target next to each other, in time order
+        order = np.lexsort((timestamps_ns, codes))
+        codes = codes[order]
+        self._set_columns(timestamps_ns[order], power[order], list(names),
+                          np.searchsorted(codes, np.arange(len(names) + 1)))
+
+    def _set_columns(self, timestamps_ns, power, targets, bounds):
+        """Use columns sorted by target and time; target i owns rows bounds[i]:bounds[i + 1]"""
+        self._columns = (timestamps_ns, power, targets, bounds)
+        self._series = {
+            name: (timestamps_ns[bounds[code]:bounds[code + 1]], power[bounds[code]:bounds[code + 1]])
+            for code, name in enumerate(targets)
+        }
+        self._length = len(timestamps_ns)
+
+    def to_columns(self):
+        """Columns of the index, for rebuilding it in another process (see from_columns)
+
+        Returns:
+            (dictionary with the sorted "timestamps_ns" and "power" arrays,
+            JSON-serializable metadata)
+        """
+        timestamps_ns, power, targets, bounds = self._columns
+        return ({"timestamps_ns": timestamps_ns, "power": power},
+                {"targets": targets, "bounds": [int(bound) for bound in bounds], "malformed": self.malformed})
+
+    @classmethod
+    def from_columns(cls, columns, meta):
+        """Rebuild an index around the columns returned by to_columns, without copying them"""
+        index = cls.__new__(cls)
+        index.malformed = meta["malformed"]
+        index._set_columns(columns["timestamps_ns"], columns["power"], list(meta["targets"]), meta["bounds"])
+        return index
+
+    @classmethod
+    def from_reports(cls, reports, sample_size=None):
+        """Validate the reports of an export and build an index of the valid ones.
+
+        Args:
+            reports: List of reports with "target", "power" and an ISO8601
+                     ``timestamp["$date"]``
+            sample_size: Number of randomly chosen reports to check before
+                         reading the fields without checks (None: check all)
+
+        Returns:
+            PowerAPIIndex of the valid reports; ``malformed`` counts the others
+        """
+        columns = None
+        if sample_size is not None and sample_size < len(reports):
+            sample = np.random.default_rng().choice(len(reports), sample_size, replace=False)
+            if all(_report_fields(reports[i]) is not None for i in sample):
+                try:
+                    columns = ([report["target"] for report in reports], [report["power"] for report in reports],
+                               [report["timestamp"]["$date"] for report in reports])
+                except (KeyError, TypeError, IndexError):
+                    columns = None
+        missing = 0
+        if columns is None:
+            fields = [_report_fields(report) for report in reports]
+            valid = [field for field in fields if field is not None]
+            missing = len(fields) - len(valid)
+            columns = tuple(zip(*valid)) if valid else ((), (), ())
+        targets, power, dates = columns
+
+        # Dates and power values that do not parse are dropped together with their report
+        dates = pd.to_datetime(pd.Series(dates, dtype=object), format='ISO8601', utc=True, errors='coerce')
+        power = pd.to_numeric(pd.Series(power, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+        valid = dates.notna().to_numpy() & ~np.isnan(power)
+        # The parsed resolution depends on the strings, so convert to nanoseconds explicitly
+        timestamps_ns = dates.dt.tz_localize(None).to_numpy().astype("datetime64[ns]").view(np.int64)
+        targets = np.asarray(targets, dtype=object)
+        return cls(targets[valid], timestamps_ns[valid], power[valid], missing + int(np.count_nonzero(~valid)))
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, target):
+        return target in self._series
+
+    @property
+    def targets(self):
+        """Targets in order of their first report"""
+        return list(self._series)
+
+    def select(self, target, start_ns=None, end_ns=None):
+        """Samples of one target within [start_ns, end_ns].
+
+        Args:
+            target: Target to select
+            start_ns: Start time in nanoseconds (inclusive, None for no bound)
+            end_ns: End time in nanoseconds (inclusive, None for no bound)
+
+        Returns:
+            (timestamps_ns, power) array views, empty for unknown targets
+        """
+        timestamps_ns, power = self._series.get(target, (np.empty(0, dtype=np.int64), np.empty(0)))
+        lo = 0 if start_ns is None else int(np.searchsorted(timestamps_ns, start_ns, side="left"))
+        hi = len(timestamps_ns) if end_ns is None else int(np.searchsorted(timestamps_ns, end_ns, side="right"))
+        return timestamps_ns[lo:hi], power[lo:hi]
@@ -0,0 +1,213 @@
+"""
+On-disk cache of loaded results files
+-------------------------------------
+The same multi-GB results files are reopened many times, and every open used
+to stream and parse the whole JSON again.  After a file has been read once,
+its energy columns are written to a cache directory as ``.npy`` files next to
+the rest of the results (``benchmark_results``, ``container_info``, ...) as
+JSON.  Reopening the file memory-maps the columns instead of parsing them, so
+only the pages that are actually plotted are read from disk.
+
+Entries are keyed by the absolute path, size and modification time of the
+results file; hashing the content of a multi-GB file would take about as long
+as parsing it.  A changed file gets a new key, and its old entry is evicted
+like any other.  Both visualizers share the cache directory but classify
+processes differently, and only the containers visualizer keeps the host
+intervals, so the key also records how the file was parsed (see
+cache_variant): the tool, the nesting and the load filters (see
+load_filters.py).  When the cache grows beyond ``max_bytes``, the least
+recently opened entries are deleted.
+
+Environment variables give the settings:
+
+    RESULTS_CACHE=0                   disable the cache
+    RESULTS_CACHE_DIR=<path>          cache directory (default ~/.cache/restqframework/results)
+    RESULTS_CACHE_MAX_MB=<n>          size limit in megabytes (default 8192)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from energy_store import EnergyStore
+
+DEFAULT_CACHE_DIR = os.path.join("~", ".cache", "restqframework", "results")
+DEFAULT_MAX_BYTES = 8192 * 1024 * 1024
+
+# Bumped whenever the layout of an entry changes, so old entries are not read
+FORMAT_VERSION = 2
+
+# EnergyStore columns written per energy section; the interval columns only exist for nested captures
+SAMPLE_COLUMNS = ("timestamps_ns", "consumption", "pid", "category", "container", "process")
+INTERVAL_COLUMNS = ("interval", "interval_timestamps_ns", "host_timestamps_ns", "host_consumption")
+
+_META_FILE = "meta.json"
+_RESULTS_FILE = "results.json"
+
+
+def cache_variant(namespace, nested, filters=None):
+    """How a results file was parsed, as the ``variant`` of its cache entry
+
+    Args:
+        namespace: Name of the process classification (one per visualizer)
+        nested: Whether the host intervals are kept
+        filters: Optional LoadFilters the file is loaded with
+    """
+    return f"{namespace}:{'nested' if nested else 'flat'}:{filters.key if filters is not None else ''}"
+
+
+def store_columns(store):
+    """Columns of an EnergyStore by name, and what else open_store needs to rebuild it
+
+    Returns:
+        (dictionary of column name to array, JSON-serializable metadata)
+    """
+    columns = SAMPLE_COLUMNS + (INTERVAL_COLUMNS if store.nested else ())
+    meta = {"nested": store.nested, "container_ids": store.container_ids, "processes": store.processes}
+    return {column: getattr(store, column) for column in columns}, meta
+
+
+def open_store(columns, meta):
+    """Rebuild an EnergyStore around existing columns (memory maps, shared memory) without copying them
+
+    Args:
+        columns: Dictionary of column name to array, as returned by store_columns
+        meta: Metadata returned by store_columns
+    """
+    arrays = dict(columns)
+    store = EnergyStore(arrays.pop("timestamps_ns"), arrays.pop("consumption"), arrays.pop("pid"),
+                        arrays.pop("category"), container_ids=meta["container_ids"],
+                        processes=[tuple(process) for process in meta["processes"]], **arrays)
+    # Checks the time order, reading the timestamp column once
+    store._time_index()
+    return store
+
+
+class ResultsCache:
+    """Cache directory of parsed results files.
+
+    Args:
+        directory: Directory holding one subdirectory per cached file
+        max_bytes: Total size of the entries kept before old ones are evicted
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_environment(cls):
+        """Create a cache configured from RESULTS_CACHE_DIR / RESULTS_CACHE_MAX_MB, or None if RESULTS_CACHE=0"""
+        if os.environ.get("RESULTS_CACHE", "").lower() in ("0", "false", "no"):
+            return None
+        try:
+            max_bytes = int(os.environ["RESULTS_CACHE_MAX_MB"]) * 1024 * 1024
+        except (KeyError, ValueError):
+            max_bytes = DEFAULT_MAX_BYTES  # Unset or not a number
+        return cls(os.environ.get("RESULTS_CACHE_DIR") or DEFAULT_CACHE_DIR, max_bytes)
+
+    def key(self, file_path, variant=""):
+        """Return the entry name of a results file in its current version
+
+        Args:
+            file_path: Path of the results file
+            variant: How the file was loaded (see cache_variant)
+        """
+        stat = os.stat(file_path)
+        identity = f"{FORMAT_VERSION}\0{os.path.abspath(file_path)}\0{stat.st_size}\0{stat.st_mtime_ns}\0{variant}"
+        return hashlib.sha1(identity.encode("utf-8")).hexdigest()
+
+    def load(self, file_path, variant="", nested=None):
+        """Open the cached version of a results file.
+
+        Args:
+            file_path: Path of the results file
+            variant: How the file was loaded (see key)
+            nested: Whether the caller keeps the host intervals; entries with
+                    stores of the other layout are not used (None: any layout)
+
+        Returns:
+            (results, energy_stores): the non-energy part of the file as a
+            dictionary and an EnergyStore per energy section backed by
+            read-only memory maps, or None if the file is not cached
+        """
+        try:
+            entry = os.path.join(self.directory, self.key(file_path, variant))
+            with open(os.path.join(entry, _META_FILE)) as file:
+                meta = json.load(file)
+            if nested is not None and any(section_meta["nested"] != nested
+                                          for section_meta in meta["sections"].values()):
+                return None
+            with open(os.path.join(entry, _RESULTS_FILE)) as file:
+                results = json.load(file)
+            energy_stores = {section: self._open_store(entry, section, section_meta)
+                             for section, section_meta in meta["sections"].items()}
+        except (OSError, ValueError, KeyError):
+            return None
+
+        # The modification time of the entry records when it was last used (see _evict)
+        os.utime(entry)
+        return results, energy_stores
+
+    def store(self, file_path, results, energy_stores, variant=""):
+        """Write a parsed results file to the cache and evict old entries.
+
+        Args:
+            file_path: Path of the results file
+            results: The non-energy part of the file as a dictionary
+            energy_stores: Dictionary of EnergyStore per energy section
+            variant: How the file was loaded (see key)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = os.path.join(self.directory, self.key(file_path, variant))
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.directory)
+        try:
+            meta = {"path": os.path.abspath(file_path), "variant": variant, "sections": {}}
+            for section, store in energy_stores.items():
+                columns, meta["sections"][section] = store_columns(store)
+                for column, values in columns.items():
+                    np.save(os.path.join(staging, f"{section}.{column}.npy"), values)
+            with open(os.path.join(staging, _RESULTS_FILE), "w") as file:
+                json.dump(results, file)
+            # The meta file is written last: an entry without it is never read
+            with open(os.path.join(staging, _META_FILE), "w") as file:
+                json.dump(meta, file)
+
+            shutil.rmtree(entry, ignore_errors=True)
+            os.replace(staging, entry)
+        except (OSError, TypeError, ValueError):
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._evict(keep=entry)
+
+    def clear(self):
+        """Delete every entry"""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _open_store(entry, section, section_meta):
+        columns = SAMPLE_COLUMNS + (INTERVAL_COLUMNS if section_meta["nested"] else ())
+        return open_store({column: np.load(os.path.join(entry, f"{section}.{column}.npy"), mmap_mode="r")
+                           for column in columns}, section_meta)
+
+    def _evict(self, keep=None):
+        """Delete the least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+            entries.append((os.stat(path).st_mtime, path, size))
+
+        total = sum(size for _, _, size in entries)
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
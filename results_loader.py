@@ -0,0 +1,472 @@
+"""
+Incremental reader for benchmark results files
+----------------------------------------------
+The results files written by the benchmark playbooks are one large JSON object
+holding the scaphandre captures of both servers next to the benchmark results.
+Parsing them with a single ``json.load`` means nothing can be shown until the
+whole file has been turned into Python objects.
+
+This module walks the file as a stream of events instead.  The energy sections
+are emitted as chunks of records and ``benchmark_results`` is emitted one
+member (and one experiment) at a time, so the visualizers can start working
+with the first experiment while the rest of the file is still being read.
+
+index_members() goes one step further for files whose energy sections come
+first: it locates the top-level members by their byte offsets, looking only
+at brackets and quotes (with numpy, a few MB at a time) instead of decoding
+the records.  iter_member() then walks a single member, so benchmark_results
+can be read without parsing the scaphandre samples in front of it.
+"""
+
+import codecs
+import json
+import re
+from typing import NamedTuple
+
+import numpy as np
+
+# Top-level sections holding scaphandre samples
+ENERGY_SECTIONS = ("api_server_energy", "db_server_energy")
+
+# Arrays whose elements are emitted in chunks instead of as one value
+STREAMED_ARRAYS = frozenset((section,) for section in ENERGY_SECTIONS)
+
+# Objects whose members are emitted one by one instead of as one value
+STREAMED_OBJECTS = frozenset([
+    ("benchmark_results",),
+    ("benchmark_results", "experiments"),
+])
+
+# Number of energy records handed to the consumer at once
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Number of characters read from the file per refill
+_READ_SIZE = 1 << 20
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Number of bytes scanned at once when locating the end of a member (the
+# first block is smaller, most values skipped are keys and short members)
+_SCAN_SIZE = 1 << 22
+_FIRST_SCAN_SIZE = 1 << 12
+
+_QUOTE, _BACKSLASH = ord('"'), ord("\\")
+# Change of the nesting depth at each byte value
+_BRACKET_DELTAS = np.zeros(256, dtype=np.int8)
+_BRACKET_DELTAS[list(b"[{")] = 1
+_BRACKET_DELTAS[list(b"]}")] = -1
+_SCALAR_END = re.compile(rb"[^,}\]\s]*")
+
+
+class ResultsEvent(NamedTuple):
+    """One step of the results stream.
+
+    Attributes:
+        kind: "begin" when a streamed object/array starts (payload is an empty
+              dict or list), "items" for a chunk of array elements, or "value"
+              for a fully decoded member
+        path: Tuple of keys leading to the payload, e.g.
+              ("benchmark_results", "experiments", "NAME_2")
+        payload: Decoded data for this event
+    """
+    kind: str
+    path: tuple
+    payload: object
+
+    @property
+    def section(self):
+        """Top-level key this event belongs to"""
+        return self.path[0]
+
+
+class _JsonStream:
+    """Pull-based reader that decodes one JSON value at a time from a text file.
+
+    Only the part of the file that has not been consumed yet is kept in memory,
+    so the buffer stays around the size of the largest single value.
+    """
+
+    def __init__(self, file, read_size=_READ_SIZE):
+        self.file = file
+        self.read_size = read_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, size=None):
+        """Append more of the file to the buffer, dropping the consumed prefix"""
+        if self.eof:
+            return False
+        chunk = self.file.read(size or self.read_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        self.buffer += chunk
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        """Consume the next non-whitespace character, which must be ``char``"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def accept(self, char):
+        """Consume the next non-whitespace character if it is ``char``"""
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        read_size = self.read_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # The value probably continues past the buffer; read more and retry.
+                # The refill size doubles so large values are not re-parsed too often.
+                if not self._fill(read_size):
+                    raise
+                read_size *= 2
+                continue
+            if end == len(self.buffer) and not self.eof and self._fill(read_size):
+                # A number could continue in the part of the file not read yet
+                read_size *= 2
+                continue
+            self.pos = end
+            return value
+
+
+def _walk_object(stream, path, chunk_size):
+    """Emit the members of the object starting at the stream position"""
+    stream.expect("{")
+    if stream.accept("}"):
+        return
+    while True:
+        key = stream.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", stream.buffer, stream.pos)
+        stream.expect(":")
+        yield from _walk_value(stream, path + (key,), chunk_size)
+        if stream.accept("}"):
+            return
+        stream.expect(",")
+
+
+def _walk_array(stream, path, chunk_size):
+    """Emit the elements of the array starting at the stream position in chunks"""
+    stream.expect("[")
+    if stream.accept("]"):
+        return
+    chunk = []
+    while True:
+        chunk.append(stream.value())
+        if len(chunk) >= chunk_size:
+            yield ResultsEvent("items", path, chunk)
+            chunk = []
+        if stream.accept("]"):
+            break
+        stream.expect(",")
+    if chunk:
+        yield ResultsEvent("items", path, chunk)
+
+
+def _walk_value(stream, path, chunk_size):
+    """Emit the value at ``path``, streaming it when it is a configured container"""
+    next_char = stream.peek()
+    if path in STREAMED_ARRAYS and next_char == "[":
+        yield ResultsEvent("begin", path, [])
+        yield from _walk_array(stream, path, chunk_size)
+    elif path in STREAMED_OBJECTS and next_char == "{":
+        yield ResultsEvent("begin", path, {})
+        yield from _walk_object(stream, path, chunk_size)
+    else:
+        yield ResultsEvent("value", path, stream.value())
+
+
+def iter_results(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Walk a results file as a stream of events.
+
+    Args:
+        file_path: Path to the results JSON file
+        chunk_size: Maximum number of energy records per "items" event
+
+    Yields:
+        ResultsEvent objects in file order
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid JSON object
+    """
+    with open(file_path, "r") as file:
+        stream = _JsonStream(file)
+        if stream.peek() != "{":
+            raise json.JSONDecodeError("Expecting a JSON object at the top level", stream.buffer, stream.pos)
+        yield from _walk_object(stream, (), chunk_size)
+        if stream.peek():
+            raise json.JSONDecodeError("Extra data", stream.buffer, stream.pos)
+
+
+def iter_array(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Walk a file holding one top-level JSON array (e.g. a scaphandre capture) in chunks.
+
+    Args:
+        file_path: Path to the JSON file
+        chunk_size: Maximum number of elements per chunk
+
+    Yields:
+        Lists of decoded array elements in file order
+
+    Raises:
+        json.JSONDecodeError: If the file is not a valid JSON array
+    """
+    with open(file_path, "r") as file:
+        stream = _JsonStream(file)
+        if stream.peek() != "[":
+            raise json.JSONDecodeError("Expecting a JSON array at the top level", stream.buffer, stream.pos)
+        for event in _walk_array(stream, (), chunk_size):
+            yield event.payload
+        if stream.peek():
+            raise json.JSONDecodeError("Extra data", stream.buffer, stream.pos)
+
+
+class _SpanReader:
+    """Text reader over a byte range of a binary file, for _JsonStream"""
+
+    def __init__(self, file, start, end):
+        file.seek(start)
+        self.file = file
+        self.remaining = end - start
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+
+    def read(self, size):
+        while True:
+            data = self.file.read(min(size, self.remaining))
+            self.remaining -= len(data)
+            text = self._decoder.decode(data, final=not data or not self.remaining)
+            # A read ending inside a multi-byte character decodes to nothing; read on
+            if text or not data or not self.remaining:
+                return text
+
+
+def _escaped(data, first_escaped):
+    """Mask of the bytes preceded by an escaping backslash
+
+    Args:
+        data: uint8 array of a block of the file
+        first_escaped: Whether the block starts right after an escaping backslash
+
+    Returns:
+        (mask, whether the byte after the block is escaped)
+    """
+    escaped = np.zeros(len(data) + 1, dtype=bool)
+    escaped[0] = first_escaped
+    # Backslashes only occur inside strings and are rare, so they are handled one by one
+    for position in np.flatnonzero(data == _BACKSLASH):
+        if not escaped[position]:
+            escaped[position + 1] = True
+    return escaped[:-1], bool(escaped[-1])
+
+
+def _value_end(file, start):
+    """Byte offset just past the JSON value starting at ``start``
+
+    Arrays, objects and strings are skipped by tracking the nesting depth and
+    the string state over whole blocks: only the positions of the quotes and
+    brackets are extracted, unescaped quotes toggle the string state and
+    brackets outside strings open or close a level.
+
+    Raises:
+        json.JSONDecodeError: If the value is not terminated
+    """
+    file.seek(start)
+    first = file.read(1)
+    if first not in (b"[", b"{", b'"'):
+        # Numbers, true, false and null end at the next delimiter
+        file.seek(start)
+        return start + _SCALAR_END.match(file.read(64)).end()
+
+    is_string = first == b'"'
+    offset = start
+    depth = 0
+    in_string = 0
+    escape_next = False
+    scan_size = _FIRST_SCAN_SIZE
+    file.seek(start)
+    while True:
+        block = file.read(scan_size)
+        scan_size = min(scan_size * 4, _SCAN_SIZE)
+        if not block:
+            raise json.JSONDecodeError("Unterminated value", "", start)
+        data = np.frombuffer(block, dtype=np.uint8)
+
+        quote_mask = data == _QUOTE
+        if escape_next or _BACKSLASH in block:
+            escaped, escape_next = _escaped(data, escape_next)
+            quote_mask &= ~escaped
+        quotes = np.flatnonzero(quote_mask)
+
+        if is_string:
+            # The opening quote is the first one seen, the value ends at the next
+            closing = 1 - in_string
+            if len(quotes) > closing:
+                return offset + int(quotes[closing]) + 1
+        else:
+            deltas = _BRACKET_DELTAS[data]
+            brackets = np.flatnonzero(deltas)
+            # A bracket is inside a string when an odd number of quotes precede it
+            inside = (np.searchsorted(quotes, brackets) + in_string) % 2 == 1
+            deltas = deltas[brackets].astype(np.int64)
+            deltas[inside] = 0
+            levels = depth + np.cumsum(deltas)
+            ends = np.flatnonzero(levels == 0)
+            if len(ends):
+                return offset + int(brackets[ends[0]]) + 1
+            if len(levels):
+                depth = int(levels[-1])
+        in_string = (in_string + len(quotes)) % 2
+        offset += len(block)
+
+
+class _ByteCursor:
+    """Reads the punctuation between the top-level members of a binary file"""
+
+    def __init__(self, file):
+        self.file = file
+        self.offset = 0
+
+    def peek(self):
+        """Return the next non-whitespace byte without consuming it (b"" at EOF)"""
+        while True:
+            self.file.seek(self.offset)
+            block = self.file.read(4096)
+            if not block:
+                return b""
+            stripped = block.lstrip(b" \t\n\r")
+            self.offset += len(block) - len(stripped)
+            if stripped:
+                return stripped[:1]
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char.decode()}'", "", self.offset)
+        self.offset += 1
+
+    def accept(self, char):
+        if self.peek() == char:
+            self.offset += 1
+            return True
+        return False
+
+
+def index_members(file_path):
+    """Locate the top-level members of a results file without decoding them.
+
+    Args:
+        file_path: Path to the results JSON file
+
+    Returns:
+        Dictionary of key to the (start, end) byte offsets of its value, in file order
+
+    Raises:
+        json.JSONDecodeError: If the file is not a JSON object or a value is not terminated
+    """
+    members = {}
+    with open(file_path, "rb") as file:
+        cursor = _ByteCursor(file)
+        cursor.expect(b"{")
+        if not cursor.accept(b"}"):
+            while True:
+                if cursor.peek() != b'"':
+                    raise json.JSONDecodeError("Expecting property name", "", cursor.offset)
+                key_start = cursor.offset
+                key_end = _value_end(file, key_start)
+                file.seek(key_start)
+                key = json.loads(file.read(key_end - key_start))
+                cursor.offset = key_end
+                cursor.expect(b":")
+                cursor.peek()
+                start = cursor.offset
+                end = _value_end(file, start)
+                members[key] = (start, end)
+                cursor.offset = end
+                if cursor.accept(b"}"):
+                    break
+                cursor.expect(b",")
+        if cursor.peek():
+            raise json.JSONDecodeError("Extra data", "", cursor.offset)
+    return members
+
+
+def iter_member(file_path, key, span, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Walk one top-level member located by index_members.
+
+    Args:
+        file_path: Path to the results JSON file
+        key: Key of the member
+        span: (start, end) byte offsets of its value
+        chunk_size: Maximum number of energy records per "items" event
+
+    Yields:
+        The ResultsEvent objects iter_results produces for this member
+    """
+    with open(file_path, "rb") as file:
+        stream = _JsonStream(_SpanReader(file, *span))
+        yield from _walk_value(stream, (key,), chunk_size)
+        if stream.peek():
+            raise json.JSONDecodeError("Extra data", stream.buffer, stream.pos)
+
+
+def merge_event(data, event):
+    """Apply a ResultsEvent to a plain dict so it mirrors the original JSON layout.
+
+    Args:
+        data: Dictionary being assembled (modified in place)
+        event: ResultsEvent produced by iter_results
+    """
+    parent = data
+    for key in event.path[:-1]:
+        parent = parent.setdefault(key, {})
+    key = event.path[-1]
+    if event.kind == "items":
+        parent.setdefault(key, []).extend(event.payload)
+    elif event.kind == "begin":
+        parent.setdefault(key, type(event.payload)())
+    else:
+        parent[key] = event.payload
+
+
+def replay_events(results, path=()):
+    """Yield the events iter_results produces for an already decoded part of a results file.
+
+    Used to hand results read from a cache to the same consumers as a file
+    being streamed.
+
+    Args:
+        results: Dictionary holding the decoded members (without energy samples)
+        path: Keys leading to ``results``
+
+    Yields:
+        ResultsEvent objects in dictionary order
+    """
+    for key, value in results.items():
+        member = path + (key,)
+        if member in STREAMED_OBJECTS and isinstance(value, dict):
+            yield ResultsEvent("begin", member, {})
+            yield from replay_events(value, member)
+        else:
+            yield ResultsEvent("value", member, value)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Binary scaphandre captures
+--------------------------
+Scaphandre writes its captures (``experiments_summary_apiserver.json`` and
+``experiments_summary_dbserver.json``) as one JSON array of host intervals,
+each with the list of its ``consumers``.  Parsing such a file takes longer
+than anything the visualizer does with it afterwards, and all of it has to
+fit in memory.  convert_capture() turns a capture into a fixed-width binary
+file once; open_capture() maps that file with ``numpy.memmap`` without
+parsing any records, so captures larger than the available RAM can be
+explored through the page cache.
+
+Layout (little endian):
+
+    preamble   8-byte magic, uint32 format version, uint32 header length,
+               uint64 offset of the first column
+    header     JSON: record and interval counts, the offset and dtype of
+               every column, and the string table
+    columns    one contiguous, 64-byte aligned block per column
+
+Consumer columns (one row per consumer record):
+
+    interval        int32    index of the host interval of the record
+    timestamps_ns   int64    record time in nanoseconds since the epoch
+    pid             int32    process id
+    consumption     float64  consumption as reported by scaphandre (microwatts)
+    container       int32    index into the container ids (-1 = no container)
+    process         int32    index into the (exe, cmdline) pairs
+
+Interval columns (one row per host interval):
+
+    interval_timestamps_ns   int64    time of the last record of the interval
+    host_timestamps_ns       int64    host timestamp
+    host_consumption         float64  host consumption (microwatts)
+
+The string table holds every distinct ``exe``/``cmdline`` value, the
+(exe, cmdline) pairs as indexes into it, and the container ids.  The pair
+indexes become the ``process`` column of the EnergyStore; processes are
+classified when the file is opened, once per pair, so the same file serves
+both visualizers.  The columns are stored one after the other rather than as
+an array of records: the energy stores work on columns, and fields of a
+packed record array are strided views that every search or sum would gather.
+
+Usage:
+    python scaphandre_binary.py experiments_summary_apiserver.json api.scb
+"""
+
+import argparse
+import json
+import os
+import shutil
+import struct
+import tempfile
+
+import numpy as np
+
+from energy_store import EnergyStore, timestamps_to_ns
+from results_loader import DEFAULT_CHUNK_SIZE, ENERGY_SECTIONS, iter_array
+
+MAGIC = b"SCAPHBIN"
+FORMAT_VERSION = 1
+FILE_EXTENSION = ".scb"
+
+_PREAMBLE = struct.Struct("<8sIIQ")
+_ALIGNMENT = 64
+
+CONSUMER_COLUMNS = (("interval", "<i4"), ("timestamps_ns", "<i8"), ("pid", "<i4"),
+                    ("consumption", "<f8"), ("container", "<i4"), ("process", "<i4"))
+INTERVAL_COLUMNS = (("interval_timestamps_ns", "<i8"), ("host_timestamps_ns", "<i8"), ("host_consumption", "<f8"))
+
+
+def _aligned(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def section_for_path(file_path):
+    """Guess the energy section of a capture from its file name (None if it names no server)"""
+    name = os.path.basename(file_path).lower()
+    if "apiserver" in name or "api_server" in name:
+        return ENERGY_SECTIONS[0]
+    if "dbserver" in name or "db_server" in name:
+        return ENERGY_SECTIONS[1]
+    return None
+
+
+class _CaptureEncoder:
+    """Appends host intervals to per-column scratch files, interning the strings"""
+
+    def __init__(self, directory):
+        self.files = {name: open(os.path.join(directory, name), "wb")
+                      for name, _ in CONSUMER_COLUMNS + INTERVAL_COLUMNS}
+        self.strings = {}
+        self.processes = {}
+        self.containers = {}
+        self.records = 0
+        self.intervals = 0
+
+    def _string(self, value):
+        return self.strings.setdefault(value, len(self.strings))
+
+    def _process(self, exe, cmdline):
+        return self.processes.setdefault((self._string(exe), self._string(cmdline)), len(self.processes))
+
+    def _container(self, container):
+        if not container:
+            return -1
+        return self.containers.setdefault(container.get("id") or "", len(self.containers))
+
+    def append(self, host_intervals):
+        """Encode a chunk of host intervals, skipping the same entries as EnergyStoreBuilder"""
+        columns = {name: [] for name, _ in CONSUMER_COLUMNS + INTERVAL_COLUMNS}
+        for host_interval in host_intervals:
+            interval_index = self.intervals + len(columns["interval_timestamps_ns"])
+            last_timestamp = None
+            for consumer in host_interval.get("consumers") or []:
+                timestamp = consumer.get("timestamp")
+                if timestamp is None:
+                    continue
+                last_timestamp = timestamp
+                value = consumer.get("consumption", 0.0)
+                columns["interval"].append(interval_index)
+                columns["timestamps_ns"].append(timestamp)
+                columns["pid"].append(consumer.get("pid") or 0)
+                columns["consumption"].append(np.nan if value is None else value)
+                columns["container"].append(self._container(consumer.get("container")))
+                columns["process"].append(self._process(consumer.get("exe") or "", consumer.get("cmdline") or ""))
+
+            host_info = host_interval.get("host") or {}
+            host_timestamp = host_info.get("timestamp")
+            host_value = host_info.get("consumption")
+            if host_timestamp is None or host_value is None:
+                host_timestamp, host_value = last_timestamp, np.nan
+            if last_timestamp is None:
+                last_timestamp = host_timestamp
+            if last_timestamp is None:
+                continue  # Nothing in this interval carries a timestamp
+
+            columns["interval_timestamps_ns"].append(last_timestamp)
+            columns["host_timestamps_ns"].append(host_timestamp)
+            columns["host_consumption"].append(host_value)
+
+        for name, dtype in CONSUMER_COLUMNS + INTERVAL_COLUMNS:
+            if name.endswith("timestamps_ns"):
+                values = timestamps_to_ns(columns[name])
+            else:
+                values = np.asarray(columns[name], dtype=dtype)
+            values.astype(dtype, copy=False).tofile(self.files[name])
+        self.records += len(columns["interval"])
+        self.intervals += len(columns["interval_timestamps_ns"])
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+
+
+def convert_capture(json_path, output_path, section=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Convert a scaphandre JSON capture to the binary layout.
+
+    The capture is streamed, so only one chunk of host intervals is held in
+    memory at a time; the columns are staged in scratch files next to the
+    output and copied into place once the counts are known.
+
+    Args:
+        json_path: Path of the JSON capture (an array of host intervals)
+        output_path: Path of the binary file to write
+        section: Energy section the capture belongs to (default: guessed
+                 from the file name, see section_for_path)
+        chunk_size: Number of host intervals decoded at once
+
+    Returns:
+        Tuple (number of consumer records, number of host intervals)
+    """
+    scratch = tempfile.mkdtemp(prefix=".scaphandre-", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        encoder = _CaptureEncoder(scratch)
+        try:
+            for chunk in iter_array(json_path, chunk_size):
+                encoder.append(chunk)
+        finally:
+            encoder.close()
+
+        header = {
+            "section": section or section_for_path(json_path),
+            "records": encoder.records,
+            "intervals": encoder.intervals,
+            "columns": {},
+            "strings": list(encoder.strings),
+            "processes": [list(pair) for pair in encoder.processes],
+            "container_ids": list(encoder.containers),
+        }
+        offset = 0
+        for name, dtype in CONSUMER_COLUMNS + INTERVAL_COLUMNS:
+            header["columns"][name] = {"dtype": dtype, "offset": offset}
+            offset = _aligned(offset + os.path.getsize(os.path.join(scratch, name)))
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_offset = _aligned(_PREAMBLE.size + len(header_bytes))
+
+        with open(output_path, "wb") as output:
+            output.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes), data_offset))
+            output.write(header_bytes)
+            for name, _ in CONSUMER_COLUMNS + INTERVAL_COLUMNS:
+                output.seek(data_offset + header["columns"][name]["offset"])
+                with open(os.path.join(scratch, name), "rb") as column:
+                    shutil.copyfileobj(column, output)
+            output.truncate()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    return encoder.records, encoder.intervals
+
+
+def read_header(file_path):
+    """Return (header dictionary, offset of the first column) of a binary capture.
+
+    Raises:
+        ValueError: If the file is not a binary capture of a supported version
+    """
+    with open(file_path, "rb") as file:
+        preamble = file.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{file_path} is not a binary scaphandre capture")
+        magic, version, header_length, data_offset = _PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{file_path} is not a binary scaphandre capture")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary capture version {version} in {file_path}")
+        return json.loads(file.read(header_length).decode("utf-8")), data_offset
+
+
+def open_capture(file_path, classify, nested=True):
+    """Map a binary capture into an EnergyStore without parsing its records.
+
+    Args:
+        file_path: Path of the binary capture
+        classify: Function (exe, cmdline) -> CATEGORY_* bitmask, called once
+                  per distinct (exe, cmdline) pair
+        nested: Keep the host intervals (containers visualizer); False gives
+                a store of flat samples (scaphandre visualizer)
+
+    Returns:
+        Tuple (EnergyStore backed by read-only memory maps, header dictionary)
+    """
+    header, data_offset = read_header(file_path)
+
+    def column(name, dtype, count):
+        if not count:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode="r", offset=data_offset + header["columns"][name]["offset"],
+                         shape=(count,))
+
+    columns = {name: column(name, dtype, header["records"]) for name, dtype in CONSUMER_COLUMNS}
+    columns.update({name: column(name, dtype, header["intervals"]) for name, dtype in INTERVAL_COLUMNS})
+
+    strings = header["strings"]
+    categories = np.array([classify(strings[exe], strings[cmdline]) for exe, cmdline in header["processes"]],
+                          dtype=np.uint8)
+    store = EnergyStore(columns["timestamps_ns"], columns["consumption"], columns["pid"],
+                        categories[columns["process"]] if len(categories) else np.empty(0, dtype=np.uint8),
+                        container=columns["container"], container_ids=header["container_ids"],
+                        process=columns["process"],
+                        processes=[(strings[exe], strings[cmdline]) for exe, cmdline in header["processes"]])
+    if nested:
+        store.interval = columns["interval"]
+        store.interval_timestamps_ns = columns["interval_timestamps_ns"]
+        store.host_timestamps_ns = columns["host_timestamps_ns"]
+        store.host_consumption = columns["host_consumption"]
+    store._time_index()
+    return store, header
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a scaphandre JSON capture to the binary layout")
+    parser.add_argument("capture", help="scaphandre JSON capture (array of host intervals)")
+    parser.add_argument("output", nargs="?", help=f"binary file to write (default: capture name with {FILE_EXTENSION})")
+    parser.add_argument("--section", choices=ENERGY_SECTIONS,
+                        help="energy section of the capture (default: guessed from the file name)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.splitext(args.capture)[0] + FILE_EXTENSION
+    records, intervals = convert_capture(args.capture, output, args.section)
+    print(f"Wrote {records} records in {intervals} host intervals to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Memoization of processed plot series
+------------------------------------
+Changing the plot type, toggling a host series or switching between related
+data sources redraws the same windowed series again.  The visualizers keep
+the results of the filtering and windowing steps here, keyed by
+``(source, target_type, window_size_ms, start_time_ms, end_time_ms)``, and
+clear the cache whenever new data is loaded.
+
+The cache is shared between the Tk main thread and the plot worker thread.
+Values are computed outside the lock; a value whose computation started
+before the last clear() is returned to its caller but not stored.
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 64
+
+
+class SeriesCache:
+    """Bounded cache with least-recently-used eviction.
+
+    Args:
+        max_entries: Number of series kept before the least recently used
+                     one is evicted
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Hashable cache key
+            compute: Callable without arguments producing the value
+
+        Returns:
+            The cached or newly computed value
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        """Drop all cached series (called when the underlying data changes)"""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
@@ -0,0 +1,410 @@
+"""
+Parallel session loading
+------------------------
+Hardware comparisons need the results of several machines at once (e.g. the
+AMD and INTEL runs of ``ansible-benchmark``), each with its PowerAPI API and
+DB exports.  Loading them one file at a time parses everything on a single
+core.  load_session() takes a set of files and directories, recognizes the
+files it can use and parses them in parallel worker processes:
+
+    results     results file (``benchmark_results`` and the energy sections)
+    capture     scaphandre JSON capture, an array of host intervals
+                (``experiments_summary_apiserver.json``)
+    binary      binary scaphandre capture (see scaphandre_binary.py)
+    powerapi    PowerAPI export, an array of reports with ``target`` and ``power``
+
+Other JSON files (sensor and formula configurations, ...) are skipped.
+
+A worker builds the columnar representation of its file (EnergyStore,
+PowerAPIIndex) and copies the columns into one shared memory block.  The
+GUI process maps that block and wraps numpy arrays around it, so the columns
+are never pickled or copied.  Binary captures and files in the results cache
+are memory-mapped by the GUI process directly.
+
+Every results file becomes a SessionDataset.  The captures and PowerAPI
+exports in the same directory are attached to it: a capture replaces the
+energy section of its server, and an export is used as the PowerAPI data of
+the API or DB server, depending on its file name.  The shared memory of a
+session is released by Session.close(), when the session is garbage
+collected, or at exit.
+"""
+
+import json
+import multiprocessing
+import os
+import re
+import weakref
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from energy_store import EnergyStoreBuilder
+from powerapi_index import PowerAPIIndex
+from results_cache import INTERVAL_COLUMNS, cache_variant, open_store, store_columns
+from results_loader import ENERGY_SECTIONS, index_members, iter_array, iter_member, merge_event
+from scaphandre_binary import FILE_EXTENSION, open_capture, read_header, section_for_path
+
+# Kinds of files a session can hold (see classify_file)
+FILE_KINDS = ("results", "capture", "binary", "powerapi")
+
+# Top-level keys a results file starts with
+RESULTS_KEYS = ENERGY_SECTIONS + ("benchmark_results", "container_info")
+
+# Columns are placed at multiples of this offset in a shared memory block
+_ALIGNMENT = 64
+
+_FIRST_KEY = re.compile(rb'\s*\{\s*"((?:[^"\\]|\\.)*)"')
+
+
+def classify_file(file_path):
+    """Return what a file of a session holds ("results", "capture", "binary" or "powerapi"), or None"""
+    if file_path.endswith(FILE_EXTENSION):
+        try:
+            read_header(file_path)
+        except (OSError, ValueError):
+            return None
+        return "binary"
+    if not file_path.endswith(".json"):
+        return None
+
+    try:
+        with open(file_path, "rb") as file:
+            head = file.read(4096)
+        if head.lstrip().startswith(b"{"):
+            match = _FIRST_KEY.match(head)
+            return "results" if match and json.loads(b'"' + match.group(1) + b'"') in RESULTS_KEYS else None
+        if head.lstrip().startswith(b"["):
+            first = next(iter_array(file_path, chunk_size=1), [None])[0]
+            if isinstance(first, dict) and ("consumers" in first or "host" in first):
+                return "capture"
+            if isinstance(first, dict) and "target" in first and "power" in first:
+                return "powerapi"
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def find_session_files(paths, kinds=FILE_KINDS):
+    """Expand directories and keep the files a session can use.
+
+    Args:
+        paths: Files and directories
+        kinds: Kinds of files to keep (see classify_file)
+
+    Returns:
+        List of (file path, kind) sorted by path
+    """
+    candidates = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                candidates.update(os.path.join(directory, name) for name in names)
+        else:
+            candidates.add(path)
+    files = [(path, classify_file(path)) for path in sorted(os.path.abspath(path) for path in candidates)]
+    return [(path, kind) for path, kind in files if kind in kinds]
+
+
+def powerapi_role(file_path):
+    """Server a PowerAPI export belongs to, from its file name ("api", "db" or None)"""
+    name = os.path.basename(file_path).lower().replace("powerapi", "")
+    if "db" in name:
+        return "db"
+    if "api" in name:
+        return "api"
+    return None
+
+
+def read_results(file_path, classify, nested, filters=None):
+    """Parse a whole results file into its non-energy part and an EnergyStore per energy section.
+
+    Args:
+        file_path: Path of the results file
+        classify: Function (exe, cmdline) -> CATEGORY_* bitmask
+        nested: Keep the host intervals (containers visualizer)
+        filters: Optional LoadFilters
+
+    Returns:
+        (results dictionary, dictionary of EnergyStore per energy section)
+    """
+    members = index_members(file_path)
+    results = {}
+    for key, span in members.items():
+        if key not in ENERGY_SECTIONS:
+            for event in iter_member(file_path, key, span):
+                merge_event(results, event)
+
+    windows_ns = filters.run_windows_ns(results) if filters is not None else None
+    energy_stores = {}
+    for section, span in members.items():
+        if section not in ENERGY_SECTIONS:
+            continue
+        builder = None
+        for event in iter_member(file_path, section, span):
+            if event.kind == "value":
+                merge_event(results, event)
+                continue
+            if builder is None:
+                builder = EnergyStoreBuilder(classify, nested=nested, filters=filters, windows_ns=windows_ns)
+            if event.kind == "items":
+                builder.append(event.payload)
+        if builder is not None:
+            energy_stores[section] = builder.build()
+    return results, energy_stores
+
+
+def _share(columns):
+    """Copy columns into a new shared memory block
+
+    Returns:
+        (block name, {column: (dtype, offset, length)}); the block is left for the receiver to map and unlink
+    """
+    layout = {}
+    size = 0
+    for name, values in columns.items():
+        layout[name] = (values.dtype.str, size, len(values))
+        size = -(-(size + values.nbytes) // _ALIGNMENT) * _ALIGNMENT
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for name, values in columns.items():
+            dtype, offset, length = layout[name]
+            np.ndarray(length, dtype=dtype, buffer=block.buf, offset=offset)[:] = values
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    return block.name, layout
+
+
+def _load_in_worker(file_path, kind, classify, nested, filters, powerapi_sample_size, cache, variant):
+    """Parse one file in a worker process and move its columns to shared memory
+
+    Returns:
+        Dictionary with the shared blocks and the metadata to rebuild the file's data (see Session._attach)
+    """
+    if kind == "powerapi":
+        with open(file_path, "r") as file:
+            reports = json.load(file)
+        if not isinstance(reports, list):
+            raise ValueError("Expected a list of PowerAPI reports")
+        columns, meta = PowerAPIIndex.from_reports(reports, sample_size=powerapi_sample_size).to_columns()
+        return {"powerapi": (_share(columns), meta)}
+
+    if kind == "results":
+        results, energy_stores = read_results(file_path, classify, nested, filters)
+        if cache is not None:
+            try:
+                cache.store(file_path, results, energy_stores, variant)
+            except (OSError, TypeError, ValueError):
+                pass  # The next session parses the file again
+    else:
+        section = section_for_path(file_path)
+        if section is None:
+            raise ValueError("Cannot tell which server the capture belongs to from its file name")
+        # Captures are grouped in host intervals; the flat visualizer only keeps the samples
+        builder = EnergyStoreBuilder(classify, nested=True, filters=filters)
+        for chunk in iter_array(file_path):
+            builder.append(chunk)
+        results, energy_stores = None, {section: builder.build()}
+
+    sections = {}
+    for section, store in energy_stores.items():
+        columns, meta = store_columns(store)
+        if not nested:
+            columns = {name: values for name, values in columns.items() if name not in INTERVAL_COLUMNS}
+            meta["nested"] = False
+        sections[section] = (_share(columns), meta)
+    return {"results": results, "sections": sections}
+
+
+def _release(blocks):
+    """Unlink shared memory blocks; mappings still in use stay valid until they are dropped"""
+    for block in blocks:
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            block.close()
+        except BufferError:
+            pass  # Arrays around the block are still referenced; the mapping goes with them
+
+
+def _discard(loaded):
+    """Release the shared memory of a worker result that will not be used"""
+    shared = [shared for shared, _ in loaded.get("sections", {}).values()]
+    if "powerapi" in loaded:
+        shared.append(loaded["powerapi"][0])
+    for name, _ in shared:
+        try:
+            block = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        _release([block])
+
+
+class SessionDataset:
+    """One results file of a session, with the energy data and PowerAPI exports next to it.
+
+    Attributes:
+        name: Path of the results file relative to the common directory of the session
+        file_path: Path of the results file
+        results: Non-energy part of the results file
+        energy_stores: Dictionary of EnergyStore per energy section
+        powerapi: Dictionary of "api"/"db" to (file path, PowerAPIIndex)
+    """
+
+    def __init__(self, name, file_path, results, energy_stores, powerapi=None):
+        self.name = name
+        self.file_path = file_path
+        self.results = results
+        self.energy_stores = energy_stores
+        self.powerapi = powerapi or {}
+
+
+class Session:
+    """Datasets loaded together, backed by shared memory until closed.
+
+    Attributes:
+        datasets: List of SessionDataset, by file path
+        errors: List of (file path, message) of the files that could not be used
+    """
+
+    def __init__(self):
+        self.datasets = []
+        self.errors = []
+        self._blocks = []
+        self._finalizer = weakref.finalize(self, _release, self._blocks)
+
+    def close(self):
+        """Release the shared memory of the session"""
+        self._finalizer()
+
+    def _attach(self, shared):
+        """Map a shared block and return its columns as arrays"""
+        name, layout = shared
+        block = shared_memory.SharedMemory(name=name)
+        self._blocks.append(block)
+        return {column: np.ndarray(length, dtype=dtype, buffer=block.buf, offset=offset)
+                for column, (dtype, offset, length) in layout.items()}
+
+    def _open_loaded(self, loaded):
+        """Rebuild the data of a file from a worker result
+
+        Returns:
+            (results or None, {section: EnergyStore}, PowerAPIIndex or None)
+        """
+        if "powerapi" in loaded:
+            shared, meta = loaded["powerapi"]
+            return None, {}, PowerAPIIndex.from_columns(self._attach(shared), meta)
+        energy_stores = {section: open_store(self._attach(shared), meta)
+                         for section, (shared, meta) in loaded["sections"].items()}
+        return loaded["results"], energy_stores, None
+
+
+def load_session(paths, classify, nested=True, kinds=FILE_KINDS, filters=None, powerapi_sample_size=None,
+                 cache=None, cache_namespace="", max_workers=None, check=None, progress=None):
+    """Load results files, captures and PowerAPI exports in parallel worker processes.
+
+    Args:
+        paths: Files and directories to load (see find_session_files)
+        classify: Function (exe, cmdline) -> CATEGORY_* bitmask; it is sent to
+                  the workers, so it must be a module-level function
+        nested: Keep the host intervals (containers visualizer)
+        kinds: Kinds of files to load (see classify_file)
+        filters: Optional LoadFilters applied to the energy data
+        powerapi_sample_size: Validate only a sample of the PowerAPI reports (see PowerAPIIndex.from_reports)
+        cache: Optional ResultsCache; cached results files are memory-mapped
+               instead of parsed, and parsed ones are added to it
+        cache_namespace: Name of the process classification in the cache (see results_cache.cache_variant)
+        max_workers: Number of worker processes (default: one per CPU, at most one per file)
+        check: Called after each file; raising from it cancels the load
+        progress: Called with (files done, number of files, file path) after each file
+
+    Returns:
+        Session
+    """
+    files = find_session_files(paths, kinds)
+    session = Session()
+    variant = cache_variant(cache_namespace, nested, filters)
+    opened = {}  # file path -> (kind, results, energy stores, PowerAPIIndex)
+
+    def done(file_path):
+        if progress is not None:
+            progress(len(opened) + len(session.errors), len(files), file_path)
+        if check is not None:
+            check()
+
+    to_parse = []
+    for file_path, kind in files:
+        try:
+            cached = cache.load(file_path, variant, nested=nested) if kind == "results" and cache is not None else None
+            if kind == "binary":
+                store, header = open_capture(file_path, classify, nested=nested)
+                section = header.get("section") or section_for_path(file_path)
+                if section is None:
+                    raise ValueError("Cannot tell which server the capture belongs to")
+                opened[file_path] = (kind, None, {section: store}, None)
+            elif cached is not None:
+                results, energy_stores = cached
+                opened[file_path] = (kind, results, energy_stores, None)
+            else:
+                to_parse.append((file_path, kind))
+                continue
+        except (OSError, ValueError) as e:
+            session.errors.append((file_path, str(e)))
+        done(file_path)
+
+    if to_parse:
+        max_workers = min(max_workers or os.cpu_count() or 1, len(to_parse))
+        # Worker processes are started fresh: forking a GUI process with threads is not safe
+        pool = ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context("spawn"))
+        futures = {pool.submit(_load_in_worker, file_path, kind, classify, nested, filters,
+                               powerapi_sample_size, cache, variant): (file_path, kind) for file_path, kind in to_parse}
+        attached = set()
+        try:
+            for future in as_completed(futures):
+                file_path, kind = futures[future]
+                attached.add(future)
+                try:
+                    results, energy_stores, index = session._open_loaded(future.result())
+                    opened[file_path] = (kind, results, energy_stores, index)
+                except Exception as e:
+                    session.errors.append((file_path, str(e)))
+                done(file_path)
+        except BaseException:
+            # Cancelled: the blocks of files finished but not attached would outlive the session
+            pool.shutdown(wait=True, cancel_futures=True)
+            for future in futures:
+                if future not in attached and future.done() and not future.cancelled() and future.exception() is None:
+                    _discard(future.result())
+            session.close()
+            raise
+        pool.shutdown()
+
+    # Datasets by results file, with the captures and exports of the same directory
+    results_files = sorted(file_path for file_path, (kind, *_) in opened.items() if kind == "results")
+    root = os.path.commonpath(results_files) if len(results_files) > 1 else None
+    for file_path in results_files:
+        _, results, energy_stores, _ = opened[file_path]
+        name = os.path.relpath(file_path, root) if root else os.path.basename(file_path)
+        session.datasets.append(SessionDataset(name, file_path, results, dict(energy_stores)))
+    for file_path, (kind, _, energy_stores, index) in sorted(opened.items()):
+        if kind == "results":
+            continue
+        datasets = [dataset for dataset in session.datasets
+                    if os.path.dirname(dataset.file_path) == os.path.dirname(file_path)]
+        role = powerapi_role(file_path) if kind == "powerapi" else None
+        if not datasets:
+            session.errors.append((file_path, "No results file in the same directory"))
+        elif kind == "powerapi" and role is None:
+            session.errors.append((file_path, "Cannot tell from the file name whether it is the API or DB export"))
+        else:
+            for dataset in datasets:
+                if kind == "powerapi":
+                    dataset.powerapi[role] = (file_path, index)
+                else:
+                    dataset.energy_stores.update(energy_stores)
+    return session
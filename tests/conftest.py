@@ -0,0 +1,6 @@
+"""The visualizer modules live at the repository root and are imported as top-level modules"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
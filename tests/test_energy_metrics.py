@@ -0,0 +1,58 @@
+"""Checks of the energy integration against results_example.json (run with ``python -m pytest``)"""
+
+import json
+import os
+
+import numpy as np
+
+from energy_metrics import PowerSeries, sum_per_sample
+from energy_store import timestamps_to_ns
+
+EXAMPLE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "results_example.json")
+
+
+def _process_series(section, exe_name):
+    with open(EXAMPLE_FILE) as file:
+        records = [record for record in json.load(file)[section] if exe_name in (record["exe"] or "")]
+    timestamps_ns = timestamps_to_ns([record["timestamp"] for record in records])
+    watts = np.array([record["consumption"] for record in records], dtype=np.float64) / 1_000_000.0
+    pid = np.array([record["pid"] for record in records])
+    return timestamps_ns, watts, pid
+
+
+def test_processes_are_summed_per_scaphandre_sample():
+    timestamps_ns, watts, pid = _process_series("db_server_energy", "postgres")
+    sample_ns, sample_watts = sum_per_sample(timestamps_ns, watts, pid)
+
+    # Seven postgres processes per sample, each stamped microseconds apart
+    assert len(sample_ns) == 3
+    assert np.isclose(sample_watts.sum(), watts.sum())
+
+
+def test_postgres_energy_covers_the_capture():
+    timestamps_ns, watts, pid = _process_series("db_server_energy", "postgres")
+    series = PowerSeries(*sum_per_sample(timestamps_ns, watts, pid))
+    joules, covered_s = series.integrate([timestamps_ns.min()], [timestamps_ns.max()])
+
+    # The ~90 ms steps between samples are integrated, not treated as capture gaps
+    assert covered_s[0] > 0.17
+    assert 0.02 < joules[0] < 0.1
+
+
+def test_gaps_longer_than_five_intervals_are_not_integrated():
+    # 1 s sampling at 10 W with the capture stopped for 10 s after the third sample
+    timestamps_ns = np.array([0, 1, 2, 12, 13, 14]) * 1_000_000_000
+    series = PowerSeries(timestamps_ns, np.full(6, 10.0))
+    joules, covered_s = series.integrate([timestamps_ns[0]], [timestamps_ns[-1]])
+
+    assert np.isclose(covered_s[0], 4.0)
+    assert np.isclose(joules[0], 40.0)
+
+
+def test_gaps_up_to_five_intervals_are_integrated():
+    timestamps_ns = np.array([0, 1, 2, 7, 8, 9]) * 1_000_000_000
+    series = PowerSeries(timestamps_ns, np.full(6, 10.0))
+    joules, covered_s = series.integrate([timestamps_ns[0]], [timestamps_ns[-1]])
+
+    assert np.isclose(covered_s[0], 9.0)
+    assert np.isclose(joules[0], 90.0)
@@ -0,0 +1,52 @@
+"""
+Batch timestamp conversion
+--------------------------
+The visualizers display every time axis in a local timezone (EET).  Converting
+one timestamp at a time with ``datetime.fromtimestamp`` and ``astimezone``
+costs more than the plotting once there are hundreds of thousands of points,
+so whole arrays are converted here in a single pandas call.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Epoch timestamps above this value are milliseconds, below it seconds
+MILLISECONDS_THRESHOLD = 1e10
+
+
+def to_milliseconds(timestamps, unit="ms"):
+    """Convert epoch timestamps to a float64 array of milliseconds.
+
+    Args:
+        timestamps: Sequence or array of epoch timestamps
+        unit: "ms", "s", or "auto" to treat values above 1e10 as milliseconds
+              and the rest as seconds
+
+    Returns:
+        float64 NumPy array of milliseconds
+    """
+    values = np.asarray(timestamps, dtype=np.float64)
+    if unit == "s":
+        return values * 1000.0
+    if unit == "auto":
+        return np.where(values > MILLISECONDS_THRESHOLD, values, values * 1000.0)
+    return values
+
+
+def to_display_datetimes(timestamps, display_timezone, unit="ms"):
+    """Convert epoch timestamps to timezone-aware datetimes in one call.
+
+    Args:
+        timestamps: Sequence or array of epoch timestamps
+        display_timezone: Timezone of the result (pytz timezone or name)
+        unit: "ms", "s", or "auto" (see to_milliseconds)
+
+    Returns:
+        pandas DatetimeIndex (datetime64[ns, display_timezone])
+    """
+    milliseconds = to_milliseconds(timestamps, unit)
+
+    # Split whole and fractional milliseconds so epoch values keep sub-millisecond precision in nanoseconds
+    whole = np.floor(milliseconds)
+    nanoseconds = whole.astype(np.int64) * 1_000_000 + np.rint((milliseconds - whole) * 1_000_000).astype(np.int64)
+    return pd.to_datetime(nanoseconds, unit="ns", utc=True).tz_convert(display_timezone)
@@ -1,17 +1,49 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import json
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 import pytz  # For timezone handling
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.dates import DateFormatter
 import matplotlib.dates as mdates
 import matplotlib.ticker as mticker
+from results_loader import ENERGY_SECTIONS, index_members, iter_member, merge_event, replay_events
+from results_cache import ResultsCache, cache_variant
+from load_filters import FILTER_NAMES, LoadFilters
+from scaphandre_binary import FILE_EXTENSION, open_capture, section_for_path
+from session_loader import load_session
+from time_utils import to_display_datetimes
+from series_cache import SeriesCache
+from background import BackgroundWorker, post_to_main_thread
+from plot_scheduler import ReplotScheduler
+from plot_artists import FigureArtists
+from zoom import ZoomRefresher
+from dataset_catalog import DatasetCatalog
+from energy_metrics import TABLE_COLUMNS, TABLE_HEADINGS, PowerSeries, efficiency_table, format_table, sum_per_sample
+from energy_store import CATEGORY_JAVA, CATEGORY_POSTGRES, NS_PER_MS, EnergyStore, EnergyStoreBuilder, window_sums
+
+# Process classification and layout of this visualizer in the results cache shared by both visualizers
+CACHE_NAMESPACE = "scaphandre"
+NESTED = False
+
+
+def _classify_process(exe, cmdline):
+    """Return the CATEGORY_* bitmask of a scaphandre process sample"""
+    # Skip scaphandre processes and empty entries
+    if "scaphandre" in cmdline or "scaphandre" in exe or (not cmdline and not exe):
+        return 0
+
+    category = 0
+    if "java" in cmdline or "java" in exe:
+        category |= CATEGORY_JAVA
+    if "postgres" in cmdline:
+        category |= CATEGORY_POSTGRES
+    return category
+
 
 class ExperimentVisualizer:
     def __init__(self, root):
@@ -19,6 +51,33 @@ class ExperimentVisualizer:
         self.root.title("Experiment Energy Consumption Visualizer")
         self.root.geometry("1200x800")
         self.data = None
+        # Columnar scaphandre data per energy section, built while loading
+        self.energy_stores = {}
+        # Processed series reused across redraws; cleared whenever data is loaded
+        self.series_cache = SeriesCache()
+        # Boundaries and counts of the loaded data; rebuilt on first use after a change
+        self._catalog = None
+        # Parsed results files are kept on disk and memory-mapped when reopened (RESULTS_CACHE* variables)
+        self.results_cache = ResultsCache.from_environment()
+        # Records dropped while loading (ENERGY_LOAD_FILTERS or File > Load Options); used by the next load
+        self.load_filters = LoadFilters.from_environment()
+        self.load_filter_vars = {attribute: tk.BooleanVar(value=getattr(self.load_filters, attribute))
+                                 for attribute in FILTER_NAMES.values()}
+        # Energy sections of the loaded file that are located but not parsed yet (see _load_deferred_energy)
+        self._deferred_energy = None
+        self._deferred_energy_job = None
+        self._deferred_energy_callbacks = []
+        # Files loaded together in worker processes (Session menu); its arrays live in shared memory
+        self.session = None
+        self.session_dataset_var = tk.StringVar()
+        # File parsing and series processing run off the Tk main thread
+        self.load_worker = BackgroundWorker(root, "results-loader")
+        self.plot_worker = BackgroundWorker(root, "plot-data")
+        # Deferred energy sections are parsed on their own worker, so starting that parse never cancels a load
+        self.energy_worker = BackgroundWorker(root, "energy-loader")
+        # Control bar changes are merged into one plot update per burst of changes
+        self.replot_scheduler = ReplotScheduler(root, self._get_plot_inputs, self.update_plot, self._redraw_plot,
+                                                render_only_inputs=("plot_type", "accumulation"))
         # Use EET timezone for display
         self.display_timezone = pytz.timezone('Europe/Kiev')  # East European Time
         
@@ -57,12 +116,27 @@ class ExperimentVisualizer:
         menu_bar = tk.Menu(self.root)
         file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Load Data", command=self.load_data)
+        file_menu.add_command(label="Open Binary Energy Capture...", command=self.load_binary_capture)
+        load_options_menu = tk.Menu(file_menu, tearoff=0)
+        for attribute, label in (("drop_zero_consumption", "Skip Zero-Consumption Processes"),
+                                 ("known_processes_only", "Only Java, Postgres and Container Processes"),
+                                 ("run_windows_only", "Only Samples Inside Runs")):
+            load_options_menu.add_checkbutton(label=label, variable=self.load_filter_vars[attribute],
+                                              command=self._update_load_filters)
+        file_menu.add_cascade(label="Load Options", menu=load_options_menu)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         menu_bar.add_cascade(label="File", menu=file_menu)
         
+        self.session_menu = tk.Menu(menu_bar, tearoff=0)
+        self.session_menu.add_command(label="Open Session Files...", command=self.open_session_files)
+        self.session_menu.add_command(label="Open Session Directory...", command=self.open_session_directory)
+        self.session_menu.add_command(label="Close Session", command=self.close_session)
+        menu_bar.add_cascade(label="Session", menu=self.session_menu)
+        
         view_menu = tk.Menu(menu_bar, tearoff=0)
         view_menu.add_command(label="Reset Plot View", command=self.reset_plot_view)
+        view_menu.add_command(label="Energy Efficiency...", command=self.show_energy_efficiency)
         menu_bar.add_cascade(label="View", menu=view_menu)
         
         self.root.config(menu=menu_bar)
@@ -79,6 +153,109 @@ class ExperimentVisualizer:
         style.configure('Big.TButton', font=('Arial', 11, 'bold'))
         load_button.configure(style='Big.TButton')
     
+    def show_energy_efficiency(self):
+        """Show the energy efficiency of every run and experiment in a table window"""
+        if self._load_deferred_energy(self.show_energy_efficiency):
+            return  # Shown once the energy data is read
+        if not self.data or not self.energy_stores:
+            messagebox.showinfo("Energy Efficiency", "Load a results file with energy data first.")
+            return
+        
+        started = time.perf_counter()
+        table = self.get_energy_efficiency_table()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        window = tk.Toplevel(self.root)
+        window.title("Energy Efficiency")
+        window.geometry("1100x500")
+        
+        tree_frame = ttk.Frame(window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=TABLE_COLUMNS, show="headings")
+        for column in TABLE_COLUMNS:
+            tree.heading(column, text=TABLE_HEADINGS[column])
+            tree.column(column, width=90, anchor=tk.W if column in ("experiment", "run", "source") else tk.E)
+        for values in format_table(table):
+            tree.insert("", tk.END, values=values)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        ttk.Button(window, text="Export CSV...", command=lambda: self._export_energy_efficiency(table)).pack(side=tk.RIGHT, padx=5, pady=5)
+        ttk.Label(window, text="Energy is the trapezoidal integral of the power samples over each run; "
+                               "gaps in the capture are not bridged.").pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.status_var.set(f"Energy efficiency of {len(table)} run/source rows computed in {elapsed_ms:.0f} ms")
+    
+    def _export_energy_efficiency(self, table):
+        """Save an energy efficiency table as CSV"""
+        file_path = filedialog.asksaveasfilename(
+            title="Export Energy Efficiency",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        table.to_csv(file_path, index=False)
+        self.status_var.set(f"Energy efficiency exported to {os.path.basename(file_path)}")
+    
+    def _get_efficiency_runs(self):
+        """DataFrame of the runs with time boundaries, for efficiency_table()"""
+        records = []
+        experiments = self.data.get("benchmark_results", {}).get("experiments", {})
+        for experiment_id, experiment in experiments.items():
+            runs = experiment.get("runs") or []
+            for run_number, start_time_ms, end_time_ms in self._get_run_time_boundaries(experiment_id):
+                run = runs[run_number - 1]
+                records.append({
+                    "experiment": experiment_id,
+                    "run": run_number,
+                    "start_ms": int(start_time_ms),
+                    "end_ms": int(end_time_ms),
+                    "requests": run.get("total_requests", np.nan),
+                    "successful_requests": run.get("successful_requests", np.nan),
+                })
+        return pd.DataFrame(records, columns=["experiment", "run", "start_ms", "end_ms", "requests", "successful_requests"])
+    
+    def get_energy_efficiency_table(self):
+        """Energy, average power and energy per request of every run and experiment (see energy_metrics.py)
+        
+        Returns:
+            DataFrame with one row per run and source (API server Java, DB server Postgres),
+            and per experiment and source
+        """
+        sources = {}
+        for name, section, process_type in [("API server (Java)", "api_server_energy", "java"),
+                                            ("DB server (Postgres)", "db_server_energy", "postgres")]:
+            series = self._get_power_series(section, process_type)
+            if series is not None and len(series):
+                sources[name] = series
+        return efficiency_table(self._get_efficiency_runs(), sources)
+    
+    def _get_power_series(self, section, process_type):
+        """Power of a process type (Watts, summed over its processes per scaphandre sample), built once per load
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            process_type: Type of process ("java" or "postgres")
+            
+        Returns:
+            PowerSeries, or None if there is no data for the section
+        """
+        store = self.energy_stores.get(section)
+        if store is None:
+            return None
+        
+        def build(loaded):
+            mask = loaded.category_mask(CATEGORY_POSTGRES if process_type == "postgres" else CATEGORY_JAVA)
+            # The processes are added up per scaphandre sample, not per record timestamp
+            timestamps_ns, microwatts = sum_per_sample(loaded.timestamps_ns[mask], loaded.consumption[mask],
+                                                       loaded.pid[mask])
+            return PowerSeries(timestamps_ns, microwatts / 1_000_000.0)
+        
+        return store.derived(("power", process_type), build)
+    
     def reset_plot_view(self):
         """Reset the plot view to default - Placeholder for future implementation"""
         self.status_var.set("Plot view reset functionality will be implemented in the future")
@@ -142,6 +319,11 @@ class ExperimentVisualizer:
         # Create the matplotlib figure and canvas
         self.fig = Figure(figsize=(8, 6), dpi=100)
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
+        # Axes and artists are kept between refreshes and only rebuilt when the layout changes
+        self.plot_artists = FigureArtists(self.fig)
+        # Zooming re-windows the visible range of the energy series at a finer resolution
+        self.zoom_refresher = ZoomRefresher(self.root, self.plot_artists, self.canvas,
+                                            lambda message: self.status_var.set(message))
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Add matplotlib toolbar for zoom, pan, save, etc.
@@ -162,8 +344,8 @@ class ExperimentVisualizer:
         plot_type_combo = ttk.Combobox(control_frame, textvariable=self.plot_type_var, 
                                       values=["Line", "Bar", "Scatter"], state="readonly", width=10)
         plot_type_combo.pack(side=tk.LEFT, padx=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        plot_type_combo.bind("<<ComboboxSelected>>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        plot_type_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # Plot data selection
         ttk.Label(control_frame, text="Data Source:").pack(side=tk.LEFT, padx=5)
@@ -171,8 +353,8 @@ class ExperimentVisualizer:
         data_source_combo = ttk.Combobox(control_frame, textvariable=self.data_source_var, 
                                       values=["Energy", "Energy Comparative", "Latency", "Throughput"], state="readonly", width=14)
         data_source_combo.pack(side=tk.LEFT, padx=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        data_source_combo.bind("<<ComboboxSelected>>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        data_source_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # Accumulation mode selection (for energy comparative)
         ttk.Label(control_frame, text="Accumulation:").pack(side=tk.LEFT, padx=5)
@@ -180,21 +362,25 @@ class ExperimentVisualizer:
         accumulation_combo = ttk.Combobox(control_frame, textvariable=self.accumulation_var, 
                                       values=["Simple", "Accumulated"], state="readonly", width=10)
         accumulation_combo.pack(side=tk.LEFT, padx=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        accumulation_combo.bind("<<ComboboxSelected>>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        accumulation_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # Window size for accumulation (ms)
         ttk.Label(control_frame, text="Window Size (ms):").pack(side=tk.LEFT, padx=5)
         self.window_size_var = tk.StringVar(value="100")
         window_size_entry = ttk.Entry(control_frame, textvariable=self.window_size_var, width=6)
         window_size_entry.pack(side=tk.LEFT, padx=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        window_size_entry.bind("<Return>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        window_size_entry.bind("<Return>", lambda e: self.replot_scheduler.request())
         
         # Add help tooltip about navigation
         ttk.Label(control_frame, text="Plot visualization will be implemented in future versions", 
                  font=("Arial", 8, "italic")).pack(side=tk.RIGHT, padx=10)
     
+    def _update_load_filters(self):
+        """Take the Load Options of the File menu; they apply from the next file loaded"""
+        self.load_filters = LoadFilters(**{attribute: var.get() for attribute, var in self.load_filter_vars.items()})
+
     def load_data(self):
         file_path = filedialog.askopenfilename(
             title="Select Data File",
@@ -204,38 +390,382 @@ class ExperimentVisualizer:
         if not file_path:
             return
         
+        self.status_var.set(f"Loading data from {os.path.basename(file_path)}...")
+
+        # Start from an empty session; results arrive from the load worker
+        self.data = {}
+        self._set_energy_stores({})
+        self.plot_worker.cancel()
+        self.experiment_selector['values'] = []
+        self.experiment_var.set("")
+        self._streamed_experiment_ids = []
+        self.energy_worker.cancel()
+        self._deferred_energy = None
+
+        # Submitting cancels a load that is still running, so a stale file never overwrites this one
+        self.load_worker.submit(
+            lambda job: self._read_results_file(job, file_path),
+            on_done=lambda energy_stores: self._finish_load(file_path, energy_stores),
+            on_error=self._on_load_error
+        )
+
+    def _read_results_file(self, job, file_path):
+        """Read the non-energy part of a results file on the load worker thread
+
+        The top-level members are located by their byte offsets first, so
+        benchmark_results and container_info are decoded (and handed to the
+        main thread one event at a time) without parsing the energy sections,
+        wherever they are in the file.  The energy sections are parsed by
+        _read_energy_sections when a plot first needs them.
+
+        Args:
+            job: Job handle of the load worker
+            file_path: Path of the results file
+
+        Returns:
+            Dictionary of EnergyStore per energy section (empty unless the file was cached)
+        """
+        filters = self.load_filters
+        energy_stores = self._open_cached_results(job, file_path, filters)
+        if energy_stores is not None:
+            return energy_stores
+
+        members = index_members(file_path)
+        job.check()
+        results = {}
+        for key, span in members.items():
+            if key in ENERGY_SECTIONS:
+                continue
+            for event in iter_member(file_path, key, span):
+                job.check()
+                merge_event(results, event)
+                job.post(self._on_results_event, event)
+
+        sections = {key: span for key, span in members.items() if key in ENERGY_SECTIONS}
+        if sections:
+            job.post(self._defer_energy_sections, (file_path, sections, results, filters))
+        else:
+            self._cache_results(file_path, results, {}, filters)
+        return {}
+
+    def _read_energy_sections(self, job, file_path, sections, results, filters):
+        """Parse the energy sections of a results file on the load worker thread
+
+        Energy samples go straight into columnar storage; the raw dicts are dropped
+        once appended.
+
+        Args:
+            job: Job handle of the load worker
+            file_path: Path of the results file
+            sections: Dictionary of energy section to its (start, end) byte offsets
+            results: The non-energy part of the file, for the run windows and the cache
+            filters: LoadFilters the file is loaded with
+
+        Returns:
+            Dictionary of EnergyStore per energy section
+        """
+        windows_ns = filters.run_windows_ns(results)
+        builders = {}
+        records_read = 0
+        for section, span in sections.items():
+            for event in iter_member(file_path, section, span):
+                job.check()
+                if event.kind == "value":
+                    # Not an array of records; kept in the results like any other member
+                    merge_event(results, event)
+                    job.post(self._on_results_event, event)
+                    continue
+                if section not in builders:
+                    builders[section] = EnergyStoreBuilder(_classify_process, filters=filters,
+                                                           windows_ns=windows_ns)
+                if event.kind == "items":
+                    builders[section].append(event.payload)
+                    records_read += len(event.payload)
+                    job.post(self.status_var.set, f"Loading {os.path.basename(file_path)}: {records_read} energy records read...")
+
+        energy_stores = {section: builder.build() for section, builder in builders.items()}
+        self._cache_results(file_path, results, energy_stores, filters)
+        return energy_stores
+
+    def _open_cached_results(self, job, file_path, filters):
+        """Hand the cached version of a results file to the main thread, if there is one
+
+        Args:
+            job: Job handle of the load worker
+            file_path: Path of the results file
+            filters: LoadFilters the file is loaded with
+
+        Returns:
+            Dictionary of EnergyStore per energy section, or None if the file is not cached
+        """
+        cached = (self.results_cache.load(file_path, cache_variant(CACHE_NAMESPACE, NESTED, filters), nested=NESTED)
+                  if self.results_cache is not None else None)
+        if cached is None:
+            return None
+        results, energy_stores = cached
+        job.post(self.status_var.set, f"Loading {os.path.basename(file_path)} from the cache...")
+        # All energy data is available at once, before the first experiment is shown
+        job.post(self._set_energy_stores, energy_stores)
+        for event in replay_events(results):
+            job.check()
+            job.post(self._on_results_event, event)
+        return energy_stores
+
+    def _cache_results(self, file_path, results, energy_stores, filters):
+        """Write a parsed results file to the cache; a failed write only costs the next load"""
+        if self.results_cache is None:
+            return
         try:
-            self.status_var.set(f"Loading data from {os.path.basename(file_path)}...")
-            self.root.update_idletasks()
-            
-            with open(file_path, 'r') as file:
-                self.data = json.load(file)
-            
+            self.results_cache.store(file_path, results, energy_stores, cache_variant(CACHE_NAMESPACE, NESTED, filters))
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def open_session_files(self):
+        """Load several results files and scaphandre captures together (see session_loader.py)"""
+        file_paths = filedialog.askopenfilenames(
+            title="Select Session Files",
+            filetypes=[("JSON files", "*.json"), ("Scaphandre binary captures", "*" + FILE_EXTENSION), ("All files", "*.*")]
+        )
+        if file_paths:
+            self._load_session(list(file_paths))
+
+    def open_session_directory(self):
+        """Load the results files and scaphandre captures found under a directory"""
+        directory = filedialog.askdirectory(title="Select Session Directory")
+        if directory:
+            self._load_session([directory])
+
+    def _load_session(self, paths):
+        """Parse the files of a session in worker processes; the load worker waits for them off the Tk main thread
+
+        Args:
+            paths: Files and directories of the session
+        """
+        self.status_var.set("Loading session...")
+        filters = self.load_filters
+
+        def work(job):
+            return load_session(paths, _classify_process, nested=NESTED, kinds=("results", "capture", "binary"),
+                                filters=filters, cache=self.results_cache, cache_namespace=CACHE_NAMESPACE, check=job.check,
+                                progress=lambda done, total, file_path: job.post(
+                                    self.status_var.set, f"Loading session: {done}/{total} files ({os.path.basename(file_path)})"))
+
+        # Submitting cancels a load that is still running, so a stale file never overwrites the session
+        self.load_worker.submit(work, on_done=self._install_session, on_error=self._on_load_error)
+
+    def _install_session(self, session):
+        """Offer the datasets of a loaded session in the Session menu and show the first one"""
+        if self.session is not None:
+            # Arrays still in use stay valid, only the shared memory names are released
+            self.session.close()
+        self.session = session
+        self.session_menu.delete(3, tk.END)
+        if session.datasets:
+            self.session_menu.add_separator()
+        for dataset in session.datasets:
+            self.session_menu.add_radiobutton(label=dataset.name, value=dataset.name, variable=self.session_dataset_var,
+                                              command=self._on_session_dataset_selected)
+
+        if session.errors:
+            messagebox.showwarning("Session", "Some files were not loaded:\n" + "\n".join(
+                f"{os.path.basename(file_path)}: {message}" for file_path, message in session.errors))
+        if not session.datasets:
+            self.status_var.set("No results files found for the session.")
+            return
+        self.session_dataset_var.set(session.datasets[0].name)
+        self._show_session_dataset(session.datasets[0])
+
+    def _on_session_dataset_selected(self):
+        """Show the dataset picked in the Session menu"""
+        for dataset in self.session.datasets if self.session is not None else []:
+            if dataset.name == self.session_dataset_var.get():
+                self._show_session_dataset(dataset)
+                return
+
+    def _show_session_dataset(self, dataset):
+        """Make a dataset of the session the loaded data, without reading any file
+
+        Args:
+            dataset: SessionDataset to show
+        """
+        self.load_worker.cancel()
+        self.plot_worker.cancel()
+        self.energy_worker.cancel()
+        self.data = {}
+        self._deferred_energy = None
+        self._set_energy_stores({})
+        self.experiment_selector['values'] = []
+        self.experiment_var.set("")
+        self._streamed_experiment_ids = []
+
+        for event in replay_events(dataset.results):
+            self._on_results_event(event)
+        self._finish_load(dataset.file_path, dataset.energy_stores)
+
+    def close_session(self):
+        """Release the shared memory of the session; the data shown stays until another file is loaded"""
+        if self.session is None:
+            return
+        self.session.close()
+        self.session = None
+        self.session_menu.delete(3, tk.END)
+        self.status_var.set("Session closed.")
+
+    def load_binary_capture(self):
+        """Use a converted scaphandre capture (see scaphandre_binary.py) as the energy data of one server
+
+        The capture is memory-mapped, so it replaces the energy section of the
+        loaded results without being parsed.
+        """
+        file_path = filedialog.askopenfilename(
+            title="Select Binary Energy Capture",
+            filetypes=[("Scaphandre binary captures", "*" + FILE_EXTENSION), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+
+        try:
+            store, header = open_capture(file_path, _classify_process, nested=NESTED)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to open binary capture: {str(e)}")
+            return
+        section = header.get("section") or section_for_path(file_path)
+        if section is None:
+            messagebox.showerror("Error", "Cannot tell which server the capture belongs to. "
+                                          "Convert it again with --section.")
+            return
+
+        self._set_energy_stores({**self.energy_stores, section: store})
+        self.status_var.set(f"Opened {os.path.basename(file_path)}: {header['records']} samples for {section}")
+        self.force_plot_update()
+
+    def _defer_energy_sections(self, deferred):
+        """Remember the energy sections left unread by _read_results_file
+
+        Args:
+            deferred: Tuple (file path, {section: span}, results, filters)
+        """
+        self._deferred_energy = deferred
+        self._deferred_energy_job = None
+        self._deferred_energy_callbacks = []
+
+    def _deferred_energy_sections(self):
+        """Energy sections of the loaded file that are located but not parsed yet"""
+        return self._deferred_energy[1] if self._deferred_energy is not None else {}
+
+    def _load_deferred_energy(self, on_loaded=None):
+        """Start parsing the deferred energy sections, unless that is already under way
+
+        Once they are installed, the selected experiment is shown again (with
+        its run energy and energy plots) and on_loaded is called.
+
+        Args:
+            on_loaded: Optional callback run on the main thread afterwards
+
+        Returns:
+            True if the energy data is being read, False if there is nothing to wait for
+        """
+        if self._deferred_energy is None or not self.data:
+            return False
+        if on_loaded is not None and on_loaded not in self._deferred_energy_callbacks:
+            self._deferred_energy_callbacks.append(on_loaded)
+        if self._deferred_energy_job is None or self._deferred_energy_job.cancelled:
+            file_path, sections, results, filters = self._deferred_energy
+            self.status_var.set(f"Reading energy data from {os.path.basename(file_path)}...")
+            self._deferred_energy_job = self.energy_worker.submit(
+                lambda job: self._read_energy_sections(job, file_path, sections, results, filters),
+                on_done=self._finish_energy_load,
+                on_error=self._on_load_error
+            )
+        return True
+
+    def _finish_energy_load(self, energy_stores):
+        """Install the energy sections read by _read_energy_sections"""
+        callbacks = self._deferred_energy_callbacks
+        self._deferred_energy = None
+        self._deferred_energy_job = None
+        self._deferred_energy_callbacks = []
+        # Binary captures opened in the meantime replace the parsed sections
+        self._set_energy_stores({**energy_stores, **self.energy_stores})
+        self.on_experiment_selected(None)
+        for callback in callbacks:
+            callback()
+
+    def _set_energy_stores(self, energy_stores):
+        """Replace the energy data and drop the series processed from the old data"""
+        self.energy_stores = energy_stores
+        self.series_cache.clear()
+        self._catalog = None
+
+    def _on_results_event(self, event):
+        """Merge a non-energy event of the file being loaded into self.data"""
+        merge_event(self.data, event)
+        self._catalog = None
+        if event.path[:2] == ("benchmark_results", "experiments") and len(event.path) == 3:
+            self._streamed_experiment_ids.append(event.path[2])
+            self._on_experiment_streamed(self._streamed_experiment_ids)
+
+    def _finish_load(self, file_path, energy_stores):
+        """Install the fully loaded energy data and select all experiments
+
+        Args:
+            file_path: Path of the loaded results file
+            energy_stores: Dictionary of EnergyStore per energy section
+        """
+        try:
+            # Energy sections parsed in the meantime (deferred sections, binary captures) are kept
+            self._set_energy_stores({**energy_stores, **self.energy_stores})
+            # Boundaries, chronology and counts of the whole file, derived once
+            self._catalog = DatasetCatalog(self.data, self.energy_stores)
+
             # Check if the data has the expected structure
-            if not all(key in self.data for key in ["api_server_energy", "db_server_energy", "benchmark_results"]):
+            if not all(key in self.data or key in self.energy_stores or key in self._deferred_energy_sections()
+                       for key in ["api_server_energy", "db_server_energy", "benchmark_results"]):
                 messagebox.showerror("Error", "The file does not have the expected structure.")
                 return
-                
+
             # Extract experiment names from benchmark_results.experiments
             if "benchmark_results" in self.data and "experiments" in self.data["benchmark_results"]:
                 experiment_ids = list(self.data["benchmark_results"]["experiments"].keys())
-                
+
                 # Add "All Experiments" as the first option
                 all_experiments_option = "All Experiments"
                 self.experiment_selector['values'] = [all_experiments_option] + experiment_ids
-                
-                # Select the first option (All Experiments)
-                self.experiment_selector.current(0)
-                self.experiment_var.set(all_experiments_option)
+
+                # Switch to "All Experiments" unless the user picked something while loading
+                if self.experiment_var.get() in ("", experiment_ids[0] if experiment_ids else ""):
+                    self.experiment_selector.current(0)
+                    self.experiment_var.set(all_experiments_option)
                 self.on_experiment_selected(None)
-                
+
                 self.status_var.set(f"Loaded {len(experiment_ids)} experiments from {os.path.basename(file_path)}")
             else:
                 messagebox.showerror("Error", "No experiments found in the data file.")
                 self.status_var.set("No experiments found in the data file.")
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to load data: {str(e)}")
-            self.status_var.set("Error loading data file")
+            self._on_load_error(e)
+
+    def _on_load_error(self, error):
+        """Reset the session after a failed load"""
+        self.data = None
+        self.energy_worker.cancel()
+        self._deferred_energy = None
+        self._set_energy_stores({})
+        messagebox.showerror("Error", f"Failed to load data: {str(error)}")
+        self.status_var.set("Error loading data file")
+
+    def _on_experiment_streamed(self, experiment_ids):
+        """Offer experiments in the selector as soon as they are read from the file
+
+        Args:
+            experiment_ids: IDs of the experiments read so far, in file order
+        """
+        self.experiment_selector['values'] = ["All Experiments"] + experiment_ids
+
+        # Show the first experiment right away with the energy data read so far
+        if len(experiment_ids) == 1:
+            self.experiment_var.set(experiment_ids[0])
+            self.on_experiment_selected(None)
     
     def on_experiment_selected(self, event):
         if not self.data or not self.experiment_var.get():
@@ -326,6 +856,10 @@ class ExperimentVisualizer:
             ttk.Label(self.details_frame, text="Run Summary:", font=("Arial", 10, "bold")).grid(row=row, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
             row += 1
             
+            # Energy per run, from the cumulative index of each server (no pass over the samples)
+            api_run_energy = self._get_run_energy_totals(selected_experiment, "api_server_energy", "java")
+            db_run_energy = self._get_run_energy_totals(selected_experiment, "db_server_energy", "postgres")
+            
             for i, run in enumerate(experiment["runs"]):
                 ttk.Label(self.details_frame, text=f"Run {i+1}:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
                 
@@ -353,6 +887,11 @@ class ExperimentVisualizer:
                     p99 = latency_info.get("percentiles", {}).get("p99", 0) / 1_000_000
                     ttk.Label(self.details_frame, text=f"Median: {median:.2f}, P95: {p95:.2f}, P99: {p99:.2f}").grid(row=row, column=1, sticky=tk.W, padx=5, pady=2)
                     row += 1
+                
+                if i + 1 in api_run_energy or i + 1 in db_run_energy:
+                    ttk.Label(self.details_frame, text="  Energy:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
+                    ttk.Label(self.details_frame, text=f"API: {api_run_energy.get(i + 1, 0):.2e}, DB: {db_run_energy.get(i + 1, 0):.2e}").grid(row=row, column=1, sticky=tk.W, padx=5, pady=2)
+                    row += 1
         
         # Update the plot placeholder for this experiment
         self.update_plot()
@@ -361,16 +900,76 @@ class ExperimentVisualizer:
         self.status_var.set(f"Displaying data for experiment: {selected_experiment}")
     
     def update_plot(self):
-        """Update the plot with selected experiment data"""
+        """Update the plot with selected experiment data
+
+        The energy series are filtered and windowed on the plot worker; the
+        figure is drawn on the main thread once they are in the series cache.
+        A newer update cancels one that is still being processed.
+        """
         if not self.data or not self.experiment_var.get():
             return
-        
+
+        # This update reads every input, so it replaces a scheduled one
+        self.replot_scheduler.cancel()
         experiment_id = self.experiment_var.get()
         self.status_var.set(f"Updating plot for: {experiment_id}")
+
+        if self.data_source_var.get() not in ("Energy", "Energy Comparative"):
+            # Latency and throughput plots come straight from the benchmark results
+            self.plot_worker.cancel()
+            self._render_plot()
+            return
+        if self._load_deferred_energy():
+            return  # Drawn once the energy sections are read
+
+        if experiment_id == "All Experiments":
+            start_time_ms, end_time_ms = self.get_all_experiments_time_boundaries()
+        else:
+            start_time_ms, end_time_ms = self.get_experiment_time_boundaries(experiment_id)
+        window_size_ms = self._get_window_size_ms()
+
+        def prefetch(job):
+            for section, process_type in (("api_server_energy", "java"), ("db_server_energy", "postgres")):
+                job.check()
+                self._get_energy_series(section, process_type, window_size_ms, start_time_ms, end_time_ms)
+
+        self.plot_worker.submit(prefetch, on_done=lambda _: self._render_plot())
+
+    def _get_plot_inputs(self):
+        """Current values of the inputs of the plot, for the replot scheduler"""
+        return {
+            "experiment": self.experiment_var.get(),
+            "plot_type": self.plot_type_var.get(),
+            "data_source": self.data_source_var.get(),
+            "accumulation": self.accumulation_var.get(),
+            "window_size": self._get_window_size_ms(),
+        }
+
+    def _redraw_plot(self):
+        """Redraw the plot when only inputs that do not affect the processed series changed"""
+        if self.plot_worker.busy:
+            return  # The update in progress draws with the current inputs
+        self._render_plot()
+
+    def _get_window_size_ms(self):
+        """Accumulation window size from the entry field (100 ms if it is not a number)"""
+        try:
+            return int(self.window_size_var.get())
+        except ValueError:
+            return 100  # Default if parsing fails
+
+    def _render_plot(self):
+        """Draw the plot of the selected experiment data (energy series come from the series cache)"""
+        if not self.data or not self.experiment_var.get():
+            return
+        
+        experiment_id = self.experiment_var.get()
+        self.replot_scheduler.mark_drawn()
         self.root.update_idletasks()  # Force UI update
         
-        # Clear the figure
-        self.fig.clear()
+        # Reuse the axes and artists of the previous refresh unless the layout changes
+        self.plot_artists.begin((self.data_source_var.get(), self.plot_type_var.get(), self.accumulation_var.get()))
+        self.zoom_refresher.reset()
         
         # Get the experiment time boundaries
         if experiment_id == "All Experiments":
@@ -391,33 +990,22 @@ class ExperimentVisualizer:
             self.status_var.set(f"Time bounds: {start_time_eet} to {end_time_eet} (EET)")
             self.root.update_idletasks()
         
-        # Filter energy data to only include entries within the time range
-        api_energy_data = self.data.get("api_server_energy", [])
-        db_energy_data = self.data.get("db_server_energy", [])
-        
-        filtered_api_data = self._filter_energy_data_by_time(api_energy_data, start_time_ms, end_time_ms)
-        filtered_db_data = self._filter_energy_data_by_time(db_energy_data, start_time_ms, end_time_ms)
-        
         # Get the selected plot type and data source
         plot_type = self.plot_type_var.get()
         data_source = self.data_source_var.get()
         accumulation_mode = self.accumulation_var.get()
-        
-        try:
-            window_size_ms = int(self.window_size_var.get())
-        except ValueError:
-            window_size_ms = 100  # Default if parsing fails
+        window_size_ms = self._get_window_size_ms()
         
         # Process the energy data
         if data_source == "Energy":
             # Process API server data (java processes)
-            api_df = self._process_energy_data(filtered_api_data, "java", window_size_ms)
+            api_df = self._get_energy_series("api_server_energy", "java", window_size_ms, start_time_ms, end_time_ms)
             
             # Process DB server data (postgres processes)
-            db_df = self._process_energy_data(filtered_db_data, "postgres", window_size_ms)
+            db_df = self._get_energy_series("db_server_energy", "postgres", window_size_ms, start_time_ms, end_time_ms)
             
             # Create a new subplot
-            ax = self.fig.add_subplot(111)
+            ax = self.plot_artists.add_subplot(111)
             
             # Configure the axis
             ax.set_xlabel('Time (EET)', fontsize=10)
@@ -443,12 +1031,14 @@ class ExperimentVisualizer:
                 # Plot the data based on the selected plot type
                 if plot_type == "Line":
                     if not api_df.empty:
-                        ax.plot(api_df['datetime'], api_df['consumption'], 
+                        api_line, = ax.plot(api_df['datetime'], api_df['consumption'], 
                                label='API Server (Java)', color='red', linewidth=2, marker=None)
+                        self._track_energy_zoom(ax, api_line, "api_server_energy", "java")
                     
                     if not db_df.empty:
-                        ax.plot(db_df['datetime'], db_df['consumption'], 
+                        db_line, = ax.plot(db_df['datetime'], db_df['consumption'], 
                                label='DB Server (Postgres)', color='blue', linewidth=2, marker=None)
+                        self._track_energy_zoom(ax, db_line, "db_server_energy", "postgres")
                 
                 elif plot_type == "Bar":
                     # For bar plots, we'll use bar width based on data density
@@ -464,12 +1054,14 @@ class ExperimentVisualizer:
                 
                 elif plot_type == "Scatter":
                     if not api_df.empty:
-                        ax.scatter(api_df['datetime'], api_df['consumption'], 
+                        api_points = ax.scatter(api_df['datetime'], api_df['consumption'], 
                                  label='API Server (Java)', color='red', marker='o', s=30)
+                        self._track_energy_zoom(ax, api_points, "api_server_energy", "java")
                     
                     if not db_df.empty:
-                        ax.scatter(db_df['datetime'], db_df['consumption'], 
+                        db_points = ax.scatter(db_df['datetime'], db_df['consumption'], 
                                   label='DB Server (Postgres)', color='blue', marker='x', s=30)
+                        self._track_energy_zoom(ax, db_points, "db_server_energy", "postgres")
                 
                 # Add grid
                 ax.grid(True, linestyle='--', alpha=0.7)
@@ -512,7 +1104,8 @@ class ExperimentVisualizer:
                                        bbox=dict(facecolor='white', alpha=0.8, boxstyle='round'))
                 
                 # Apply tight layout to maximize plot area
-                self.fig.tight_layout()
+                if self.plot_artists.layout_changed:
+                    self.fig.tight_layout()
                 
                 # Add experiment boundary visualization when showing all experiments
                 if experiment_id == "All Experiments":
@@ -566,14 +1159,14 @@ class ExperimentVisualizer:
         elif data_source == "Energy Comparative":
             # Create two subplots for comparative energy visualization
             # Process API server data (java processes)
-            api_df = self._process_energy_data(filtered_api_data, "java", window_size_ms)
+            api_df = self._get_energy_series("api_server_energy", "java", window_size_ms, start_time_ms, end_time_ms)
             
             # Process DB server data (postgres processes)
-            db_df = self._process_energy_data(filtered_db_data, "postgres", window_size_ms)
+            db_df = self._get_energy_series("db_server_energy", "postgres", window_size_ms, start_time_ms, end_time_ms)
             
             # Create a figure with two subplots (2 rows, 1 column)
-            ax1 = self.fig.add_subplot(211)  # Top subplot
-            ax2 = self.fig.add_subplot(212)  # Bottom subplot
+            ax1 = self.plot_artists.add_subplot(211)  # Top subplot
+            ax2 = self.plot_artists.add_subplot(212)  # Bottom subplot
             
             # Configure the axes
             ax1.set_title(f'Energy Consumption - API Server (Java) - {experiment_id}', fontsize=10)
@@ -701,16 +1294,18 @@ class ExperimentVisualizer:
                 ax2.legend(lines + lines2, labels + labels2, loc='upper left', fontsize=8)
             
             # Adjust the layout to fit the subplots
-            self.fig.tight_layout()
+            if self.plot_artists.layout_changed:
+                self.fig.tight_layout()
             
             # Update status with data summary
             api_count = len(api_df) if not api_df.empty else 0
             db_count = len(db_df) if not db_df.empty else 0
-            total_api = api_df['consumption'].sum() if not api_df.empty else 0
-            total_db = db_df['consumption'].sum() if not db_df.empty else 0
             
             # Format the summary message
             if accumulation_mode == "Accumulated":
+                # Totals from the cumulative index instead of summing the windows
+                total_api = self._get_energy_total("api_server_energy", "java", start_time_ms, end_time_ms)
+                total_db = self._get_energy_total("db_server_energy", "postgres", start_time_ms, end_time_ms)
                 self.status_var.set(
                     f"Comparative view: API data: {api_count} points, total: {total_api:.2e} units | "
                     f"DB data: {db_count} points, total: {total_db:.2e} units"
@@ -724,7 +1319,7 @@ class ExperimentVisualizer:
             # Handle the "All Experiments" case
             if experiment_id == "All Experiments":
                 # Create a new subplot
-                ax = self.fig.add_subplot(111)
+                ax = self.plot_artists.add_subplot(111)
                 
                 # Configure the axis
                 ax.set_xlabel('Time (EET)', fontsize=10)
@@ -744,20 +1339,10 @@ class ExperimentVisualizer:
                     runs = experiment.get("runs", [])
                     
                     # Collect latency data from all runs of this experiment
-                    latency_data = []
-                    for run in runs:
-                        if "latencies" in run:
-                            for entry in run["latencies"]:
-                                if "latency_ns" in entry and "timestamp" in entry:
-                                    timestamp_ms = entry["timestamp"]
-                                    latency_ms = entry["latency_ns"] / 1_000_000  # Convert ns to ms
-                                    dt = self._convert_to_eet(timestamp_ms)
-                                    latency_data.append((dt, latency_ms))
+                    latency_df = self._get_latency_data(runs)
                     
-                    if latency_data:
+                    if not latency_df.empty:
                         has_data = True
-                        # Convert to DataFrame for easier plotting
-                        latency_df = pd.DataFrame(latency_data, columns=['datetime', 'latency'])
                         
                         # Plot based on plot type with experiment-specific color
                         color = experiment_colors[idx % len(experiment_colors)]
@@ -809,7 +1394,8 @@ class ExperimentVisualizer:
                                 ax.axvline(x=run_end_dt, color='red', linestyle='--', alpha=0.3)
                     
                     # Apply tight layout to maximize plot area
-                    self.fig.tight_layout()
+                    if self.plot_artists.layout_changed:
+                        self.fig.tight_layout()
                     
                     # Add experiment boundary visualization when showing all experiments
                     chronology = self._get_experiment_chronology()
@@ -864,13 +1450,13 @@ class ExperimentVisualizer:
                 runs = experiment.get("runs", [])
                 
                 if not runs:
-                    ax = self.fig.add_subplot(111)
+                    ax = self.plot_artists.add_subplot(111)
                     ax.text(0.5, 0.5, "No latency data available for this experiment", 
                            horizontalalignment='center', verticalalignment='center',
                            transform=ax.transAxes, fontsize=14)
                 else:
                     # Create a new subplot
-                    ax = self.fig.add_subplot(111)
+                    ax = self.plot_artists.add_subplot(111)
                     
                     # Configure the axis
                     ax.set_xlabel('Time (EET)', fontsize=10)
@@ -882,24 +1468,13 @@ class ExperimentVisualizer:
                     ax.tick_params(axis='x', rotation=45)
                     
                     # Collect latency data from all runs
-                    latency_data = []
-                    for run in runs:
-                        if "latencies" in run:
-                            for entry in run["latencies"]:
-                                if "latency_ns" in entry and "timestamp" in entry:
-                                    timestamp_ms = entry["timestamp"]
-                                    latency_ms = entry["latency_ns"] / 1_000_000  # Convert ns to ms
-                                    dt = self._convert_to_eet(timestamp_ms)
-                                    latency_data.append((dt, latency_ms))
+                    latency_df = self._get_latency_data(runs)
                     
-                    if not latency_data:
+                    if latency_df.empty:
                         ax.text(0.5, 0.5, "No detailed latency data available", 
                                horizontalalignment='center', verticalalignment='center',
                                transform=ax.transAxes, fontsize=14)
                     else:
-                        # Convert to DataFrame for easier plotting
-                        latency_df = pd.DataFrame(latency_data, columns=['datetime', 'latency'])
-                        
                         # Plot based on plot type
                         if plot_type == "Line":
                             ax.plot(latency_df['datetime'], latency_df['latency'], 
@@ -943,13 +1518,14 @@ class ExperimentVisualizer:
                                        bbox=dict(facecolor='white', alpha=0.8, boxstyle='round'))
                         
                         # Apply tight layout to maximize plot area
-                        self.fig.tight_layout()
+                        if self.plot_artists.layout_changed:
+                            self.fig.tight_layout()
         
         elif data_source == "Throughput":
             # Handle the "All Experiments" case
             if experiment_id == "All Experiments":
                 # Create a new subplot
-                ax = self.fig.add_subplot(111)
+                ax = self.plot_artists.add_subplot(111)
                 
                 # Configure the axis
                 ax.set_xlabel('Time (EET)', fontsize=10)
@@ -1076,7 +1652,7 @@ class ExperimentVisualizer:
                 runs = experiment.get("runs", [])
                 
                 # Create a new subplot
-                ax = self.fig.add_subplot(111)
+                ax = self.plot_artists.add_subplot(111)
                 
                 # Configure the axis
                 ax.set_xlabel('Run Number', fontsize=10)
@@ -1161,8 +1737,15 @@ class ExperimentVisualizer:
                            horizontalalignment='center', verticalalignment='center',
                            transform=ax.transAxes, fontsize=10)
         
-        # Redraw the canvas with the new plot
+        # Drop the artists of the previous refresh that were not reused, then redraw the canvas
+        self.plot_artists.finish()
+        decimation_summary = self.plot_artists.decimation_summary()
+        if decimation_summary:
+            self.status_var.set(decimation_summary)
+        # The axes outlive this refresh, so start a new zoom/pan history for the Home button
+        self.toolbar.update()
         self.canvas.draw()
+        self.zoom_refresher.activate(window_size_ms, start_time_ms, end_time_ms)
     
     def force_plot_update(self):
         """Force update the plot with the current experiment selection"""
@@ -1181,117 +1764,60 @@ class ExperimentVisualizer:
         """
         if not self.data or not experiment_id:
             return None, None
-            
-        if "benchmark_results" in self.data and "experiments" in self.data["benchmark_results"]:
-            experiment = self.data["benchmark_results"]["experiments"].get(experiment_id, {})
-            
-            if not experiment or "runs" not in experiment or not experiment["runs"]:
-                return None, None
-            
-            runs = experiment["runs"]
-            if not runs:
-                return None, None
-                
-            # Get the start timestamp from the first run
-            first_run = runs[0]
-            start_time_ms = first_run.get("start_timestamp")
-            
-            # Get the end timestamp from the last run
-            last_run = runs[-1]
-            end_time_ms = last_run.get("end_timestamp")
-            
-            # If end_timestamp is not available, try to calculate it from start_timestamp + elapsed_time_ms
-            if end_time_ms is None and "start_timestamp" in last_run and "elapsed_time_ms" in last_run:
-                end_time_ms = last_run["start_timestamp"] + last_run["elapsed_time_ms"]
-            
-            # If we still don't have valid timestamps, fall back to timestamp field
-            if start_time_ms is None and "timestamp" in first_run:
-                # If timestamp exists, assume it's the end time and try to calculate start time
-                if "elapsed_time_ms" in first_run:
-                    start_time_ms = first_run["timestamp"] - first_run["elapsed_time_ms"]
-                else:
-                    # No way to determine start time, just use timestamp
-                    start_time_ms = first_run["timestamp"]
-            
-            if end_time_ms is None and "timestamp" in last_run:
-                end_time_ms = last_run["timestamp"]
-            
-            # If we have valid timestamps, return them without any buffer
-            if start_time_ms is not None and end_time_ms is not None:
-                return start_time_ms, end_time_ms
-            
+
+        catalog = self._get_catalog()
+        if experiment_id in catalog.experiment_bounds and not catalog.has_explicit_bounds(experiment_id):
             # If we can't determine the time boundaries, fall back to using energy data
-            if start_time_ms is None or end_time_ms is None:
-                self.status_var.set(f"No explicit time boundaries found for {experiment_id}, using full energy data range.")
-                
-                # Look for any timestamps in the energy data
-                api_energy_data = self.data.get("api_server_energy", [])
-                db_energy_data = self.data.get("db_server_energy", [])
-                
-                energy_timestamps = []
-                for entry in api_energy_data + db_energy_data:
-                    if "timestamp" in entry:
-                        # Convert seconds to milliseconds
-                        energy_timestamps.append(entry.get("timestamp", 0) * 1000)
-                
-                if energy_timestamps:
-                    # Use the full range of energy data
-                    return min(energy_timestamps), max(energy_timestamps)
-        
-        return None, None
+            self.status_var.set(f"No explicit time boundaries found for {experiment_id}, using full energy data range.")
+        return catalog.resolved_bounds(experiment_id)
     
-    def _filter_energy_data_by_time(self, energy_data, start_time_ms=None, end_time_ms=None):
+    def _filter_energy_data_by_time(self, energy_data, start_time_ms=None, end_time_ms=None, show_all_if_empty=True):
         """
         Filter energy data to only include entries within the specified time range.
         
         Args:
-            energy_data: List of energy data entries
+            energy_data: EnergyStore with the energy samples of one server
             start_time_ms: Start time in milliseconds (inclusive)
             end_time_ms: End time in milliseconds (inclusive)
+            show_all_if_empty: Return all data when the time range holds none (False returns None)
             
         Returns:
-            Filtered list of energy data entries
+            EnergyStore holding the entries within the time range (or None if there is no data)
         """
-        if not energy_data:
-            return []
+        if energy_data is None or not len(energy_data):
+            return None
             
         # If no time boundaries provided, return all data
         if start_time_ms is None or end_time_ms is None:
-            self.status_var.set(f"No time boundaries provided - showing all {len(energy_data)} energy data points")
+            self._set_status(f"No time boundaries provided - showing all {len(energy_data)} energy data points")
             return energy_data
             
-        # Convert start/end times to seconds for comparison with energy timestamp (which is in seconds)
-        start_time_sec = start_time_ms / 1000
-        end_time_sec = end_time_ms / 1000
+        # Energy timestamps are stored in nanoseconds
+        start_time_ns = int(start_time_ms * NS_PER_MS)
+        end_time_ns = int(end_time_ms * NS_PER_MS)
         
         # Convert to human-readable format for debugging
         start_time_str = self._convert_to_eet(start_time_ms).strftime('%Y-%m-%d %H:%M:%S')
         end_time_str = self._convert_to_eet(end_time_ms).strftime('%Y-%m-%d %H:%M:%S')
         
-        # Get min/max timestamps from the data for debugging
-        energy_timestamps = [entry.get("timestamp", 0) for entry in energy_data if "timestamp" in entry]
-        
-        if not energy_timestamps:
-            self.status_var.set("Warning: No timestamp fields found in energy data")
-            return energy_data  # Return all data if no timestamps
+        # Get min/max timestamps from the data for debugging (cached with the time index)
+        min_timestamp_ns, max_timestamp_ns = energy_data.time_extent_ns()
         
-        min_timestamp = min(energy_timestamps)
-        max_timestamp = max(energy_timestamps)
-        
-        # Convert energy timestamps to human-readable format - note energy timestamps are in seconds
-        min_time_str = self._convert_to_eet(min_timestamp * 1000, is_milliseconds=True).strftime('%Y-%m-%d %H:%M:%S')
-        max_time_str = self._convert_to_eet(max_timestamp * 1000, is_milliseconds=True).strftime('%Y-%m-%d %H:%M:%S')
+        min_time_str = self._convert_to_eet(min_timestamp_ns / NS_PER_MS).strftime('%Y-%m-%d %H:%M:%S')
+        max_time_str = self._convert_to_eet(max_timestamp_ns / NS_PER_MS).strftime('%Y-%m-%d %H:%M:%S')
         
         # Print detailed debug information
-        self.status_var.set(
+        self._set_status(
             f"Experiment time: {start_time_str} to {end_time_str} | "
             f"Energy data: {min_time_str} to {max_time_str} | "
             f"Total entries: {len(energy_data)}"
         )
         
         # Check if there's any overlap at all
-        if max_timestamp < start_time_sec or min_timestamp > end_time_sec:
-            self.status_var.set(
+        if max_timestamp_ns < start_time_ns or min_timestamp_ns > end_time_ns:
+            if not show_all_if_empty:
+                return None
+            self._set_status(
                 f"WARNING: No overlap between experiment time ({start_time_str} - {end_time_str}) "
                 f"and energy data ({min_time_str} - {max_time_str}). "
                 f"Showing ALL data instead."
@@ -1299,89 +1825,183 @@ class ExperimentVisualizer:
             return energy_data  # Return all data if no overlap
         
         # Filter data to only include entries within the exact experiment time range
-        filtered_data = [
-            entry for entry in energy_data 
-            if entry.get("timestamp", 0) >= start_time_sec and entry.get("timestamp", 0) <= end_time_sec
-        ]
-        
-        if not filtered_data:
-            self.status_var.set(
+        # (binary search on the sorted timestamp index, no scan over the data)
+        if not energy_data.count_time_range(start_time_ns, end_time_ns):
+            if not show_all_if_empty:
+                return None
+            self._set_status(
                 f"WARNING: No energy data found within the exact experiment timeframe. "
                 f"Showing ALL data instead."
             )
             return energy_data
+        filtered_data = energy_data.select_time_range(start_time_ns, end_time_ns)
         
         # Show how many data points were kept
-        self.status_var.set(
+        self._set_status(
             f"Filtered energy data: kept {len(filtered_data)}/{len(energy_data)} entries "
             f"({(len(filtered_data)/len(energy_data)*100):.1f}%)"
         )
         
         return filtered_data
     
+    def _set_status(self, message):
+        """Show a status message; safe to call from the plot worker thread"""
+        if not post_to_main_thread(self.status_var.set, message):
+            self.status_var.set(message)
+
+    def _get_energy_series(self, section, process_type, window_size_ms, start_time_ms=None, end_time_ms=None,
+                           show_all_if_empty=True):
+        """Get the windowed energy series of one server, reusing earlier results
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            process_type: Type of process to filter by ("java" or "postgres")
+            window_size_ms: Size of accumulation window in milliseconds
+            start_time_ms: Start time in milliseconds (inclusive)
+            end_time_ms: End time in milliseconds (inclusive)
+            show_all_if_empty: Plot all data when the time range holds none (False gives an empty series)
+            
+        Returns:
+            DataFrame with processed data (callers may add columns to it)
+        """
+        def compute():
+            filtered_data = self._filter_energy_data_by_time(self.energy_stores.get(section), start_time_ms, end_time_ms,
+                                                             show_all_if_empty)
+            return self._process_energy_data(filtered_data, process_type, window_size_ms)
+        
+        key = (section, process_type, window_size_ms, start_time_ms, end_time_ms, show_all_if_empty)
+        # Shallow copy so columns added while plotting do not end up in the cache
+        return self.series_cache.get_or_compute(key, compute).copy(deep=False)
+    
+    def _track_energy_zoom(self, ax, artist, section, process_type):
+        """Re-window a plotted energy series for the visible time range when the plot is zoomed"""
+        self.zoom_refresher.track(ax, artist, lambda window_size_ms, start_time_ms, end_time_ms: self._get_energy_series(
+            section, process_type, window_size_ms, start_time_ms, end_time_ms, show_all_if_empty=False), 'consumption')
+    
     def _process_energy_data(self, data_source, process_type, window_size_ms):
         """Process energy data with time-based windowing
         
         Args:
-            data_source: List of energy data entries
+            data_source: EnergyStore with the energy samples of one server
             process_type: Type of process to filter by ("java" or "postgres")
             window_size_ms: Size of accumulation window in milliseconds
             
         Returns:
             DataFrame with processed data
         """
-        # Initialize variables for accumulation
-        current_window_start = None
-        accumulated_consumption = 0.0
-        processed_data = []
-        
-        for entry in data_source:
-            cmdline = entry.get("cmdline", "")
-            exe = entry.get("exe", "")
+        if data_source is None:
+            data_source = EnergyStore.empty()
             
-            # Skip scaphandre processes and empty entries
-            if "scaphandre" in cmdline or "scaphandre" in exe or (not cmdline and not exe):
-                continue
-                
-            # Filter based on process type
-            is_relevant_process = (process_type == "postgres" and "postgres" in cmdline) or \
-                                 (process_type == "java" and ("java" in cmdline or "java" in exe))
-                                 
-            if not is_relevant_process:
-                continue
-                
-            consumption = entry.get("consumption", 0.0)
-            
-            # Energy timestamps are in seconds - convert to milliseconds for consistency with benchmark timestamps
-            timestamp = entry.get("timestamp", 0.0)
-            milliseconds = int(timestamp * 1000)  # Convert seconds to milliseconds
-            
-            if current_window_start is None or milliseconds >= current_window_start + window_size_ms:
-                if current_window_start is not None:
-                    processed_data.append((current_window_start, accumulated_consumption))
-                current_window_start = milliseconds
-                accumulated_consumption = consumption
-            else:
-                accumulated_consumption += consumption
-                
-        # Add final point
-        if current_window_start is not None:
-            processed_data.append((current_window_start, accumulated_consumption))
+        # Select the samples of the requested process type (scaphandre and empty entries have no category)
+        category = CATEGORY_POSTGRES if process_type == "postgres" else CATEGORY_JAVA
+        mask = data_source.category_mask(category)
+        
+        # Energy timestamps are stored in nanoseconds - convert to milliseconds for consistency with benchmark timestamps
+        milliseconds = data_source.timestamps_ns[mask] // NS_PER_MS
+        
+        # Each window opens at its first sample and takes the samples that follow within window_size_ms
+        window_starts, window_consumption = window_sums(milliseconds, data_source.consumption[mask], window_size_ms)
             
         # Convert processed data to DataFrame
-        df = pd.DataFrame(processed_data, columns=['timestamp', 'consumption'])
-        
-        # Important: Use the same timestamp conversion approach as in experiment details
-        # Convert the millisecond timestamps to EET datetime objects
-        datetime_values = []
-        for ts in df['timestamp']:
-            # All timestamps are now in milliseconds format consistently
-            datetime_values.append(self._convert_to_eet(ts))
-            
-        df['datetime'] = datetime_values
+        df = pd.DataFrame({'timestamp': window_starts, 'consumption': window_consumption})
+        
+        # Convert the millisecond timestamps to EET datetimes in one call
+        df['datetime'] = to_display_datetimes(window_starts, self.display_timezone)
         
         return df
     
+    def _get_cumulative_energy(self, section, process_type):
+        """Cumulative index of a process type's consumption over the loaded store, built once per load
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            process_type: Type of process ("java" or "postgres")
+            
+        Returns:
+            CumulativeEnergy, or None if there is no data for the section
+        """
+        store = self.energy_stores.get(section)
+        if store is None:
+            return None
+        
+        def build(loaded):
+            category = CATEGORY_POSTGRES if process_type == "postgres" else CATEGORY_JAVA
+            rows = np.flatnonzero(loaded.category_mask(category))
+            return loaded.cumulative(rows, loaded.consumption[rows])
+        
+        return store.derived(("cumulative", process_type), build)
+    
+    def _get_energy_total(self, section, process_type, start_time_ms=None, end_time_ms=None):
+        """Total consumption of a process type, as the sum of its series from _get_energy_series
+        
+        Answered from the cumulative index, without windowing the samples.
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            process_type: Type of process ("java" or "postgres")
+            start_time_ms: Start time in milliseconds (inclusive)
+            end_time_ms: End time in milliseconds (inclusive)
+            
+        Returns:
+            Total consumption
+        """
+        index = self._get_cumulative_energy(section, process_type)
+        if index is None:
+            return 0.0
+        if start_time_ms is None or end_time_ms is None:
+            return index.total()
+        
+        start_time_ns = int(start_time_ms * NS_PER_MS)
+        end_time_ns = int(end_time_ms * NS_PER_MS)
+        if not self.energy_stores[section].count_time_range(start_time_ns, end_time_ns):
+            # No entries in the range: the series show all data (same test as _filter_energy_data_by_time)
+            return index.total()
+        return index.total(start_time_ns, end_time_ns)
+    
+    def _get_run_energy_totals(self, experiment_id, section, process_type):
+        """Consumption of a process type during each run of an experiment
+        
+        Args:
+            experiment_id: ID of the experiment
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            process_type: Type of process ("java" or "postgres")
+            
+        Returns:
+            Dictionary of run number to total consumption (empty without energy data)
+        """
+        run_boundaries = self._get_run_time_boundaries(experiment_id)
+        index = self._get_cumulative_energy(section, process_type)
+        if index is None or not run_boundaries:
+            return {}
+        run_numbers, starts_ms, ends_ms = zip(*run_boundaries)
+        totals = index.totals([int(start_ms * NS_PER_MS) for start_ms in starts_ms],
+                              [int(end_ms * NS_PER_MS) for end_ms in ends_ms])
+        return dict(zip(run_numbers, totals.tolist()))
+    
+    def _get_latency_data(self, runs):
+        """Collect the request latencies of the given runs
+        
+        Args:
+            runs: List of run dictionaries from benchmark_results
+            
+        Returns:
+            DataFrame with datetime (EET) and latency (ms) columns
+        """
+        timestamps_ms = []
+        latencies_ns = []
+        for run in runs:
+            if "latencies" in run:
+                for entry in run["latencies"]:
+                    if "latency_ns" in entry and "timestamp" in entry:
+                        timestamps_ms.append(entry["timestamp"])
+                        latencies_ns.append(entry["latency_ns"])
+        
+        # Convert all timestamps at once and ns to ms
+        return pd.DataFrame({
+            'datetime': to_display_datetimes(timestamps_ms, self.display_timezone),
+            'latency': np.asarray(latencies_ns, dtype=np.float64) / 1_000_000
+        })
+
     def _convert_to_eet(self, timestamp, is_milliseconds=True):
         """Convert timestamp to EET datetime object
         
@@ -1413,76 +2033,38 @@ class ExperimentVisualizer:
         Returns:
             List of tuples (run_number, start_time_ms, end_time_ms)
         """
-        if not self.data or "benchmark_results" not in self.data or "experiments" not in self.data["benchmark_results"]:
-            return []
-            
-        experiment = self.data["benchmark_results"]["experiments"].get(experiment_id, {})
-        if not experiment or "runs" not in experiment or not experiment["runs"]:
-            return []
-            
-        run_boundaries = []
-        for i, run in enumerate(experiment["runs"]):
-            # Get start time
-            start_time_ms = run.get("start_timestamp")
-            
-            # Get end time (either directly or calculated from start + elapsed)
-            end_time_ms = run.get("end_timestamp")
-            if end_time_ms is None and "start_timestamp" in run and "elapsed_time_ms" in run:
-                end_time_ms = run["start_timestamp"] + run["elapsed_time_ms"]
-            elif end_time_ms is None and "timestamp" in run:
-                # If only timestamp exists (likely the end time), try to estimate start
-                end_time_ms = run["timestamp"]
-                if "elapsed_time_ms" in run:
-                    start_time_ms = end_time_ms - run["elapsed_time_ms"]
-            
-            # Only include if we have both start and end times
-            if start_time_ms is not None and end_time_ms is not None:
-                run_boundaries.append((i+1, start_time_ms, end_time_ms))
-        
-        return run_boundaries
+        return list(self._get_catalog().run_bounds.get(experiment_id, []))
 
     def get_all_experiments_time_boundaries(self):
         """
         Get the time boundaries that encompass all experiments in the data.
         Returns: (start_time_ms, end_time_ms) in milliseconds since epoch, or None if not available
         """
-        if not self.data or "benchmark_results" not in self.data or "experiments" not in self.data["benchmark_results"]:
-            return None, None
-            
-        experiments = self.data["benchmark_results"]["experiments"]
-        if not experiments:
+        catalog = self._get_catalog()
+        if not catalog.experiment_ids:
             return None, None
-            
-        all_start_times = []
-        all_end_times = []
-        
-        # Collect all timestamps from all experiments
-        for experiment_id, experiment_data in experiments.items():
-            start_time, end_time = self.get_experiment_time_boundaries(experiment_id)
-            if start_time is not None:
-                all_start_times.append(start_time)
-            if end_time is not None:
-                all_end_times.append(end_time)
-        
-        # Return the broadest range
-        if all_start_times and all_end_times:
-            return min(all_start_times), max(all_end_times)
-        
-        # Fallback to energy data if no experiment timestamps are available
-        api_energy_data = self.data.get("api_server_energy", [])
-        db_energy_data = self.data.get("db_server_energy", [])
-        
-        energy_timestamps = []
-        for entry in api_energy_data + db_energy_data:
-            if "timestamp" in entry:
-                # Convert seconds to milliseconds
-                energy_timestamps.append(entry.get("timestamp", 0) * 1000)
-        
-        if energy_timestamps:
-            # Use the full range of energy data
-            return min(energy_timestamps), max(energy_timestamps)
-            
-        return None, None
+        return catalog.all_bounds
+
+    def _energy_time_extent_ms(self):
+        """
+        Get the time range covered by the loaded energy data.
+        
+        Returns:
+            Tuple of (min_timestamp_ms, max_timestamp_ms), or None if there is no energy data
+        """
+        return self._get_catalog().energy_extent_ms
+
+    def _get_catalog(self):
+        """
+        Get the catalog of the loaded data, building it on first use after a change.
+        
+        Returns:
+            DatasetCatalog of self.data and self.energy_stores
+        """
+        if self._catalog is None:
+            # Boundaries, chronology and counts of the whole file, derived once
+            self._catalog = DatasetCatalog(self.data, self.energy_stores)
+        return self._catalog
 
     def _get_experiment_chronology(self):
         """
@@ -1491,24 +2073,7 @@ class ExperimentVisualizer:
         Returns:
             List of tuples (experiment_id, start_time_ms, end_time_ms) sorted by start time
         """
-        if not self.data or "benchmark_results" not in self.data or "experiments" not in self.data["benchmark_results"]:
-            return []
-            
-        experiments = self.data["benchmark_results"]["experiments"]
-        if not experiments:
-            return []
-        
-        # Collect time boundaries for each experiment
-        experiment_times = []
-        for experiment_id, experiment_data in experiments.items():
-            start_time, end_time = self.get_experiment_time_boundaries(experiment_id)
-            if start_time is not None and end_time is not None:
-                experiment_times.append((experiment_id, start_time, end_time))
-        
-        # Sort experiments by start time
-        experiment_times.sort(key=lambda x: x[1])
-        
-        return experiment_times
+        return list(self._get_catalog().chronology)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -4,16 +4,47 @@ import json
 import pandas as pd
 import numpy as np
 import os
-from datetime import datetime, timedelta, timezone
+import time
+from datetime import datetime, timezone
 import pytz  # For timezone handling
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from matplotlib.dates import DateFormatter
 import matplotlib.dates as mdates
 import matplotlib.ticker as mticker
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from results_loader import ENERGY_SECTIONS, index_members, iter_member, merge_event, replay_events
+from results_cache import ResultsCache, cache_variant
+from load_filters import FILTER_NAMES, LoadFilters
+from scaphandre_binary import FILE_EXTENSION, open_capture, section_for_path
+from session_loader import FILE_KINDS, load_session
+from time_utils import to_display_datetimes
+from series_cache import SeriesCache
+from background import BackgroundWorker, post_to_main_thread
+from plot_scheduler import ReplotScheduler
+from plot_artists import FigureArtists
+from zoom import ZoomRefresher
+from dataset_catalog import DatasetCatalog
+from diagnostics import EnergyDiagnostics
+from energy_metrics import TABLE_COLUMNS, TABLE_HEADINGS, PowerSeries, efficiency_table, format_table
+from energy_pyramid import EnergyPyramid
+from powerapi_index import DEFAULT_SAMPLE_SIZE, REQUIRED_FIELDS, PowerAPIIndex
+from energy_store import CATEGORY_JAVA, CATEGORY_POSTGRES, NS_PER_MS, NS_PER_SECOND, EnergyStore, EnergyStoreBuilder, window_sums
+
+# Process classification and layout of this visualizer in the results cache shared by both visualizers
+CACHE_NAMESPACE = "containers"
+NESTED = True
+
+
+def _classify_process(exe, cmdline):
+    """Return the CATEGORY_* bitmask of a scaphandre consumer"""
+    exe = exe.lower()
+    category = 0
+    if "java" in exe:
+        category |= CATEGORY_JAVA
+    if "postgres" in exe:
+        category |= CATEGORY_POSTGRES
+    return category
+
 
 class ExperimentVisualizer:
     def __init__(self, root):
@@ -25,6 +56,36 @@ class ExperimentVisualizer:
         self.mongodb_db_data = None
         self.api_container_id = None # Add instance variable for API container ID
         self.db_container_id = None  # Add instance variable for DB container ID
+        # Columnar scaphandre data per energy section, built while loading
+        self.energy_stores = {}
+        # Processed series reused across redraws; cleared whenever data is loaded
+        self.series_cache = SeriesCache()
+        # Boundaries and counts of the loaded data; rebuilt on first use after a change
+        self._catalog = None
+        # Parsed results files are kept on disk and memory-mapped when reopened (RESULTS_CACHE* variables)
+        self.results_cache = ResultsCache.from_environment()
+        # Records dropped while loading (ENERGY_LOAD_FILTERS or File > Load Options); used by the next load
+        self.load_filters = LoadFilters.from_environment()
+        self.load_filter_vars = {attribute: tk.BooleanVar(value=getattr(self.load_filters, attribute))
+                                 for attribute in FILTER_NAMES.values()}
+        # Energy sections of the loaded file that are located but not parsed yet (see _load_deferred_energy)
+        self._deferred_energy = None
+        self._deferred_energy_job = None
+        self._deferred_energy_callbacks = []
+        # Files loaded together in worker processes (Session menu); its arrays live in shared memory
+        self.session = None
+        self.session_dataset_var = tk.StringVar()
+        # File parsing and series processing run off the Tk main thread
+        self.load_worker = BackgroundWorker(root, "results-loader")
+        self.plot_worker = BackgroundWorker(root, "plot-data")
+        # Deferred energy sections are parsed on their own worker, so starting that parse never cancels a load
+        self.energy_worker = BackgroundWorker(root, "energy-loader")
+        # Control bar changes are merged into one plot update per burst of changes
+        self.replot_scheduler = ReplotScheduler(root, self._get_plot_inputs, self.update_plot, self._redraw_plot,
+                                                render_only_inputs=("plot_type", "accumulation", "show_host_api", "show_host_db"))
+        # Opt-in energy processing diagnostics (ENERGY_DIAGNOSTICS / ENERGY_DIAGNOSTICS_DIR or the Diagnostics menu)
+        self.diagnostics = EnergyDiagnostics.from_environment()
+        self.diagnostics_enabled_var = tk.BooleanVar(value=self.diagnostics.enabled)
         # Use pytz for proper timezone handling
         self.display_timezone = pytz.timezone('Europe/Helsinki')  # EET timezone
         
@@ -68,19 +129,47 @@ class ExperimentVisualizer:
         self.status_var.set("Ready. Please load a data file.")
         self.status_bar = ttk.Label(root, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        # Diagnostics counters, shown above the status bar while diagnostics are enabled
+        self.diagnostics_var = tk.StringVar()
+        self.diagnostics_label = ttk.Label(root, textvariable=self.diagnostics_var, relief=tk.SUNKEN, anchor=tk.W)
+        self._update_diagnostics_label()
     
     def setup_menu(self):
         menu_bar = tk.Menu(self.root)
         file_menu = tk.Menu(menu_bar, tearoff=0)
         file_menu.add_command(label="Load Data", command=self.load_data)
+        file_menu.add_command(label="Open Binary Energy Capture...", command=self.load_binary_capture)
+        load_options_menu = tk.Menu(file_menu, tearoff=0)
+        for attribute, label in (("drop_zero_consumption", "Skip Zero-Consumption Processes"),
+                                 ("known_processes_only", "Only Java, Postgres and Container Processes"),
+                                 ("run_windows_only", "Only Samples Inside Runs")):
+            load_options_menu.add_checkbutton(label=label, variable=self.load_filter_vars[attribute],
+                                              command=self._update_load_filters)
+        file_menu.add_cascade(label="Load Options", menu=load_options_menu)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=self.root.quit)
         menu_bar.add_cascade(label="File", menu=file_menu)
         
+        self.session_menu = tk.Menu(menu_bar, tearoff=0)
+        self.session_menu.add_command(label="Open Session Files...", command=self.open_session_files)
+        self.session_menu.add_command(label="Open Session Directory...", command=self.open_session_directory)
+        self.session_menu.add_command(label="Close Session", command=self.close_session)
+        menu_bar.add_cascade(label="Session", menu=self.session_menu)
+        
         view_menu = tk.Menu(menu_bar, tearoff=0)
         view_menu.add_command(label="Reset Plot View", command=self.reset_plot_view)
+        view_menu.add_command(label="Energy Efficiency...", command=self.show_energy_efficiency)
         menu_bar.add_cascade(label="View", menu=view_menu)
         
+        diagnostics_menu = tk.Menu(menu_bar, tearoff=0)
+        diagnostics_menu.add_checkbutton(label="Collect Energy Diagnostics", variable=self.diagnostics_enabled_var,
+                                         command=self._toggle_diagnostics)
+        diagnostics_menu.add_command(label="Set Capture Directory...", command=self._choose_diagnostics_dir)
+        diagnostics_menu.add_command(label="Show Summary", command=self._show_diagnostics_summary)
+        diagnostics_menu.add_command(label="Reset Counters", command=self._reset_diagnostics)
+        menu_bar.add_cascade(label="Diagnostics", menu=diagnostics_menu)
+        
         self.root.config(menu=menu_bar)
         
         # Add a frame for controls at the top
@@ -95,6 +184,149 @@ class ExperimentVisualizer:
         style.configure('Big.TButton', font=('Arial', 11, 'bold'))
         load_button.configure(style='Big.TButton')
     
+    def _toggle_diagnostics(self):
+        """Enable or disable the energy diagnostics from the Diagnostics menu"""
+        self.diagnostics.enabled = self.diagnostics_enabled_var.get()
+        self._update_diagnostics_label()
+        if self.diagnostics.enabled:
+            # Cached series would not be processed (and counted) again
+            self.series_cache.clear()
+            self.force_plot_update()
+    
+    def _choose_diagnostics_dir(self):
+        """Select the directory for sampled diagnostics records and enable diagnostics"""
+        capture_dir = filedialog.askdirectory(title="Select Diagnostics Capture Directory")
+        if not capture_dir:
+            return
+        self.diagnostics.capture_dir = capture_dir
+        self.diagnostics_enabled_var.set(True)
+        self._toggle_diagnostics()
+        self.status_var.set(f"Sampled energy diagnostics will be written to {capture_dir}")
+    
+    def _show_diagnostics_summary(self):
+        """Show the diagnostics counters in a dialog"""
+        messagebox.showinfo("Energy Diagnostics", self.diagnostics.summary_text())
+    
+    def _reset_diagnostics(self):
+        """Clear the diagnostics counters"""
+        self.diagnostics.reset()
+        self._update_diagnostics_label()
+    
+    def _update_diagnostics_label(self):
+        """Show the summary counts above the status bar while diagnostics are enabled"""
+        if not self.diagnostics.enabled:
+            self.diagnostics_label.pack_forget()
+            return
+        
+        parts = [f"{target_type}: {counters['processed_count']} processed, {counters['skipped_count']} skipped, "
+                 f"{counters['total_windows_created']} windows"
+                 for target_type, counters in sorted(self.diagnostics.counters.items())]
+        self.diagnostics_var.set("Diagnostics | " + (" | ".join(parts) if parts else "no energy data processed yet"))
+        self.diagnostics_label.pack(side=tk.BOTTOM, fill=tk.X)
+    
+    def show_energy_efficiency(self):
+        """Show the energy efficiency of every run and experiment in a table window"""
+        if self._load_deferred_energy(self.show_energy_efficiency):
+            return  # Shown once the energy data is read
+        if not self.data or not self.energy_stores:
+            messagebox.showinfo("Energy Efficiency", "Load a results file with energy data first.")
+            return
+        
+        started = time.perf_counter()
+        table = self.get_energy_efficiency_table()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        
+        window = tk.Toplevel(self.root)
+        window.title("Energy Efficiency")
+        window.geometry("1100x500")
+        
+        tree_frame = ttk.Frame(window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        tree = ttk.Treeview(tree_frame, columns=TABLE_COLUMNS, show="headings")
+        for column in TABLE_COLUMNS:
+            tree.heading(column, text=TABLE_HEADINGS[column])
+            tree.column(column, width=90, anchor=tk.W if column in ("experiment", "run", "source") else tk.E)
+        for values in format_table(table):
+            tree.insert("", tk.END, values=values)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        ttk.Button(window, text="Export CSV...", command=lambda: self._export_energy_efficiency(table)).pack(side=tk.RIGHT, padx=5, pady=5)
+        ttk.Label(window, text="Energy is the trapezoidal integral of the power samples over each run; "
+                               "gaps in the capture are not bridged.").pack(side=tk.LEFT, padx=5, pady=5)
+        
+        self.status_var.set(f"Energy efficiency of {len(table)} run/source rows computed in {elapsed_ms:.0f} ms")
+    
+    def _export_energy_efficiency(self, table):
+        """Save an energy efficiency table as CSV"""
+        file_path = filedialog.asksaveasfilename(
+            title="Export Energy Efficiency",
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+        table.to_csv(file_path, index=False)
+        self.status_var.set(f"Energy efficiency exported to {os.path.basename(file_path)}")
+    
+    def _get_efficiency_runs(self):
+        """DataFrame of the runs with time boundaries, for efficiency_table()"""
+        records = []
+        experiments = self.data.get("benchmark_results", {}).get("experiments", {})
+        for experiment_id, experiment in experiments.items():
+            runs = experiment.get("runs") or []
+            for run_number, start_time_ms, end_time_ms in self._get_run_time_boundaries(experiment_id):
+                run = runs[run_number - 1]
+                records.append({
+                    "experiment": experiment_id,
+                    "run": run_number,
+                    "start_ms": int(start_time_ms),
+                    "end_ms": int(end_time_ms),
+                    "requests": run.get("total_requests", np.nan),
+                    "successful_requests": run.get("successful_requests", np.nan),
+                })
+        return pd.DataFrame(records, columns=["experiment", "run", "start_ms", "end_ms", "requests", "successful_requests"])
+    
+    def get_energy_efficiency_table(self):
+        """Energy, average power and energy per request of every run and experiment (see energy_metrics.py)
+        
+        Returns:
+            DataFrame with one row per run and source (Scaphandre API/DB containers and hosts),
+            and per experiment and source
+        """
+        sources = {}
+        for name, section, target_type in [("API container", "api_server_energy", "api"),
+                                           ("DB container", "db_server_energy", "db"),
+                                           ("API host", "api_server_energy", "host"),
+                                           ("DB host", "db_server_energy", "host")]:
+            series = self._get_power_series(section, target_type)
+            if series is not None and len(series):
+                sources[name] = series
+        return efficiency_table(self._get_efficiency_runs(), sources)
+    
+    def _get_power_series(self, section, target_type):
+        """Power samples (Watts) of a target over the loaded store for integration, built once per load
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            target_type: "host", or a target type accepted by _target_mask
+            
+        Returns:
+            PowerSeries, or None if there is no data for the target
+        """
+        store = self.energy_stores.get(section)
+        if store is None or (target_type == "api" and not self.api_container_id) or (
+                target_type == "db" and not self.db_container_id):
+            return None
+        
+        def build(loaded):
+            _, timestamps_ns, watts = self._target_interval_series(loaded, target_type)
+            return PowerSeries(timestamps_ns, watts)
+        
+        return store.derived(("power", target_type, self.api_container_id, self.db_container_id), build)
+    
     def reset_plot_view(self):
         """Reset the plot view to default - Placeholder for future implementation"""
         self.status_var.set("Plot view reset functionality will be implemented in the future")
@@ -176,7 +408,7 @@ class ExperimentVisualizer:
         
         self.mongodb_api_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(api_frame, text="Include PowerAPI API Server Energy",
-                       variable=self.mongodb_api_var).pack(side=tk.LEFT, padx=5)
+                       variable=self.mongodb_api_var, command=lambda: self.replot_scheduler.request()).pack(side=tk.LEFT, padx=5)
         self.mongodb_api_file_var = tk.StringVar()
         ttk.Entry(api_frame, textvariable=self.mongodb_api_file_var, width=30).pack(side=tk.LEFT, padx=5)
         ttk.Button(api_frame, text="Browse", 
@@ -187,6 +419,7 @@ class ExperimentVisualizer:
         self.mongodb_api_target_combo = ttk.Combobox(api_frame, textvariable=self.mongodb_api_target_var, 
                                                     state="readonly", width=40)
         self.mongodb_api_target_combo.pack(side=tk.LEFT, padx=5)
+        self.mongodb_api_target_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # MongoDB DB server data
         db_frame = ttk.Frame(mongodb_frame)
@@ -194,7 +427,7 @@ class ExperimentVisualizer:
         
         self.mongodb_db_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(db_frame, text="Include PowerAPI DB Server Energy",
-                       variable=self.mongodb_db_var).pack(side=tk.LEFT, padx=5)
+                       variable=self.mongodb_db_var, command=lambda: self.replot_scheduler.request()).pack(side=tk.LEFT, padx=5)
         self.mongodb_db_file_var = tk.StringVar()
         ttk.Entry(db_frame, textvariable=self.mongodb_db_file_var, width=30).pack(side=tk.LEFT, padx=5)
         ttk.Button(db_frame, text="Browse", 
@@ -205,6 +438,12 @@ class ExperimentVisualizer:
         self.mongodb_db_target_combo = ttk.Combobox(db_frame, textvariable=self.mongodb_db_target_var, 
                                                    state="readonly", width=40)
         self.mongodb_db_target_combo.pack(side=tk.LEFT, padx=5)
+        self.mongodb_db_target_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
+        
+        # Trusted exports: check a sample of the entries instead of every one
+        self.mongodb_sampled_validation_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(mongodb_frame, text="Trusted files (validate a sample of the entries)",
+                       variable=self.mongodb_sampled_validation_var).pack(anchor=tk.W, padx=10, pady=(0, 5))
         
         # Frame for the plot
         self.plot_frame = ttk.Frame(self.right_frame)
@@ -213,6 +452,11 @@ class ExperimentVisualizer:
         # Create the matplotlib figure and canvas
         self.fig = Figure(figsize=(8, 5.4), dpi=100) # Adjusted height to 5.4
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.plot_frame)
+        # Axes and artists are kept between refreshes and only rebuilt when the layout changes
+        self.plot_artists = FigureArtists(self.fig)
+        # Zooming re-windows the visible range of the energy series at a finer resolution
+        self.zoom_refresher = ZoomRefresher(self.root, self.plot_artists, self.canvas,
+                                            lambda message: self.status_var.set(message))
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
         
         # Add matplotlib toolbar for zoom, pan, save, etc.
@@ -256,8 +500,8 @@ class ExperimentVisualizer:
         plot_type_combo = ttk.Combobox(scrollable_control_frame, textvariable=self.plot_type_var, 
                                       values=["Line", "Bar", "Scatter"], state="readonly", width=10)
         plot_type_combo.pack(side=tk.LEFT, padx=5, pady=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        plot_type_combo.bind("<<ComboboxSelected>>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        plot_type_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # Plot data selection
         ttk.Label(scrollable_control_frame, text="Data Source:").pack(side=tk.LEFT, padx=5, pady=5)
@@ -265,8 +509,8 @@ class ExperimentVisualizer:
         data_source_combo = ttk.Combobox(scrollable_control_frame, textvariable=self.data_source_var, 
                                       values=["Energy", "Energy Comparative", "Energy Consumed", "Latency", "Throughput"], state="readonly", width=14)
         data_source_combo.pack(side=tk.LEFT, padx=5, pady=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        data_source_combo.bind("<<ComboboxSelected>>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        data_source_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # Accumulation mode selection (for energy comparative)
         ttk.Label(scrollable_control_frame, text="Accumulation:").pack(side=tk.LEFT, padx=5, pady=5)
@@ -274,27 +518,31 @@ class ExperimentVisualizer:
         accumulation_combo = ttk.Combobox(scrollable_control_frame, textvariable=self.accumulation_var, 
                                       values=["Simple", "Accumulated"], state="readonly", width=10)
         accumulation_combo.pack(side=tk.LEFT, padx=5, pady=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        accumulation_combo.bind("<<ComboboxSelected>>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        accumulation_combo.bind("<<ComboboxSelected>>", lambda e: self.replot_scheduler.request())
         
         # Window size for accumulation (ms)
         ttk.Label(scrollable_control_frame, text="Window Size (ms):").pack(side=tk.LEFT, padx=5, pady=5)
         self.window_size_var = tk.StringVar(value="100")
         window_size_entry = ttk.Entry(scrollable_control_frame, textvariable=self.window_size_var, width=6)
         window_size_entry.pack(side=tk.LEFT, padx=5, pady=5)
-        # Update callback to use force_plot_update for more reliable refresh
-        window_size_entry.bind("<Return>", lambda e: self.force_plot_update())
+        # Merged with other control changes by the replot scheduler
+        window_size_entry.bind("<Return>", lambda e: self.replot_scheduler.request())
         
         # Checkboxes for host energy visibility
         ttk.Checkbutton(scrollable_control_frame, text="Show Host API Energy", 
-                       variable=self.show_host_api_var, command=self.force_plot_update).pack(side=tk.LEFT, padx=5, pady=5)
+                       variable=self.show_host_api_var, command=self.replot_scheduler.request).pack(side=tk.LEFT, padx=5, pady=5)
         ttk.Checkbutton(scrollable_control_frame, text="Show Host DB Energy", 
-                       variable=self.show_host_db_var, command=self.force_plot_update).pack(side=tk.LEFT, padx=5, pady=5)
+                       variable=self.show_host_db_var, command=self.replot_scheduler.request).pack(side=tk.LEFT, padx=5, pady=5)
         
         # Add help tooltip about navigation
         ttk.Label(scrollable_control_frame, text="Plot visualization will be implemented in future versions", 
                  font=("Arial", 8, "italic")).pack(side=tk.RIGHT, padx=10, pady=5)
     
+    def _update_load_filters(self):
+        """Take the Load Options of the File menu; they apply from the next file loaded"""
+        self.load_filters = LoadFilters(**{attribute: var.get() for attribute, var in self.load_filter_vars.items()})
+
     def load_data(self):
         file_path = filedialog.askopenfilename(
             title="Select Data File",
@@ -304,20 +552,352 @@ class ExperimentVisualizer:
         if not file_path:
             return
         
+        self.status_var.set(f"Loading data from {os.path.basename(file_path)}...")
+
+        # Start from an empty session; results arrive from the load worker
+        self.data = {}
+        self._set_energy_stores({})
+        self.plot_worker.cancel()
+        self.api_container_id = None
+        self.db_container_id = None
+        self.experiment_selector['values'] = []
+        self.experiment_var.set("")
+        self._streamed_experiment_ids = []
+        self.energy_worker.cancel()
+        self._deferred_energy = None
+
+        # Submitting cancels a load that is still running, so a stale file never overwrites this one
+        self.load_worker.submit(
+            lambda job: self._read_results_file(job, file_path),
+            on_done=lambda energy_stores: self._finish_load(file_path, energy_stores),
+            on_error=lambda error: self._on_load_error(file_path, error)
+        )
+
+    def _read_results_file(self, job, file_path):
+        """Read the non-energy part of a results file on the load worker thread
+
+        The top-level members are located by their byte offsets first, so
+        benchmark_results and container_info are decoded (and handed to the
+        main thread one event at a time) without parsing the energy sections,
+        wherever they are in the file.  The energy sections are parsed by
+        _read_energy_sections when a plot first needs them.
+
+        Args:
+            job: Job handle of the load worker
+            file_path: Path of the results file
+
+        Returns:
+            Dictionary of EnergyStore per energy section (empty unless the file was cached)
+        """
+        filters = self.load_filters
+        energy_stores = self._open_cached_results(job, file_path, filters)
+        if energy_stores is not None:
+            return energy_stores
+
+        members = index_members(file_path)
+        job.check()
+        results = {}
+        for key, span in members.items():
+            if key in ENERGY_SECTIONS:
+                continue
+            for event in iter_member(file_path, key, span):
+                job.check()
+                merge_event(results, event)
+                job.post(self._on_results_event, event)
+
+        sections = {key: span for key, span in members.items() if key in ENERGY_SECTIONS}
+        if sections:
+            job.post(self._defer_energy_sections, (file_path, sections, results, filters))
+        else:
+            self._cache_results(file_path, results, {}, filters)
+        return {}
+
+    def _read_energy_sections(self, job, file_path, sections, results, filters):
+        """Parse the energy sections of a results file on the load worker thread
+
+        Host intervals go straight into columnar storage; the raw dicts are dropped
+        once appended.
+
+        Args:
+            job: Job handle of the load worker
+            file_path: Path of the results file
+            sections: Dictionary of energy section to its (start, end) byte offsets
+            results: The non-energy part of the file, for the run windows and the cache
+            filters: LoadFilters the file is loaded with
+
+        Returns:
+            Dictionary of EnergyStore per energy section
+        """
+        windows_ns = filters.run_windows_ns(results)
+        builders = {}
+        records_read = 0
+        for section, span in sections.items():
+            for event in iter_member(file_path, section, span):
+                job.check()
+                if event.kind == "value":
+                    # Not an array of records; kept in the results like any other member
+                    merge_event(results, event)
+                    job.post(self._on_results_event, event)
+                    continue
+                if section not in builders:
+                    builders[section] = EnergyStoreBuilder(_classify_process, nested=NESTED, filters=filters,
+                                                           windows_ns=windows_ns)
+                if event.kind == "items":
+                    builders[section].append(event.payload)
+                    records_read += len(event.payload)
+                    job.post(self.status_var.set, f"Loading {os.path.basename(file_path)}: {records_read} energy records read...")
+
+        energy_stores = {section: builder.build() for section, builder in builders.items()}
+        self._cache_results(file_path, results, energy_stores, filters)
+        return energy_stores
+
+    def _open_cached_results(self, job, file_path, filters):
+        """Hand the cached version of a results file to the main thread, if there is one
+
+        Args:
+            job: Job handle of the load worker
+            file_path: Path of the results file
+            filters: LoadFilters the file is loaded with
+
+        Returns:
+            Dictionary of EnergyStore per energy section, or None if the file is not cached
+        """
+        cached = (self.results_cache.load(file_path, cache_variant(CACHE_NAMESPACE, NESTED, filters), nested=NESTED)
+                  if self.results_cache is not None else None)
+        if cached is None:
+            return None
+        results, energy_stores = cached
+        job.post(self.status_var.set, f"Loading {os.path.basename(file_path)} from the cache...")
+        # All energy data is available at once, before the first experiment is shown
+        job.post(self._set_energy_stores, energy_stores)
+        for event in replay_events(results):
+            job.check()
+            job.post(self._on_results_event, event)
+        return energy_stores
+
+    def _cache_results(self, file_path, results, energy_stores, filters):
+        """Write a parsed results file to the cache; a failed write only costs the next load"""
+        if self.results_cache is None:
+            return
         try:
-            self.status_var.set(f"Loading data from {os.path.basename(file_path)}...")
-            self.root.update_idletasks()
-            
-            print(f"Attempting to load JSON from: {file_path}") # DEBUG
-            with open(file_path, 'r') as file:
-                self.data = json.load(file)
-            
-            print(f"Successfully loaded JSON. Data type: {type(self.data)}") # DEBUG
-            if isinstance(self.data, dict):
-                 print(f"Top-level keys found: {list(self.data.keys())}") # DEBUG
+            self.results_cache.store(file_path, results, energy_stores, cache_variant(CACHE_NAMESPACE, NESTED, filters))
+        except (OSError, TypeError, ValueError):
+            pass
+
+    def open_session_files(self):
+        """Load several results files, scaphandre captures and PowerAPI exports together (see session_loader.py)"""
+        file_paths = filedialog.askopenfilenames(
+            title="Select Session Files",
+            filetypes=[("JSON files", "*.json"), ("Scaphandre binary captures", "*" + FILE_EXTENSION), ("All files", "*.*")]
+        )
+        if file_paths:
+            self._load_session(list(file_paths))
+
+    def open_session_directory(self):
+        """Load the results files, scaphandre captures and PowerAPI exports found under a directory"""
+        directory = filedialog.askdirectory(title="Select Session Directory")
+        if directory:
+            self._load_session([directory])
+
+    def _load_session(self, paths):
+        """Parse the files of a session in worker processes; the load worker waits for them off the Tk main thread
+
+        Args:
+            paths: Files and directories of the session
+        """
+        self.status_var.set("Loading session...")
+        filters = self.load_filters
+        sample_size = DEFAULT_SAMPLE_SIZE if self.mongodb_sampled_validation_var.get() else None
+
+        def work(job):
+            return load_session(paths, _classify_process, nested=NESTED, kinds=FILE_KINDS, filters=filters,
+                                powerapi_sample_size=sample_size, cache=self.results_cache,
+                                cache_namespace=CACHE_NAMESPACE, check=job.check,
+                                progress=lambda done, total, file_path: job.post(
+                                    self.status_var.set, f"Loading session: {done}/{total} files ({os.path.basename(file_path)})"))
+
+        # Submitting cancels a load that is still running, so a stale file never overwrites the session
+        self.load_worker.submit(work, on_done=self._install_session, on_error=lambda error: self._on_load_error(", ".join(paths), error))
+
+    def _install_session(self, session):
+        """Offer the datasets of a loaded session in the Session menu and show the first one"""
+        if self.session is not None:
+            # Arrays still in use stay valid, only the shared memory names are released
+            self.session.close()
+        self.session = session
+        self.session_menu.delete(3, tk.END)
+        if session.datasets:
+            self.session_menu.add_separator()
+        for dataset in session.datasets:
+            self.session_menu.add_radiobutton(label=dataset.name, value=dataset.name, variable=self.session_dataset_var,
+                                              command=self._on_session_dataset_selected)
+
+        if session.errors:
+            messagebox.showwarning("Session", "Some files were not loaded:\n" + "\n".join(
+                f"{os.path.basename(file_path)}: {message}" for file_path, message in session.errors))
+        if not session.datasets:
+            self.status_var.set("No results files found for the session.")
+            return
+        self.session_dataset_var.set(session.datasets[0].name)
+        self._show_session_dataset(session.datasets[0])
+
+    def _on_session_dataset_selected(self):
+        """Show the dataset picked in the Session menu"""
+        for dataset in self.session.datasets if self.session is not None else []:
+            if dataset.name == self.session_dataset_var.get():
+                self._show_session_dataset(dataset)
+                return
+
+    def _show_session_dataset(self, dataset):
+        """Make a dataset of the session the loaded data, without reading any file
+
+        Args:
+            dataset: SessionDataset to show
+        """
+        self.load_worker.cancel()
+        self.plot_worker.cancel()
+        self.energy_worker.cancel()
+        self.data = {}
+        self._deferred_energy = None
+        self._set_energy_stores({})
+        self.experiment_selector['values'] = []
+        self.experiment_var.set("")
+        self._streamed_experiment_ids = []
+
+        for event in replay_events(dataset.results):
+            self._on_results_event(event)
+        self._finish_load(dataset.file_path, dataset.energy_stores)
+
+        # PowerAPI exports of the dataset; those of another machine must not stay selected
+        for data_type in ("api", "db"):
+            if data_type in dataset.powerapi:
+                file_path, index = dataset.powerapi[data_type]
+                getattr(self, f"mongodb_{data_type}_file_var").set(file_path)
+                self._install_mongodb_index(data_type, index)
             else:
-                 print("Loaded data is not a dictionary.") # DEBUG
-                 
+                setattr(self, f"mongodb_{data_type}_data", None)
+                getattr(self, f"mongodb_{data_type}_file_var").set("")
+
+    def close_session(self):
+        """Release the shared memory of the session; the data shown stays until another file is loaded"""
+        if self.session is None:
+            return
+        self.session.close()
+        self.session = None
+        self.session_menu.delete(3, tk.END)
+        self.status_var.set("Session closed.")
+
+    def load_binary_capture(self):
+        """Use a converted scaphandre capture (see scaphandre_binary.py) as the energy data of one server
+
+        The capture is memory-mapped, so it replaces the energy section of the
+        loaded results without being parsed.
+        """
+        file_path = filedialog.askopenfilename(
+            title="Select Binary Energy Capture",
+            filetypes=[("Scaphandre binary captures", "*" + FILE_EXTENSION), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+
+        try:
+            store, header = open_capture(file_path, _classify_process)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Failed to open binary capture: {str(e)}")
+            return
+        section = header.get("section") or section_for_path(file_path)
+        if section is None:
+            messagebox.showerror("Error", "Cannot tell which server the capture belongs to. "
+                                          "Convert it again with --section.")
+            return
+
+        self._set_energy_stores({**self.energy_stores, section: store})
+        self.status_var.set(f"Opened {os.path.basename(file_path)}: {header['records']} records in {header['intervals']} host intervals for {section}")
+        self.force_plot_update()
+
+    def _defer_energy_sections(self, deferred):
+        """Remember the energy sections left unread by _read_results_file
+
+        Args:
+            deferred: Tuple (file path, {section: span}, results, filters)
+        """
+        self._deferred_energy = deferred
+        self._deferred_energy_job = None
+        self._deferred_energy_callbacks = []
+
+    def _deferred_energy_sections(self):
+        """Energy sections of the loaded file that are located but not parsed yet"""
+        return self._deferred_energy[1] if self._deferred_energy is not None else {}
+
+    def _load_deferred_energy(self, on_loaded=None):
+        """Start parsing the deferred energy sections, unless that is already under way
+
+        Once they are installed, the selected experiment is shown again (with
+        its run energy and energy plots) and on_loaded is called.
+
+        Args:
+            on_loaded: Optional callback run on the main thread afterwards
+
+        Returns:
+            True if the energy data is being read, False if there is nothing to wait for
+        """
+        if self._deferred_energy is None or not self.data:
+            return False
+        if on_loaded is not None and on_loaded not in self._deferred_energy_callbacks:
+            self._deferred_energy_callbacks.append(on_loaded)
+        if self._deferred_energy_job is None or self._deferred_energy_job.cancelled:
+            file_path, sections, results, filters = self._deferred_energy
+            self.status_var.set(f"Reading energy data from {os.path.basename(file_path)}...")
+            self._deferred_energy_job = self.energy_worker.submit(
+                lambda job: self._read_energy_sections(job, file_path, sections, results, filters),
+                on_done=self._finish_energy_load,
+                on_error=lambda error: self._on_load_error(file_path, error)
+            )
+        return True
+
+    def _finish_energy_load(self, energy_stores):
+        """Install the energy sections read by _read_energy_sections"""
+        callbacks = self._deferred_energy_callbacks
+        self._deferred_energy = None
+        self._deferred_energy_job = None
+        self._deferred_energy_callbacks = []
+        # Binary captures opened in the meantime replace the parsed sections
+        self._set_energy_stores({**energy_stores, **self.energy_stores})
+        self.on_experiment_selected(None)
+        for callback in callbacks:
+            callback()
+
+    def _set_energy_stores(self, energy_stores):
+        """Replace the energy data and drop the series processed from the old data"""
+        self.energy_stores = energy_stores
+        self.series_cache.clear()
+        self._catalog = None
+
+    def _on_results_event(self, event):
+        """Merge a non-energy event of the file being loaded into self.data"""
+        merge_event(self.data, event)
+        self._catalog = None
+        if event.path == ("container_info",) and isinstance(event.payload, dict):
+            # Container IDs are needed to attribute energy to the API/DB containers
+            self.api_container_id = event.payload.get("api_container_id")
+            self.db_container_id = event.payload.get("db_container_id")
+        elif event.path[:2] == ("benchmark_results", "experiments") and len(event.path) == 3:
+            self._streamed_experiment_ids.append(event.path[2])
+            self._on_experiment_streamed(self._streamed_experiment_ids)
+
+    def _finish_load(self, file_path, energy_stores):
+        """Install the fully loaded energy data, check the file structure and select all experiments
+
+        Args:
+            file_path: Path of the loaded results file
+            energy_stores: Dictionary of EnergyStore per energy section
+        """
+        try:
+            # Energy sections parsed in the meantime (deferred sections, binary captures) are kept
+            self._set_energy_stores({**energy_stores, **self.energy_stores})
+            # Boundaries, chronology and counts of the whole file, derived once
+            self._catalog = DatasetCatalog(self.data, self.energy_stores)
+
             # Define the expected keys
             # We absolutely need benchmark_results, but energy data is optional -> REVERTING: Making energy keys required again
             # required_keys = ["benchmark_results"]
@@ -342,27 +922,24 @@ class ExperimentVisualizer:
             #     print("File structure check passed. Found all expected keys.") # DEBUG
             
             # Check if the data has the expected structure (Restoring strict check)
-            missing_keys = [key for key in expected_keys if key not in self.data or self.data[key] is None]
+            missing_keys = [key for key in expected_keys
+                            if key not in self.energy_stores and key not in self._deferred_energy_sections()
+                            and (key not in self.data or self.data[key] is None)]
             
             if missing_keys:
-                 print(f"ERROR: The file is missing the following expected top-level keys: {missing_keys}") # DEBUG
                  messagebox.showerror("Error", f"The file does not have the expected structure or is missing required keys: {', '.join(missing_keys)}")
                  self.data = None # Clear invalid data
+                 self._set_energy_stores({})
                  self.status_var.set("Error: Invalid file structure.")
                  return
             
-            print("File structure check passed. Found all expected keys.") # DEBUG
-            
             # Extract container IDs if available
             if "container_info" in self.data and isinstance(self.data["container_info"], dict):
                 self.api_container_id = self.data["container_info"].get("api_container_id")
                 self.db_container_id = self.data["container_info"].get("db_container_id")
-                print(f"Found container IDs: API={self.api_container_id}, DB={self.db_container_id}") # DEBUG
                 if not self.api_container_id or not self.db_container_id:
-                    print("WARNING: Missing 'api_container_id' or 'db_container_id' within 'container_info'. Energy filtering might fail.") # DEBUG
                     self.status_var.set("Warning: Missing container IDs in data.")
             else:
-                 print("WARNING: 'container_info' key not found or not a dictionary. Cannot extract container IDs.") # DEBUG
                  self.status_var.set("Warning: Container info missing, cannot link energy data.")
                  self.api_container_id = None # Ensure IDs are None if container_info is missing
                  self.db_container_id = None
@@ -372,20 +949,19 @@ class ExperimentVisualizer:
             if "benchmark_results" in self.data and isinstance(self.data["benchmark_results"], dict) and "experiments" in self.data["benchmark_results"] and isinstance(self.data["benchmark_results"]["experiments"], dict):
                 experiments = self.data["benchmark_results"]["experiments"]
                 experiment_ids = list(experiments.keys())
-                print(f"Found {len(experiment_ids)} experiments in benchmark_results.") # DEBUG
                 
                 # Add "All Experiments" as the first option
                 all_experiments_option = "All Experiments"
                 self.experiment_selector['values'] = [all_experiments_option] + experiment_ids
                 
-                # Select the first option (All Experiments)
-                self.experiment_selector.current(0)
-                self.experiment_var.set(all_experiments_option)
+                # Switch to "All Experiments" unless the user picked something while loading
+                if self.experiment_var.get() in ("", experiment_ids[0] if experiment_ids else ""):
+                    self.experiment_selector.current(0)
+                    self.experiment_var.set(all_experiments_option)
                 self.on_experiment_selected(None) # Trigger update
                 
                 self.status_var.set(f"Loaded {len(experiment_ids)} experiments from {os.path.basename(file_path)}")
             else:
-                print("ERROR: 'benchmark_results' key found, but it does not contain a valid 'experiments' dictionary.") # DEBUG
                 if "benchmark_results" not in self.data:
                     err_msg = "'benchmark_results' key is missing."
                 elif not isinstance(self.data["benchmark_results"], dict):
@@ -408,20 +984,44 @@ class ExperimentVisualizer:
                 for widget in self.details_frame.winfo_children():
                     widget.destroy()
                 self.fig.clear()
+                self.plot_artists.reset()
                 self.canvas.draw()
                 
-        except json.JSONDecodeError as e:
-            print(f"ERROR: Failed to decode JSON from file: {file_path}\nError: {e}") # DEBUG
-            messagebox.showerror("Error", f"Failed to parse JSON file: {str(e)}\nPlease check the file content.")
-            self.status_var.set("Error loading data file: Invalid JSON")
-            self.data = None
         except Exception as e:
-            print(f"ERROR: An unexpected error occurred during data loading: {e}") # DEBUG
+            self._on_load_error(file_path, e)
+
+    def _on_load_error(self, file_path, error):
+        """Report a failed load and reset the session
+
+        Args:
+            file_path: Path of the results file
+            error: Exception raised while reading or checking the file
+        """
+        if isinstance(error, json.JSONDecodeError):
+            messagebox.showerror("Error", f"Failed to parse JSON file: {str(error)}\nPlease check the file content.")
+            self.status_var.set("Error loading data file: Invalid JSON")
+        else:
             import traceback
-            traceback.print_exc() # Print full traceback for unexpected errors
-            messagebox.showerror("Error", f"Failed to load data: {str(e)}")
+            traceback.print_exception(type(error), error, error.__traceback__) # Print full traceback for unexpected errors
+            messagebox.showerror("Error", f"Failed to load data: {str(error)}")
             self.status_var.set("Error loading data file")
-            self.data = None
+        self.data = None
+        self.energy_worker.cancel()
+        self._deferred_energy = None
+        self._set_energy_stores({})
+
+    def _on_experiment_streamed(self, experiment_ids):
+        """Offer experiments in the selector as soon as they are read from the file
+
+        Args:
+            experiment_ids: IDs of the experiments read so far, in file order
+        """
+        self.experiment_selector['values'] = ["All Experiments"] + experiment_ids
+
+        # Show the first experiment right away with the energy data read so far
+        if len(experiment_ids) == 1:
+            self.experiment_var.set(experiment_ids[0])
+            self.on_experiment_selected(None)
     
     def on_experiment_selected(self, event):
         if not self.data or not self.experiment_var.get():
@@ -523,6 +1123,10 @@ class ExperimentVisualizer:
             ttk.Label(self.details_frame, text="Run Summary:", font=("Arial", 10, "bold")).grid(row=row, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
             row += 1
             
+            # Energy per run, from the cumulative index of each server (no pass over the samples)
+            api_run_energy = self._get_run_energy_totals(selected_experiment, "api_server_energy", "java")
+            db_run_energy = self._get_run_energy_totals(selected_experiment, "db_server_energy", "postgres")
+            
             for i, run in enumerate(experiment["runs"]):
                 ttk.Label(self.details_frame, text=f"Run {i+1}:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
                 
@@ -549,6 +1153,11 @@ class ExperimentVisualizer:
                     p99 = latency_info.get("percentiles", {}).get("p99", 0) / 1_000_000
                     ttk.Label(self.details_frame, text=f"Median: {median:.2f}, P95: {p95:.2f}, P99: {p99:.2f}").grid(row=row, column=1, sticky=tk.W, padx=5, pady=2)
                     row += 1
+                
+                if i + 1 in api_run_energy or i + 1 in db_run_energy:
+                    ttk.Label(self.details_frame, text="  Energy (Watts):").grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
+                    ttk.Label(self.details_frame, text=f"API: {api_run_energy.get(i + 1, 0):.2f}, DB: {db_run_energy.get(i + 1, 0):.2f}").grid(row=row, column=1, sticky=tk.W, padx=5, pady=2)
+                    row += 1
         
         # Update the plot for this experiment
         self.update_plot()
@@ -556,16 +1165,112 @@ class ExperimentVisualizer:
         self.status_var.set(f"Displaying data for experiment: {selected_experiment}")
     
     def update_plot(self):
-        """Update the plot with selected experiment data"""
+        """Update the plot with selected experiment data
+
+        The energy series are filtered and windowed on the plot worker; the
+        figure is drawn on the main thread once they are in the series cache.
+        A newer update cancels one that is still being processed.
+        """
         if not self.data or not self.experiment_var.get():
             return
-        
+
+        # This update reads every input, so it replaces a scheduled one
+        self.replot_scheduler.cancel()
         experiment_id = self.experiment_var.get()
         self.status_var.set(f"Updating plot for: {experiment_id}")
+
+        energy_series, mongodb_series = self._get_plot_series_requests(self.data_source_var.get())
+        if not energy_series and not mongodb_series:
+            # Latency and throughput plots come straight from the benchmark results
+            self.plot_worker.cancel()
+            self._render_plot()
+            return
+        if energy_series and self._load_deferred_energy():
+            return  # Drawn once the energy sections are read
+
+        if experiment_id == "All Experiments":
+            start_time_ms, end_time_ms = self.get_all_experiments_time_boundaries()
+        else:
+            start_time_ms, end_time_ms = self.get_experiment_time_boundaries(experiment_id)
+        window_size_ms = self._get_window_size_ms()
+
+        def prefetch(job):
+            for section, target_type in energy_series:
+                job.check()
+                self._get_energy_series(section, target_type, window_size_ms, start_time_ms, end_time_ms)
+            for data_type, target_service in mongodb_series:
+                job.check()
+                self._get_mongodb_series(data_type, target_service, window_size_ms, start_time_ms, end_time_ms)
+
+        self.plot_worker.submit(prefetch, on_done=lambda _: self._render_plot())
+
+    def _get_plot_series_requests(self, data_source):
+        """Series a data source plots, for processing them ahead of drawing
+
+        Args:
+            data_source: Selected data source
+
+        Returns:
+            Tuple of ([(section, target_type), ...], [(data_type, target_service), ...])
+        """
+        if data_source == "Energy":
+            energy_series = [("api_server_energy", "api"), ("db_server_energy", "db"),
+                             ("api_server_energy", "host"), ("db_server_energy", "host")]
+        elif data_source == "Energy Consumed":
+            energy_series = [("api_server_energy", "java"), ("db_server_energy", "postgres")]
+        elif data_source == "Energy Comparative":
+            energy_series = [("api_server_energy", "api"), ("db_server_energy", "db")]
+        else:
+            return [], []
+
+        mongodb_series = []
+        if self.mongodb_api_var.get() and self.mongodb_api_data is not None and self.mongodb_api_target_var.get():
+            mongodb_series.append(("api", self.mongodb_api_target_var.get()))
+        if self.mongodb_db_var.get() and self.mongodb_db_data is not None and self.mongodb_db_target_var.get():
+            mongodb_series.append(("db", self.mongodb_db_target_var.get()))
+        return energy_series, mongodb_series
+
+    def _get_plot_inputs(self):
+        """Current values of the inputs of the plot, for the replot scheduler"""
+        return {
+            "experiment": self.experiment_var.get(),
+            "plot_type": self.plot_type_var.get(),
+            "data_source": self.data_source_var.get(),
+            "accumulation": self.accumulation_var.get(),
+            "window_size": self._get_window_size_ms(),
+            "show_host_api": self.show_host_api_var.get(),
+            "show_host_db": self.show_host_db_var.get(),
+            "mongodb_api": self.mongodb_api_var.get(),
+            "mongodb_api_target": self.mongodb_api_target_var.get(),
+            "mongodb_db": self.mongodb_db_var.get(),
+            "mongodb_db_target": self.mongodb_db_target_var.get(),
+        }
+
+    def _redraw_plot(self):
+        """Redraw the plot when only inputs that do not affect the processed series changed"""
+        if self.plot_worker.busy:
+            return  # The update in progress draws with the current inputs
+        self._render_plot()
+
+    def _get_window_size_ms(self):
+        """Accumulation window size from the entry field (100 ms if it is not a number)"""
+        try:
+            return int(self.window_size_var.get())
+        except ValueError:
+            return 100  # Default if parsing fails
+
+    def _render_plot(self):
+        """Draw the plot of the selected experiment data (energy series come from the series cache)"""
+        if not self.data or not self.experiment_var.get():
+            return
+        
+        experiment_id = self.experiment_var.get()
+        self.replot_scheduler.mark_drawn()
         self.root.update_idletasks()  # Force UI update
         
-        # Clear the figure
-        self.fig.clear()
+        # Reuse the axes and artists of the previous refresh unless the layout changes
+        self.plot_artists.begin((self.data_source_var.get(), self.plot_type_var.get(), self.accumulation_var.get()))
+        self.zoom_refresher.reset()
         
         # Get the experiment time boundaries
         if experiment_id == "All Experiments":
@@ -586,38 +1291,27 @@ class ExperimentVisualizer:
             self.status_var.set(f"Time bounds: {start_time_eet} to {end_time_eet} (EET)")
             self.root.update_idletasks()
         
-        # Filter energy data to only include entries within the time range
-        api_energy_data = self.data.get("api_server_energy", [])
-        db_energy_data = self.data.get("db_server_energy", [])
-        
-        filtered_api_data = self._filter_energy_data_by_time(api_energy_data, start_time_ms, end_time_ms)
-        filtered_db_data = self._filter_energy_data_by_time(db_energy_data, start_time_ms, end_time_ms)
-        
         # Get the selected plot type and data source
         plot_type = self.plot_type_var.get()
         data_source = self.data_source_var.get()
         accumulation_mode = self.accumulation_var.get()
-        
-        try:
-            window_size_ms = int(self.window_size_var.get())
-        except ValueError:
-            window_size_ms = 100  # Default if parsing fails
+        window_size_ms = self._get_window_size_ms()
         
         # Process the energy data
         if data_source == "Energy":
             # Process API server data (target container by ID)
-            api_df = self._process_energy_data(filtered_api_data, "api", window_size_ms)
+            api_df = self._get_energy_series("api_server_energy", "api", window_size_ms, start_time_ms, end_time_ms)
             
             # Process DB server data (target container by name)
-            db_df = self._process_energy_data(filtered_db_data, "db", window_size_ms)
+            db_df = self._get_energy_series("db_server_energy", "db", window_size_ms, start_time_ms, end_time_ms)
             
             # Process Host data (using api_server_energy as source)
-            host_api_df = self._process_energy_data(filtered_api_data, "host", window_size_ms)
+            host_api_df = self._get_energy_series("api_server_energy", "host", window_size_ms, start_time_ms, end_time_ms)
             # Process Host data (using db_server_energy as source)
-            host_db_df = self._process_energy_data(filtered_db_data, "host", window_size_ms)
+            host_db_df = self._get_energy_series("db_server_energy", "host", window_size_ms, start_time_ms, end_time_ms)
             
             # Create a new subplot
-            ax = self.fig.add_subplot(111)
+            ax = self.plot_artists.add_subplot(111)
             
             # Configure the axis
             ax.set_xlabel('Time (EET)', fontsize=10)
@@ -643,43 +1337,45 @@ class ExperimentVisualizer:
                 # Plot the data based on the selected plot type
                 if plot_type == "Line":
                     if not api_df.empty:
-                        ax.plot(api_df['datetime'], api_df['consumption'], 
+                        api_line, = ax.plot(api_df['datetime'], api_df['consumption'], 
                                label='Scaphandre API Server (Java)', color='red', linewidth=2, marker=None)
+                        self._track_energy_zoom(ax, api_line, "api_server_energy", "api")
                     
                     if not db_df.empty:
-                        ax.plot(db_df['datetime'], db_df['consumption'], 
+                        db_line, = ax.plot(db_df['datetime'], db_df['consumption'], 
                                label='Scaphandre DB Server (Postgres)', color='blue', linewidth=2, marker=None)
+                        self._track_energy_zoom(ax, db_line, "db_server_energy", "db")
                     
                     if not host_api_df.empty and self.show_host_api_var.get():
-                         ax.plot(host_api_df['datetime'], host_api_df['consumption'], 
+                         host_api_line, = ax.plot(host_api_df['datetime'], host_api_df['consumption'], 
                                 label='Host (API Server)', color='purple', linestyle='--', linewidth=1.5, marker=None)
+                         self._track_energy_zoom(ax, host_api_line, "api_server_energy", "host")
                     
                     if not host_db_df.empty and self.show_host_db_var.get():
-                         ax.plot(host_db_df['datetime'], host_db_df['consumption'], 
+                         host_db_line, = ax.plot(host_db_df['datetime'], host_db_df['consumption'], 
                                 label='Host (DB Server)', color='grey', linestyle=':', linewidth=1.5, marker=None)
+                         self._track_energy_zoom(ax, host_db_line, "db_server_energy", "host")
                     
                     # Plot MongoDB data if available
                     if self.mongodb_api_var.get() and self.mongodb_api_data is not None:
                         api_target = self.mongodb_api_target_var.get()
                         if api_target:
-                            mongo_api_df = self._get_filtered_mongodb_data(self.mongodb_api_data, api_target, start_time_ms, end_time_ms)
-                            if mongo_api_df is not None:
-                                # Apply windowing to MongoDB data
-                                processed_mongo_api_df = self._process_mongodb_data(mongo_api_df, window_size_ms)
+                            processed_mongo_api_df = self._get_mongodb_series("api", api_target, window_size_ms, start_time_ms, end_time_ms)
+                            if processed_mongo_api_df is not None:
                                 if not processed_mongo_api_df.empty:
-                                    ax.plot(processed_mongo_api_df['datetime'], processed_mongo_api_df['power'],
+                                    mongo_api_line, = ax.plot(processed_mongo_api_df['datetime'], processed_mongo_api_df['power'],
                                            label='PowerAPI API', color='green', linewidth=2, marker=None)
+                                    self._track_mongodb_zoom(ax, mongo_api_line, "api", api_target)
                     
                     if self.mongodb_db_var.get() and self.mongodb_db_data is not None:
                         db_target = self.mongodb_db_target_var.get()
                         if db_target:
-                            mongo_db_df = self._get_filtered_mongodb_data(self.mongodb_db_data, db_target, start_time_ms, end_time_ms)
-                            if mongo_db_df is not None:
-                                # Apply windowing to MongoDB data
-                                processed_mongo_db_df = self._process_mongodb_data(mongo_db_df, window_size_ms)
+                            processed_mongo_db_df = self._get_mongodb_series("db", db_target, window_size_ms, start_time_ms, end_time_ms)
+                            if processed_mongo_db_df is not None:
                                 if not processed_mongo_db_df.empty:
-                                    ax.plot(processed_mongo_db_df['datetime'], processed_mongo_db_df['power'],
+                                    mongo_db_line, = ax.plot(processed_mongo_db_df['datetime'], processed_mongo_db_df['power'],
                                            label='PowerAPI DB', color='orange', linewidth=2, marker=None)
+                                    self._track_mongodb_zoom(ax, mongo_db_line, "db", db_target)
                 
                 elif plot_type == "Bar":
                     # For bar plots, we'll use bar width based on data density
@@ -705,10 +1401,8 @@ class ExperimentVisualizer:
                     if self.mongodb_api_var.get() and self.mongodb_api_data is not None:
                         api_target = self.mongodb_api_target_var.get()
                         if api_target:
-                            mongo_api_df = self._get_filtered_mongodb_data(self.mongodb_api_data, api_target, start_time_ms, end_time_ms)
-                            if mongo_api_df is not None:
-                                # Apply windowing to MongoDB data
-                                processed_mongo_api_df = self._process_mongodb_data(mongo_api_df, window_size_ms)
+                            processed_mongo_api_df = self._get_mongodb_series("api", api_target, window_size_ms, start_time_ms, end_time_ms)
+                            if processed_mongo_api_df is not None:
                                 if not processed_mongo_api_df.empty:
                                     ax.bar(processed_mongo_api_df['datetime'], processed_mongo_api_df['power'],
                                            width=bar_width, label='PowerAPI API', color='green', alpha=0.7)
@@ -716,10 +1410,8 @@ class ExperimentVisualizer:
                     if self.mongodb_db_var.get() and self.mongodb_db_data is not None:
                         db_target = self.mongodb_db_target_var.get()
                         if db_target:
-                            mongo_db_df = self._get_filtered_mongodb_data(self.mongodb_db_data, db_target, start_time_ms, end_time_ms)
-                            if mongo_db_df is not None:
-                                # Apply windowing to MongoDB data
-                                processed_mongo_db_df = self._process_mongodb_data(mongo_db_df, window_size_ms)
+                            processed_mongo_db_df = self._get_mongodb_series("db", db_target, window_size_ms, start_time_ms, end_time_ms)
+                            if processed_mongo_db_df is not None:
                                 if not processed_mongo_db_df.empty:
                                     ax.bar(processed_mongo_db_df['datetime'], processed_mongo_db_df['power'],
                                            width=bar_width, label='PowerAPI DB', color='orange', alpha=0.7)
@@ -764,7 +1456,8 @@ class ExperimentVisualizer:
                                        bbox=dict(facecolor='white', alpha=0.8, boxstyle='round'))
                 
                 # Apply tight layout to maximize plot area
-                self.fig.tight_layout()
+                if self.plot_artists.layout_changed:
+                    self.fig.tight_layout()
                 
                 # Add experiment boundary visualization when showing all experiments
                 if experiment_id == "All Experiments":
@@ -817,7 +1510,7 @@ class ExperimentVisualizer:
                 
         elif data_source == "Energy Consumed":
             # Create a new subplot
-            ax = self.fig.add_subplot(111)
+            ax = self.plot_artists.add_subplot(111)
             
             # Configure the axis
             ax.set_xlabel('Time (EET)', fontsize=10)
@@ -834,10 +1527,10 @@ class ExperimentVisualizer:
             ax.tick_params(axis='x', rotation=45)
             
             # Process API server data (java processes)
-            api_df = self._process_energy_data(filtered_api_data, "java", window_size_ms)
+            api_df = self._get_energy_series("api_server_energy", "java", window_size_ms, start_time_ms, end_time_ms)
             
             # Process DB server data (postgres processes)
-            db_df = self._process_energy_data(filtered_db_data, "postgres", window_size_ms)
+            db_df = self._get_energy_series("db_server_energy", "postgres", window_size_ms, start_time_ms, end_time_ms)
             
             # Convert boundaries to datetime objects for final filtering
             start_dt = None
@@ -874,9 +1567,8 @@ class ExperimentVisualizer:
             if self.mongodb_api_var.get() and self.mongodb_api_data is not None:
                 api_target = self.mongodb_api_target_var.get()
                 if api_target:
-                    mongo_api_df = self._get_filtered_mongodb_data(self.mongodb_api_data, api_target, start_time_ms, end_time_ms)
-                    if mongo_api_df is not None:
-                        processed_mongo_api_df = self._process_mongodb_data(mongo_api_df, window_size_ms)
+                    processed_mongo_api_df = self._get_mongodb_series("api", api_target, window_size_ms, start_time_ms, end_time_ms)
+                    if processed_mongo_api_df is not None:
                         if not processed_mongo_api_df.empty:
                             # Filter processed MongoDB data as well
                             if start_dt is not None:
@@ -892,9 +1584,8 @@ class ExperimentVisualizer:
             if self.mongodb_db_var.get() and self.mongodb_db_data is not None:
                 db_target = self.mongodb_db_target_var.get()
                 if db_target:
-                    mongo_db_df = self._get_filtered_mongodb_data(self.mongodb_db_data, db_target, start_time_ms, end_time_ms)
-                    if mongo_db_df is not None:
-                        processed_mongo_db_df = self._process_mongodb_data(mongo_db_df, window_size_ms)
+                    processed_mongo_db_df = self._get_mongodb_series("db", db_target, window_size_ms, start_time_ms, end_time_ms)
+                    if processed_mongo_db_df is not None:
                         if not processed_mongo_db_df.empty:
                             # Filter processed MongoDB data as well
                             if start_dt is not None:
@@ -934,9 +1625,9 @@ class ExperimentVisualizer:
                         ax.axvline(x=run_start_dt, color='green', linestyle='--', alpha=0.7)
                         ax.axvline(x=run_end_dt, color='red', linestyle='--', alpha=0.7)
             
-            # Calculate and display total energy consumed
-            total_api = api_df['consumption'].sum() if not api_df.empty else 0
-            total_db = db_df['consumption'].sum() if not db_df.empty else 0
+            # Calculate and display total energy consumed (from the cumulative index, the windows plotted above)
+            total_api = self._get_energy_total("api_server_energy", "java", start_time_ms, end_time_ms, window_size_ms)
+            total_db = self._get_energy_total("db_server_energy", "postgres", start_time_ms, end_time_ms, window_size_ms)
             total_mongo_api = processed_mongo_api_df['power'].sum() if 'processed_mongo_api_df' in locals() and not processed_mongo_api_df.empty else 0
             total_mongo_db = processed_mongo_db_df['power'].sum() if 'processed_mongo_db_df' in locals() and not processed_mongo_db_df.empty else 0
             
@@ -957,7 +1648,8 @@ class ExperimentVisualizer:
                    fontsize=10)
             
             # Apply tight layout
-            self.fig.tight_layout()
+            if self.plot_artists.layout_changed:
+                self.fig.tight_layout()
             
             # Update status with total energy consumption
             self.status_var.set(f"Total energy consumed: {total_api + total_db + total_mongo_api + total_mongo_db:.2f} Watts")
@@ -965,14 +1657,14 @@ class ExperimentVisualizer:
         elif data_source == "Energy Comparative":
             # Create two subplots for comparative energy visualization
             # Process API server data (target container by ID)
-            api_df = self._process_energy_data(filtered_api_data, "api", window_size_ms)
+            api_df = self._get_energy_series("api_server_energy", "api", window_size_ms, start_time_ms, end_time_ms)
             
             # Process DB server data (target container by name)
-            db_df = self._process_energy_data(filtered_db_data, "db", window_size_ms)
+            db_df = self._get_energy_series("db_server_energy", "db", window_size_ms, start_time_ms, end_time_ms)
             
             # Create a figure with two subplots (2 rows, 1 column)
-            ax1 = self.fig.add_subplot(211)  # Top subplot
-            ax2 = self.fig.add_subplot(212)  # Bottom subplot
+            ax1 = self.plot_artists.add_subplot(211)  # Top subplot
+            ax2 = self.plot_artists.add_subplot(212)  # Bottom subplot
             
             # Configure the axes
             ax1.set_title(f'Energy Consumption - Scaphandre API Server (Java) - {experiment_id}', fontsize=10)
@@ -1011,10 +1703,8 @@ class ExperimentVisualizer:
                     if self.mongodb_api_var.get() and self.mongodb_api_data is not None:
                         api_target = self.mongodb_api_target_var.get()
                         if api_target:
-                            mongo_api_df = self._get_filtered_mongodb_data(self.mongodb_api_data, api_target, start_time_ms, end_time_ms)
-                            if mongo_api_df is not None:
-                                # Apply windowing to MongoDB data
-                                processed_mongo_api_df = self._process_mongodb_data(mongo_api_df, window_size_ms)
+                            processed_mongo_api_df = self._get_mongodb_series("api", api_target, window_size_ms, start_time_ms, end_time_ms)
+                            if processed_mongo_api_df is not None:
                                 if not processed_mongo_api_df.empty:
                                     ax1.plot(processed_mongo_api_df['datetime'], processed_mongo_api_df['power'],
                                            color='green', linewidth=2, marker=None, 
@@ -1042,10 +1732,8 @@ class ExperimentVisualizer:
                         if self.mongodb_api_var.get() and self.mongodb_api_data is not None:
                             api_target = self.mongodb_api_target_var.get()
                             if api_target:
-                                mongo_api_df = self._get_filtered_mongodb_data(self.mongodb_api_data, api_target, start_time_ms, end_time_ms)
-                                if mongo_api_df is not None:
-                                    # Apply windowing to MongoDB data
-                                    processed_mongo_api_df = self._process_mongodb_data(mongo_api_df, window_size_ms)
+                                processed_mongo_api_df = self._get_mongodb_series("api", api_target, window_size_ms, start_time_ms, end_time_ms)
+                                if processed_mongo_api_df is not None:
                                     if not processed_mongo_api_df.empty:
                                         # Plot MongoDB data on the main y-axis
                                         processed_mongo_api_df['accumulated'] = processed_mongo_api_df['power'].cumsum()
@@ -1092,10 +1780,8 @@ class ExperimentVisualizer:
                     if self.mongodb_db_var.get() and self.mongodb_db_data is not None:
                         db_target = self.mongodb_db_target_var.get()
                         if db_target:
-                            mongo_db_df = self._get_filtered_mongodb_data(self.mongodb_db_data, db_target, start_time_ms, end_time_ms)
-                            if mongo_db_df is not None:
-                                # Apply windowing to MongoDB data
-                                processed_mongo_db_df = self._process_mongodb_data(mongo_db_df, window_size_ms)
+                            processed_mongo_db_df = self._get_mongodb_series("db", db_target, window_size_ms, start_time_ms, end_time_ms)
+                            if processed_mongo_db_df is not None:
                                 if not processed_mongo_db_df.empty:
                                     if plot_type == "Line":
                                         ax2.plot(processed_mongo_db_df['datetime'], processed_mongo_db_df['power'],
@@ -1127,10 +1813,8 @@ class ExperimentVisualizer:
                         if self.mongodb_db_var.get() and self.mongodb_db_data is not None:
                             db_target = self.mongodb_db_target_var.get()
                             if db_target:
-                                mongo_db_df = self._get_filtered_mongodb_data(self.mongodb_db_data, db_target, start_time_ms, end_time_ms)
-                                if mongo_db_df is not None:
-                                    # Apply windowing to MongoDB data
-                                    processed_mongo_db_df = self._process_mongodb_data(mongo_db_df, window_size_ms)
+                                processed_mongo_db_df = self._get_mongodb_series("db", db_target, window_size_ms, start_time_ms, end_time_ms)
+                                if processed_mongo_db_df is not None:
                                     if not processed_mongo_db_df.empty:
                                         # Plot MongoDB data on the main y-axis
                                         processed_mongo_db_df['accumulated'] = processed_mongo_db_df['power'].cumsum()
@@ -1179,16 +1863,18 @@ class ExperimentVisualizer:
                 ax2.legend(lines + lines2, labels + labels2, loc='upper left', fontsize='small')
             
             # Adjust the layout to fit the subplots
-            self.fig.tight_layout()
+            if self.plot_artists.layout_changed:
+                self.fig.tight_layout()
             
             # Update status with data summary
             api_count = len(api_df) if not api_df.empty else 0
             db_count = len(db_df) if not db_df.empty else 0
-            total_api = api_df['consumption'].sum() if not api_df.empty else 0
-            total_db = db_df['consumption'].sum() if not db_df.empty else 0
             
             # Format the summary message
             if accumulation_mode == "Accumulated":
+                # Totals from the cumulative index instead of summing the windows
+                total_api = self._get_energy_total("api_server_energy", "api", start_time_ms, end_time_ms)
+                total_db = self._get_energy_total("db_server_energy", "db", start_time_ms, end_time_ms)
                 self.status_var.set(
                     f"Comparative view: API data: {api_count} points, total: {total_api:.2e} units | "
                     f"DB data: {db_count} points, total: {total_db:.2e} units"
@@ -1202,7 +1888,7 @@ class ExperimentVisualizer:
             # Handle the "All Experiments" case
             if experiment_id == "All Experiments":
                 # Create a new subplot
-                ax = self.fig.add_subplot(111)
+                ax = self.plot_artists.add_subplot(111)
                 
                 # Configure the axis
                 ax.set_xlabel('Time (EET)', fontsize=10)
@@ -1222,20 +1908,10 @@ class ExperimentVisualizer:
                     runs = experiment.get("runs", [])
                     
                     # Collect latency data from all runs of this experiment
-                    latency_data = []
-                    for run in runs:
-                        if "latencies" in run:
-                            for entry in run["latencies"]:
-                                if "latency_ns" in entry and "timestamp" in entry:
-                                    timestamp_ms = entry["timestamp"]
-                                    latency_ms = entry["latency_ns"] / 1_000_000  # Convert ns to ms
-                                    dt = self._convert_to_eet(timestamp_ms)
-                                    latency_data.append((dt, latency_ms))
+                    latency_df = self._get_latency_data(runs)
                     
-                    if latency_data:
+                    if not latency_df.empty:
                         has_data = True
-                        # Convert to DataFrame for easier plotting
-                        latency_df = pd.DataFrame(latency_data, columns=['datetime', 'latency'])
                         
                         # Plot based on plot type with experiment-specific color
                         color = experiment_colors[idx % len(experiment_colors)]
@@ -1287,7 +1963,8 @@ class ExperimentVisualizer:
                                 ax.axvline(x=run_end_dt, color='red', linestyle='--', alpha=0.3)
                     
                     # Apply tight layout to maximize plot area
-                    self.fig.tight_layout()
+                    if self.plot_artists.layout_changed:
+                        self.fig.tight_layout()
                     
                     # Add experiment boundary visualization when showing all experiments
                     chronology = self._get_experiment_chronology()
@@ -1342,13 +2019,13 @@ class ExperimentVisualizer:
                 runs = experiment.get("runs", [])
                 
                 if not runs:
-                    ax = self.fig.add_subplot(111)
+                    ax = self.plot_artists.add_subplot(111)
                     ax.text(0.5, 0.5, "No latency data available for this experiment", 
                            horizontalalignment='center', verticalalignment='center',
                            transform=ax.transAxes, fontsize=14)
                 else:
                     # Create a new subplot
-                    ax = self.fig.add_subplot(111)
+                    ax = self.plot_artists.add_subplot(111)
                     
                     # Configure the axis
                     ax.set_xlabel('Time (EET)', fontsize=10)
@@ -1360,24 +2037,13 @@ class ExperimentVisualizer:
                     ax.tick_params(axis='x', rotation=45)
                     
                     # Collect latency data from all runs
-                    latency_data = []
-                    for run in runs:
-                        if "latencies" in run:
-                            for entry in run["latencies"]:
-                                if "latency_ns" in entry and "timestamp" in entry:
-                                    timestamp_ms = entry["timestamp"]
-                                    latency_ms = entry["latency_ns"] / 1_000_000  # Convert ns to ms
-                                    dt = self._convert_to_eet(timestamp_ms)
-                                    latency_data.append((dt, latency_ms))
+                    latency_df = self._get_latency_data(runs)
                     
-                    if not latency_data:
+                    if latency_df.empty:
                         ax.text(0.5, 0.5, "No detailed latency data available", 
                                horizontalalignment='center', verticalalignment='center',
                                transform=ax.transAxes, fontsize=14)
                     else:
-                        # Convert to DataFrame for easier plotting
-                        latency_df = pd.DataFrame(latency_data, columns=['datetime', 'latency'])
-                        
                         # Plot based on plot type
                         if plot_type == "Line":
                             ax.plot(latency_df['datetime'], latency_df['latency'], 
@@ -1421,7 +2087,8 @@ class ExperimentVisualizer:
                                        bbox=dict(facecolor='white', alpha=0.8, boxstyle='round'))
                         
                         # Apply tight layout to maximize plot area
-                        self.fig.tight_layout()
+                        if self.plot_artists.layout_changed:
+                            self.fig.tight_layout()
 
                         # Add legend
                         ax.legend(loc='upper left', fontsize='small')
@@ -1430,7 +2097,7 @@ class ExperimentVisualizer:
             # Handle the "All Experiments" case
             if experiment_id == "All Experiments":
                 # Create a new subplot
-                ax = self.fig.add_subplot(111)
+                ax = self.plot_artists.add_subplot(111)
                 
                 # Configure the axis
                 ax.set_xlabel('Time (EET)', fontsize=10)
@@ -1560,7 +2227,7 @@ class ExperimentVisualizer:
                 runs = experiment.get("runs", [])
                 
                 # Create a new subplot
-                ax = self.fig.add_subplot(111)
+                ax = self.plot_artists.add_subplot(111)
                 
                 # Configure the axis
                 ax.set_xlabel('Run Number', fontsize=10)
@@ -1645,8 +2312,15 @@ class ExperimentVisualizer:
                            horizontalalignment='center', verticalalignment='center',
                            transform=ax.transAxes, fontsize=10)
         
-        # Redraw the canvas with the new plot
+        # Drop the artists of the previous refresh that were not reused, then redraw the canvas
+        self.plot_artists.finish()
+        decimation_summary = self.plot_artists.decimation_summary()
+        if decimation_summary:
+            self.status_var.set(decimation_summary)
+        # The axes outlive this refresh, so start a new zoom/pan history for the Home button
+        self.toolbar.update()
         self.canvas.draw()
+        self.zoom_refresher.activate(window_size_ms, start_time_ms, end_time_ms)
     
     def force_plot_update(self):
         """Force update the plot with the current experiment selection"""
@@ -1665,162 +2339,132 @@ class ExperimentVisualizer:
         """
         if not self.data or not experiment_id:
             return None, None
-            
-        if "benchmark_results" in self.data and "experiments" in self.data["benchmark_results"]:
-            experiment = self.data["benchmark_results"]["experiments"].get(experiment_id, {})
-            
-            if not experiment or "runs" not in experiment or not experiment["runs"]:
-                return None, None
-            
-            runs = experiment["runs"]
-            if not runs:
-                return None, None
-                
-            # Get the start timestamp from the first run
-            first_run = runs[0]
-            start_time_ms = first_run.get("start_timestamp")
-            
-            # Get the end timestamp from the last run
-            last_run = runs[-1]
-            end_time_ms = last_run.get("end_timestamp")
-            
-            # If end_timestamp is not available, try to calculate it from start_timestamp + elapsed_time_ms
-            if end_time_ms is None and "start_timestamp" in last_run and "elapsed_time_ms" in last_run:
-                end_time_ms = last_run["start_timestamp"] + last_run["elapsed_time_ms"]
-            
-            # If we still don't have valid timestamps, fall back to timestamp field
-            if start_time_ms is None and "timestamp" in first_run:
-                # If timestamp exists, assume it's the end time and try to calculate start time
-                if "elapsed_time_ms" in first_run:
-                    start_time_ms = first_run["timestamp"] - first_run["elapsed_time_ms"]
-                else:
-                    # No way to determine start time, just use timestamp
-                    start_time_ms = first_run["timestamp"]
-            
-            if end_time_ms is None and "timestamp" in last_run:
-                end_time_ms = last_run["timestamp"]
-            
-            # If we have valid timestamps, return them without any buffer
-            if start_time_ms is not None and end_time_ms is not None:
-                return start_time_ms, end_time_ms
-            
+
+        catalog = self._get_catalog()
+        if experiment_id in catalog.experiment_bounds and not catalog.has_explicit_bounds(experiment_id):
             # If we can't determine the time boundaries, fall back to using energy data
-            if start_time_ms is None or end_time_ms is None:
-                self.status_var.set(f"No explicit time boundaries found for {experiment_id}, using full energy data range.")
-                
-                # Look for any timestamps in the energy data
-                api_energy_data = self.data.get("api_server_energy", [])
-                db_energy_data = self.data.get("db_server_energy", [])
-                
-                energy_timestamps = []
-                for entry in api_energy_data + db_energy_data:
-                    if "timestamp" in entry:
-                        # Convert seconds to milliseconds
-                        energy_timestamps.append(entry.get("timestamp", 0) * 1000)
-                
-                if energy_timestamps:
-                    # Use the full range of energy data
-                    return min(energy_timestamps), max(energy_timestamps)
-        
-        return None, None
+            self.status_var.set(f"No explicit time boundaries found for {experiment_id}, using full energy data range.")
+        return catalog.resolved_bounds(experiment_id)
     
-    def _filter_energy_data_by_time(self, energy_data, start_time_ms=None, end_time_ms=None):
+    def _filter_energy_data_by_time(self, energy_data, start_time_ms=None, end_time_ms=None, show_all_if_empty=True):
         """
-        Filter energy data to only include entries within the specified time range.
+        Filter energy data to only include host intervals within the specified time range.
         
         Args:
-            energy_data: List of energy data entries
+            energy_data: EnergyStore with the host intervals of one server
             start_time_ms: Start time in milliseconds (inclusive)
             end_time_ms: End time in milliseconds (inclusive)
+            show_all_if_empty: Return all data when the time range holds none (False returns None)
             
         Returns:
-            Filtered list of energy data entries
+            EnergyStore holding the intervals within the time range (or None if there is no data)
         """
-        if not energy_data:
-            return []
+        if energy_data is None or not len(energy_data):
+            return None
             
         # If no time boundaries provided, return all data
         if start_time_ms is None or end_time_ms is None:
-            self.status_var.set(f"No time boundaries provided - showing all {len(energy_data)} energy data points")
+            self._set_status(f"No time boundaries provided - showing all {len(energy_data)} energy data points")
             return energy_data
             
-        # Convert start/end times to seconds for comparison with energy timestamp
-        start_time_sec = start_time_ms / 1000
-        end_time_sec = end_time_ms / 1000
+        # Energy timestamps are stored in nanoseconds (a host interval is stamped with its last consumer timestamp)
+        start_time_ns = int(start_time_ms * NS_PER_MS)
+        end_time_ns = int(end_time_ms * NS_PER_MS)
         
         # Convert to human-readable format for debugging
         start_time_str = self._convert_to_eet(start_time_ms).strftime('%Y-%m-%d %H:%M:%S')
         end_time_str = self._convert_to_eet(end_time_ms).strftime('%Y-%m-%d %H:%M:%S')
         
-        # Get min/max timestamps from the data for debugging
-        energy_timestamps = []
-        for entry in energy_data:
-            if "timestamp" in entry:
-                # Convert energy timestamp to seconds if it's in milliseconds
-                ts = entry["timestamp"]
-                if isinstance(ts, (int, float)) and ts > 1e10:  # If timestamp is in milliseconds
-                    ts = ts / 1000
-                energy_timestamps.append(ts)
-        
-        if not energy_timestamps:
-            self.status_var.set("Warning: No timestamp fields found in energy data")
-            return energy_data  # Return all data if no timestamps
-        
-        min_timestamp = min(energy_timestamps)
-        max_timestamp = max(energy_timestamps)
+        # Get min/max timestamps from the data for debugging (cached with the time index)
+        min_timestamp_ns, max_timestamp_ns = energy_data.time_extent_ns()
         
         # Convert energy timestamps to human-readable format
-        min_time_str = self._convert_to_eet(min_timestamp * 1000).strftime('%Y-%m-%d %H:%M:%S')
-        max_time_str = self._convert_to_eet(max_timestamp * 1000).strftime('%Y-%m-%d %H:%M:%S')
+        min_time_str = self._convert_to_eet(min_timestamp_ns / NS_PER_MS).strftime('%Y-%m-%d %H:%M:%S')
+        max_time_str = self._convert_to_eet(max_timestamp_ns / NS_PER_MS).strftime('%Y-%m-%d %H:%M:%S')
         
         # Print detailed debug information
-        self.status_var.set(
+        self._set_status(
             f"Experiment time: {start_time_str} to {end_time_str} | "
             f"Energy data: {min_time_str} to {max_time_str} | "
             f"Total entries: {len(energy_data)}"
         )
         
         # Check if there's any overlap at all
-        if max_timestamp < start_time_sec or min_timestamp > end_time_sec:
-            self.status_var.set(
+        if max_timestamp_ns < start_time_ns or min_timestamp_ns > end_time_ns:
+            if not show_all_if_empty:
+                return None
+            self._set_status(
                 f"WARNING: No overlap between experiment time ({start_time_str} - {end_time_str}) "
                 f"and energy data ({min_time_str} - {max_time_str}). "
                 f"Showing ALL data instead."
             )
             return energy_data  # Return all data if no overlap
         
-        # Filter data to only include entries within the exact experiment time range
-        filtered_data = []
-        for entry in energy_data:
-            if "timestamp" in entry:
-                # Convert energy timestamp to seconds if it's in milliseconds
-                ts = entry["timestamp"]
-                if isinstance(ts, (int, float)) and ts > 1e10:  # If timestamp is in milliseconds
-                    ts = ts / 1000
-                if ts >= start_time_sec and ts <= end_time_sec:
-                    filtered_data.append(entry)
-        
-        if not filtered_data:
-            self.status_var.set(
+        # Filter data to only include intervals within the exact experiment time range
+        # (binary search on the sorted timestamp index, no scan over the data)
+        if not energy_data.count_time_range(start_time_ns, end_time_ns):
+            if not show_all_if_empty:
+                return None
+            self._set_status(
                 f"WARNING: No energy data found within the exact experiment timeframe. "
                 f"Showing ALL data instead."
             )
             return energy_data
+        filtered_data = energy_data.select_time_range(start_time_ns, end_time_ns)
         
         # Show how many data points were kept
-        self.status_var.set(
+        self._set_status(
             f"Filtered energy data: kept {len(filtered_data)}/{len(energy_data)} entries "
             f"({(len(filtered_data)/len(energy_data)*100):.1f}%)"
         )
         
         return filtered_data
     
+    def _set_status(self, message):
+        """Show a status message; safe to call from the plot worker thread"""
+        if not post_to_main_thread(self.status_var.set, message):
+            self.status_var.set(message)
+
+    def _get_energy_series(self, section, target_type, window_size_ms, start_time_ms=None, end_time_ms=None,
+                           show_all_if_empty=True):
+        """Get the windowed energy series of one server, reusing earlier results
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            target_type: Type of target to filter by (see _process_energy_data)
+            window_size_ms: Size of accumulation window in milliseconds
+            start_time_ms: Start time in milliseconds (inclusive)
+            end_time_ms: End time in milliseconds (inclusive)
+            show_all_if_empty: Plot all data when the time range holds none (False gives an empty series)
+            
+        Returns:
+            DataFrame with processed data (callers may add columns to it)
+        """
+        def compute():
+            filtered_data = self._filter_energy_data_by_time(self.energy_stores.get(section), start_time_ms, end_time_ms,
+                                                             show_all_if_empty)
+            return self._process_energy_data(filtered_data, target_type, window_size_ms)
+        
+        key = (section, target_type, window_size_ms, start_time_ms, end_time_ms, show_all_if_empty)
+        # Shallow copy so columns added while plotting do not end up in the cache
+        return self.series_cache.get_or_compute(key, compute).copy(deep=False)
+    
+    def _track_energy_zoom(self, ax, artist, section, target_type):
+        """Re-window a plotted Scaphandre series for the visible time range when the plot is zoomed"""
+        self.zoom_refresher.track(ax, artist, lambda window_size_ms, start_time_ms, end_time_ms: self._get_energy_series(
+            section, target_type, window_size_ms, start_time_ms, end_time_ms, show_all_if_empty=False), 'consumption')
+    
+    def _track_mongodb_zoom(self, ax, artist, data_type, target_service):
+        """Re-window a plotted PowerAPI series for the visible time range when the plot is zoomed"""
+        self.zoom_refresher.track(ax, artist, lambda window_size_ms, start_time_ms, end_time_ms: self._get_mongodb_series(
+            data_type, target_service, window_size_ms, start_time_ms, end_time_ms), 'power')
+    
     def _process_energy_data(self, data_source, target_type, window_size_ms):
         """Process energy data with time-based windowing from the new JSON structure.
         
         Args:
-            data_source: List of host interval energy data entries (each containing host info and a consumers list)
-            target_type: Type of target to filter by ("api" for container ID, "db" for container name)
+            data_source: EnergyStore with the host intervals of one server (host info and consumer samples)
+            target_type: Type of target to filter by ("api"/"db" for container ID, "java"/"postgres" for process, "host")
             window_size_ms: Size of accumulation window in milliseconds
             
         Returns:
@@ -1832,197 +2476,300 @@ class ExperimentVisualizer:
 
         # Check if IDs were loaded successfully
         if target_type == "api" and not target_api_id:
-            print("ERROR: API container ID not available. Cannot process API energy data.") # DEBUG
-            self.status_var.set("Error: API container ID missing.")
+            self._set_status("Error: API container ID missing.")
             return pd.DataFrame(columns=['timestamp', 'consumption', 'datetime']) # Return empty DF
         
         if target_type == "db" and not target_db_id:
-             print("ERROR: DB container ID not available. Cannot process DB energy data.") # DEBUG
-             self.status_var.set("Error: DB container ID missing.")
+             self._set_status("Error: DB container ID missing.")
              return pd.DataFrame(columns=['timestamp', 'consumption', 'datetime']) # Return empty DF
 
-        # Initialize variables for accumulation
-        current_window_start = None
-        accumulated_consumption = 0.0
-        processed_data = []
-        
-        # Create debug log structure
-        debug_log = {
-            "target_type": target_type,
-            "window_size_ms": window_size_ms,
-            "total_host_intervals": len(data_source),
-            "processed_consumer_entries": [],
-            "intervals_without_target": 0,
-            "skipped_consumers": []
-        }
+        if data_source is None:
+            data_source = EnergyStore.empty(nested=True)
 
         # --- Host Energy Processing Logic --- 
         if target_type == "host":
-            for host_interval in data_source:
-                host_info = host_interval.get("host")
-                if not host_info:
-                    continue # Skip if host info is missing
-                
-                consumption = host_info.get("consumption")
-                timestamp = host_info.get("timestamp")
-                
-                if consumption is None or timestamp is None:
-                    continue # Skip if consumption or timestamp is missing for host
-                
-                # Convert consumption from microWatts to Watts
-                consumption_watts = consumption / 1_000_000.0
-                
-                # Convert timestamp from seconds to milliseconds
-                milliseconds = int(timestamp * 1000)
+            # Rolled up from the pre-aggregated levels when the window size allows it
+            df = self._pyramid_windows(data_source, target_type, window_size_ms)
+            if df is None:
+                # Host timestamps and consumption, skipping intervals where either is missing
+                host_timestamps_ns, host_consumption = data_source.host_series()
                 
-                # Apply windowing logic
-                if current_window_start is None or milliseconds >= current_window_start + window_size_ms:
-                    if current_window_start is not None and accumulated_consumption > 0:
-                        dt = self._convert_to_eet(current_window_start)
-                        processed_data.append((current_window_start, accumulated_consumption, dt))
-                    current_window_start = milliseconds - (milliseconds % window_size_ms)
-                    accumulated_consumption = consumption_watts
-                else:
-                    accumulated_consumption += consumption_watts
-                    
-            # Add the final host accumulated point
-            if current_window_start is not None and accumulated_consumption > 0:
-                dt = self._convert_to_eet(current_window_start)
-                processed_data.append((current_window_start, accumulated_consumption, dt))
+                # Convert consumption from microWatts to Watts and timestamps from nanoseconds to milliseconds
+                df = self._aligned_windows(host_timestamps_ns // NS_PER_MS, host_consumption / 1_000_000.0, window_size_ms)
                 
-            # Convert host processed data to DataFrame and return
-            if not processed_data:
-                print("WARNING: No processed data generated for host. Returning empty DataFrame.") # DEBUG
+            # Return the host processed data
+            if df.empty:
                 return pd.DataFrame(columns=['timestamp', 'consumption', 'datetime'])
-            else:
-                df = pd.DataFrame(processed_data, columns=['timestamp', 'consumption', 'datetime'])
-                print(f"DEBUG: Generated DataFrame for 'host' with {len(df)} rows.") # DEBUG
-                return df
+            return df
         # --- End Host Energy Processing Logic ---
 
-        # --- Container Energy Processing Logic (existing code) ---
-        # Iterate through host intervals (each element in the top-level list)
-        for host_interval in data_source:
-            consumers = host_interval.get("consumers", [])
-            target_consumer_found_in_interval = False
-            consumption_in_interval = 0.0 # Accumulate consumption for this interval
-            interval_timestamp = None # Timestamp for this interval
-
-            # Iterate through consumers within the interval
-            for consumer in consumers:
-                container_info = consumer.get("container")
-                consumption = consumer.get("consumption", 0.0)
-                # Get the timestamp from the consumer entry (in seconds)
-                timestamp = consumer.get("timestamp") 
-                if timestamp is not None:
-                    interval_timestamp = timestamp # Use the consumer timestamp for the interval
-                
-                # Basic consumer info for debug log
-                consumer_debug = {
-                    "pid": consumer.get("pid"),
-                    "exe": consumer.get("exe"),
-                    "cmdline": consumer.get("cmdline"),
-                    "consumption": consumption,
-                    "timestamp": timestamp,
-                    "container": container_info
-                }
+        # --- Container Energy Processing Logic ---
+        # Read once: the Diagnostics menu toggles the flag on the Tk thread while this runs on the plot worker
+        diagnostics_enabled = self.diagnostics.enabled
 
-                # Skip entries without necessary data (consumption/timestamp)
-                if consumption is None or timestamp is None:
-                    consumer_debug["reason_skipped"] = "Missing consumption or timestamp"
-                    debug_log["skipped_consumers"].append(consumer_debug)
-                    continue
-                    
-                # --- Target Filtering Logic --- (Modified)
-                is_target = False
-                if target_type == "api":
-                    # Check if the full container ID starts with the stored short ID
-                    if container_info and target_api_id and container_info.get("id", "").startswith(target_api_id):
-                        is_target = True
-                elif target_type == "db":
-                     # Check if the full container ID starts with the stored short ID
-                    if container_info and target_db_id and container_info.get("id", "").startswith(target_db_id):
-                        is_target = True
-                elif target_type == "java":
-                    # Check executable name (case-insensitive)
-                    exe_path = consumer.get("exe", "")
-                    if exe_path and "java" in exe_path.lower():
-                        is_target = True
-                elif target_type == "postgres":
-                    # Check executable name (case-insensitive)
-                    exe_path = consumer.get("exe", "")
-                    if exe_path and "postgres" in exe_path.lower():
-                        is_target = True
-                # --- End Target Filtering ---
-
-                if is_target:
-                    target_consumer_found_in_interval = True
-                    consumption_in_interval += consumption # Accumulate for all matching consumers in interval
-                    
-                    # Log processed consumer (only need basic info here)
-                    consumer_debug["processed"] = True
-                    debug_log["processed_consumer_entries"].append(consumer_debug)
-                else:
-                    # Log skipped consumer if it wasn't the target
-                    consumer_debug["reason_skipped"] = f"Not the target ({target_type}) container/process"
-                    debug_log["skipped_consumers"].append(consumer_debug)
+        # Rolled up from the pre-aggregated levels when the window size allows it
+        # (not with diagnostics enabled, whose counters describe the pass over the consumer samples)
+        df = None
+        if not diagnostics_enabled:
+            df = self._pyramid_windows(data_source, target_type, window_size_ms)
+        
+        if df is None:
+            target_mask = self._target_mask(data_source, target_type)
 
-            # --- Apply Windowing Logic (Moved outside consumer loop) ---
-            if target_consumer_found_in_interval and interval_timestamp is not None:
-                # Convert accumulated consumption from microWatts to Watts
-                consumption_watts = consumption_in_interval / 1_000_000.0
-                
-                # Convert timestamp from seconds to milliseconds
-                milliseconds = int(interval_timestamp * 1000)
-                
-                if current_window_start is None or milliseconds >= current_window_start + window_size_ms:
-                    # If a window exists and has data, add it before starting a new one
-                    if current_window_start is not None and accumulated_consumption > 0:
-                         dt = self._convert_to_eet(current_window_start)
-                         processed_data.append((current_window_start, accumulated_consumption, dt))
-                    # Start a new window, aligned to window size
-                    current_window_start = milliseconds - (milliseconds % window_size_ms) 
-                    accumulated_consumption = consumption_watts
-                else:
-                    # Add to the current window
-                    accumulated_consumption += consumption_watts
-            elif not target_consumer_found_in_interval:
-                 debug_log["intervals_without_target"] += 1
-                 # print(f"DEBUG: Target type '{target_type}' not found in interval with host timestamp {host_interval.get('host',{}).get('timestamp')}")
-                
-        # Add the final accumulated point if it exists
-        if current_window_start is not None and accumulated_consumption > 0:
-            dt = self._convert_to_eet(current_window_start)
-            processed_data.append((current_window_start, accumulated_consumption, dt))
-            
-        # Convert processed data to DataFrame
-        if not processed_data:
-            print(f"WARNING: No processed data generated for target_type='{target_type}'. Returning empty DataFrame.") # DEBUG
+            # Sum the matching consumers per host interval; each interval is stamped with its last consumer timestamp
+            interval_timestamps_ns, interval_consumption = data_source.interval_totals(target_mask)
+
+            # --- Apply Windowing Logic ---
+            # Convert accumulated consumption from microWatts to Watts and timestamps from nanoseconds to milliseconds
+            df = self._aligned_windows(interval_timestamps_ns // NS_PER_MS, interval_consumption / 1_000_000.0, window_size_ms)
+        windows_created = len(df)
+            
+        if df.empty:
             df = pd.DataFrame(columns=['timestamp', 'consumption', 'datetime'])
+
+        # --- Diagnostics (opt-in, see diagnostics.py) ---
+        if diagnostics_enabled:
+            self._record_energy_diagnostics(data_source, target_type, target_mask, window_size_ms,
+                                            len(data_source) - len(interval_timestamps_ns), windows_created)
+
+        return df
+    
+    def _target_mask(self, data_source, target_type):
+        """Boolean mask of the consumer samples of a target ("api"/"db" container, "java"/"postgres" process)"""
+        if target_type == "api":
+            # Check if the full container ID starts with the stored short ID
+            return data_source.container_mask(self.api_container_id)
+        elif target_type == "db":
+            # Check if the full container ID starts with the stored short ID
+            return data_source.container_mask(self.db_container_id)
+        elif target_type == "java":
+            # Executable name matched case-insensitively at load time
+            return data_source.category_mask(CATEGORY_JAVA)
+        elif target_type == "postgres":
+            return data_source.category_mask(CATEGORY_POSTGRES)
+        return np.zeros(len(data_source.timestamps_ns), dtype=bool)
+    
+    def _target_interval_series(self, store, target_type):
+        """Per-interval consumption of a target over a whole loaded store
+        
+        Args:
+            store: EnergyStore as loaded from the results file
+            target_type: "host", or a target type accepted by _target_mask
+            
+        Returns:
+            (rows, timestamps_ns, watts): the host intervals with consumption of the target,
+            their timestamps and the consumption in Watts
+        """
+        if target_type == "host":
+            rows = np.flatnonzero(~np.isnan(store.host_consumption))
+            timestamps_ns, consumption = store.host_timestamps_ns[rows], store.host_consumption[rows]
         else:
-            # Create DataFrame from the processed list which now includes datetime
-            df = pd.DataFrame(processed_data, columns=['timestamp', 'consumption', 'datetime'])
-            print(f"DEBUG: Generated DataFrame for '{target_type}' with {len(df)} rows.") # DEBUG
-
-        # --- Debug Logging --- 
-        debug_log["summary"] = {
-            "processed_count": len(debug_log["processed_consumer_entries"]),
-            "skipped_count": len(debug_log["skipped_consumers"]),
-            "intervals_without_target": debug_log["intervals_without_target"],
-            "total_windows_created": len(processed_data)
+            rows, consumption = store.interval_row_totals(self._target_mask(store, target_type))
+            timestamps_ns = store.interval_timestamps_ns[rows]
+        return rows, timestamps_ns, consumption / 1_000_000.0
+    
+    def _build_energy_pyramid(self, store, target_type):
+        """Pre-aggregate the per-interval Watts of a target over a whole loaded store (see energy_pyramid.py)
+        
+        Returns:
+            EnergyPyramid, or None if the intervals are not in chronological order
+        """
+        rows, timestamps_ns, watts = self._target_interval_series(store, target_type)
+        return EnergyPyramid.from_series(rows, timestamps_ns // NS_PER_MS, watts)
+    
+    def _pyramid_windows(self, data_source, target_type, window_size_ms):
+        """Aligned windows of a target rolled up from the energy pyramid of the loaded store
+        
+        Args:
+            data_source: EnergyStore, the loaded store or a time range selected from it
+            target_type: "host", or a target type accepted by _target_mask
+            window_size_ms: Size of accumulation window in milliseconds
+            
+        Returns:
+            DataFrame like _aligned_windows, or None if the pyramid cannot answer the request
+            (window size not a multiple of a level, or intervals out of chronological order)
+        """
+        base_rows = data_source.base_rows()
+        if base_rows is None:
+            return None
+        store, first_row, end_row = base_rows
+        key = ("pyramid", target_type, self.api_container_id, self.db_container_id)
+        pyramid = store.derived(key, lambda loaded: self._build_energy_pyramid(loaded, target_type))
+        windows = pyramid.window_stats(window_size_ms, first_row, end_row) if pyramid is not None else None
+        if windows is None:
+            return None
+        return self._windows_frame(windows.starts_ms, windows.sums)
+    
+    def _get_cumulative_energy(self, section, target_type):
+        """Cumulative index of a target's consumption (Watts) over the loaded store, built once per load
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            target_type: "host", or a target type accepted by _target_mask
+            
+        Returns:
+            CumulativeEnergy, or None if there is no data for the target
+        """
+        store = self.energy_stores.get(section)
+        if store is None or (target_type == "api" and not self.api_container_id) or (
+                target_type == "db" and not self.db_container_id):
+            return None
+        
+        def build(loaded):
+            rows, _, watts = self._target_interval_series(loaded, target_type)
+            return loaded.cumulative(rows, watts)
+        
+        return store.derived(("cumulative", target_type, self.api_container_id, self.db_container_id), build)
+    
+    def _get_energy_total(self, section, target_type, start_time_ms=None, end_time_ms=None, window_size_ms=None):
+        """Total consumption (Watts) of a target, as the sum of its series from _get_energy_series
+        
+        Answered from the cumulative index, without windowing the samples.
+        
+        Args:
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            target_type: "host", or a target type accepted by _target_mask
+            start_time_ms: Start time in milliseconds (inclusive)
+            end_time_ms: End time in milliseconds (inclusive)
+            window_size_ms: If given, only count the windows that start within the time range
+                            (the series filtered to the range, as in the Energy Consumed view)
+            
+        Returns:
+            Total consumption in Watts
+        """
+        index = self._get_cumulative_energy(section, target_type)
+        if index is None:
+            return 0.0
+        if start_time_ms is None or end_time_ms is None:
+            return index.total()
+        
+        start_time_ns = int(start_time_ms * NS_PER_MS)
+        end_time_ns = int(end_time_ms * NS_PER_MS)
+        if window_size_ms:
+            # The first window starting within the range is the next multiple of the window size
+            first_window_ms = -(-start_time_ms // window_size_ms) * window_size_ms
+            return index.total(int(first_window_ms * NS_PER_MS), end_time_ns)
+        if not self.energy_stores[section].count_time_range(start_time_ns, end_time_ns):
+            # No entries in the range: the series show all data (same test as _filter_energy_data_by_time)
+            return index.total()
+        return index.total(start_time_ns, end_time_ns)
+    
+    def _get_run_energy_totals(self, experiment_id, section, target_type):
+        """Consumption (Watts) of a target during each run of an experiment
+        
+        Args:
+            experiment_id: ID of the experiment
+            section: Energy section of the results file ("api_server_energy" or "db_server_energy")
+            target_type: "host", or a target type accepted by _target_mask
+            
+        Returns:
+            Dictionary of run number to total consumption (empty without energy data)
+        """
+        run_boundaries = self._get_run_time_boundaries(experiment_id)
+        index = self._get_cumulative_energy(section, target_type)
+        if index is None or not run_boundaries:
+            return {}
+        run_numbers, starts_ms, ends_ms = zip(*run_boundaries)
+        totals = index.totals([int(start_ms * NS_PER_MS) for start_ms in starts_ms],
+                              [int(end_ms * NS_PER_MS) for end_ms in ends_ms])
+        return dict(zip(run_numbers, totals.tolist()))
+    
+    def _record_energy_diagnostics(self, data_source, target_type, target_mask, window_size_ms,
+                                   intervals_without_target, windows_created):
+        """Add the counts of one _process_energy_data call to the diagnostics
+        
+        Args:
+            data_source: EnergyStore that was processed
+            target_type: Target type that was processed
+            target_mask: Boolean mask of the consumer samples matching the target
+            window_size_ms: Size of accumulation window in milliseconds
+            intervals_without_target: Number of host intervals without a matching consumer
+            windows_created: Number of windows in the resulting series
+        """
+        missing_consumption = np.isnan(data_source.consumption)
+        processed = target_mask & ~missing_consumption
+        processed_count = int(np.count_nonzero(processed))
+        counts = {
+            "processed_count": processed_count,
+            "skipped_count": len(processed) - processed_count,
+            "missing_consumption": int(np.count_nonzero(missing_consumption)),
+            "intervals_without_target": intervals_without_target,
+            "total_windows_created": windows_created
         }
-        timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-        debug_log_filename = f"energy_processing_debug_{target_type}_{timestamp_str}.json"
-        try:
-            with open(debug_log_filename, 'w') as f:
-                json.dump(debug_log, f, indent=2, default=str) # Use default=str for non-serializable types if any
-            print(f"Debug log saved to {debug_log_filename}") # Changed status_var to print
-        except Exception as e:
-            print(f"Failed to save debug log: {str(e)}") # Changed status_var to print
-        # --- End Debug Logging ---
+        
+        samples = None
+        if self.diagnostics.wants_samples and len(processed):
+            # Evenly spaced sample of the consumer records instead of a dump of all of them
+            sample_count = min(self.diagnostics.sample_size, len(processed))
+            samples = []
+            for index in np.unique(np.linspace(0, len(processed) - 1, sample_count).astype(np.int64)).tolist():
+                consumer_debug = {
+                    "pid": int(data_source.pid[index]),
+                    "consumption": None if missing_consumption[index] else float(data_source.consumption[index]),
+                    "timestamp": data_source.timestamps_ns[index] / NS_PER_SECOND,
+                    "container": data_source.container_id(index)
+                }
+                if missing_consumption[index]:
+                    consumer_debug["reason_skipped"] = "Missing consumption"
+                elif processed[index]:
+                    consumer_debug["processed"] = True
+                else:
+                    consumer_debug["reason_skipped"] = f"Not the target ({target_type}) container/process"
+                samples.append(consumer_debug)
+        
+        self.diagnostics.record(target_type, counts, samples,
+                                details={"window_size_ms": window_size_ms, "total_host_intervals": len(data_source)})
+        if not post_to_main_thread(self._update_diagnostics_label):
+            self._update_diagnostics_label()
 
-        return df
+    def _aligned_windows(self, milliseconds, consumption_watts, window_size_ms):
+        """Accumulate consumption in windows aligned to the window size.
+        
+        Args:
+            milliseconds: Array of sample timestamps in milliseconds
+            consumption_watts: Array of consumption values in Watts
+            window_size_ms: Size of accumulation window in milliseconds
+            
+        Returns:
+            DataFrame with timestamp (window start in ms), consumption and datetime columns
+            for the windows with consumption
+        """
+        window_starts, window_consumption = window_sums(milliseconds, consumption_watts, window_size_ms, aligned=True)
+        return self._windows_frame(window_starts, window_consumption)
     
+    def _windows_frame(self, window_starts, window_consumption):
+        """DataFrame with timestamp, consumption and datetime columns for the windows with consumption"""
+        has_data = window_consumption > 0
+        return pd.DataFrame({
+            'timestamp': window_starts[has_data],
+            'consumption': window_consumption[has_data],
+            'datetime': to_display_datetimes(window_starts[has_data], self.display_timezone)
+        })
+
+    def _get_latency_data(self, runs):
+        """Collect the request latencies of the given runs
+        
+        Args:
+            runs: List of run dictionaries from benchmark_results
+            
+        Returns:
+            DataFrame with datetime (EET) and latency (ms) columns
+        """
+        timestamps_ms = []
+        latencies_ns = []
+        for run in runs:
+            if "latencies" in run:
+                for entry in run["latencies"]:
+                    if "latency_ns" in entry and "timestamp" in entry:
+                        timestamps_ms.append(entry["timestamp"])
+                        latencies_ns.append(entry["latency_ns"])
+        
+        # Convert all timestamps at once and ns to ms
+        return pd.DataFrame({
+            'datetime': to_display_datetimes(timestamps_ms, self.display_timezone),
+            'latency': np.asarray(latencies_ns, dtype=np.float64) / 1_000_000
+        })
+
     def _convert_to_eet(self, timestamp, is_milliseconds=True):
         """Convert timestamp to EET datetime object
         
@@ -2054,76 +2801,38 @@ class ExperimentVisualizer:
         Returns:
             List of tuples (run_number, start_time_ms, end_time_ms)
         """
-        if not self.data or "benchmark_results" not in self.data or "experiments" not in self.data["benchmark_results"]:
-            return []
-            
-        experiment = self.data["benchmark_results"]["experiments"].get(experiment_id, {})
-        if not experiment or "runs" not in experiment or not experiment["runs"]:
-            return []
-            
-        run_boundaries = []
-        for i, run in enumerate(experiment["runs"]):
-            # Get start time
-            start_time_ms = run.get("start_timestamp")
-            
-            # Get end time (either directly or calculated from start + elapsed)
-            end_time_ms = run.get("end_timestamp")
-            if end_time_ms is None and "start_timestamp" in run and "elapsed_time_ms" in run:
-                end_time_ms = run["start_timestamp"] + run["elapsed_time_ms"]
-            elif end_time_ms is None and "timestamp" in run:
-                # If only timestamp exists (likely the end time), try to estimate start
-                end_time_ms = run["timestamp"]
-                if "elapsed_time_ms" in run:
-                    start_time_ms = end_time_ms - run["elapsed_time_ms"]
-            
-            # Only include if we have both start and end times
-            if start_time_ms is not None and end_time_ms is not None:
-                run_boundaries.append((i+1, start_time_ms, end_time_ms))
-        
-        return run_boundaries
+        return list(self._get_catalog().run_bounds.get(experiment_id, []))
 
     def get_all_experiments_time_boundaries(self):
         """
         Get the time boundaries that encompass all experiments in the data.
         Returns: (start_time_ms, end_time_ms) in milliseconds since epoch, or None if not available
         """
-        if not self.data or "benchmark_results" not in self.data or "experiments" not in self.data["benchmark_results"]:
+        catalog = self._get_catalog()
+        if not catalog.experiment_ids:
             return None, None
-            
-        experiments = self.data["benchmark_results"]["experiments"]
-        if not experiments:
-            return None, None
-            
-        all_start_times = []
-        all_end_times = []
-        
-        # Collect all timestamps from all experiments
-        for experiment_id, experiment_data in experiments.items():
-            start_time, end_time = self.get_experiment_time_boundaries(experiment_id)
-            if start_time is not None:
-                all_start_times.append(start_time)
-            if end_time is not None:
-                all_end_times.append(end_time)
-        
-        # Return the broadest range
-        if all_start_times and all_end_times:
-            return min(all_start_times), max(all_end_times)
-        
-        # Fallback to energy data if no experiment timestamps are available
-        api_energy_data = self.data.get("api_server_energy", [])
-        db_energy_data = self.data.get("db_server_energy", [])
+        return catalog.all_bounds
+
+    def _energy_time_extent_ms(self):
+        """
+        Get the time range covered by the loaded energy data.
         
-        energy_timestamps = []
-        for entry in api_energy_data + db_energy_data:
-            if "timestamp" in entry:
-                # Convert seconds to milliseconds
-                energy_timestamps.append(entry.get("timestamp", 0) * 1000)
+        Returns:
+            Tuple of (min_timestamp_ms, max_timestamp_ms), or None if there is no energy data
+        """
+        return self._get_catalog().energy_extent_ms
+
+    def _get_catalog(self):
+        """
+        Get the catalog of the loaded data, building it on first use after a change.
         
-        if energy_timestamps:
-            # Use the full range of energy data
-            return min(energy_timestamps), max(energy_timestamps)
-            
-        return None, None
+        Returns:
+            DatasetCatalog of self.data and self.energy_stores
+        """
+        if self._catalog is None:
+            # Boundaries, chronology and counts of the whole file, derived once
+            self._catalog = DatasetCatalog(self.data, self.energy_stores)
+        return self._catalog
 
     def _get_experiment_chronology(self):
         """
@@ -2132,24 +2841,7 @@ class ExperimentVisualizer:
         Returns:
             List of tuples (experiment_id, start_time_ms, end_time_ms) sorted by start time
         """
-        if not self.data or "benchmark_results" not in self.data or "experiments" not in self.data["benchmark_results"]:
-            return []
-            
-        experiments = self.data["benchmark_results"]["experiments"]
-        if not experiments:
-            return []
-        
-        # Collect time boundaries for each experiment
-        experiment_times = []
-        for experiment_id, experiment_data in experiments.items():
-            start_time, end_time = self.get_experiment_time_boundaries(experiment_id)
-            if start_time is not None and end_time is not None:
-                experiment_times.append((experiment_id, start_time, end_time))
-        
-        # Sort experiments by start time
-        experiment_times.sort(key=lambda x: x[1])
-        
-        return experiment_times
+        return list(self._get_catalog().chronology)
 
     def _browse_mongodb_file(self, file_type):
         file_path = filedialog.askopenfilename(
@@ -2192,77 +2884,82 @@ class ExperimentVisualizer:
                 messagebox.showerror("Error", "No data found in the file")
                 return
             
-            # Validate required fields in each entry
-            required_fields = ["timestamp", "power", "target"]
-            invalid_entries = []
-            for i, entry in enumerate(data):
-                if not all(field in entry for field in required_fields):
-                    invalid_entries.append(i)
-            
-            if invalid_entries:
+            # Validate the entries while their fields are extracted, then group them by target and parse
+            # their timestamps (skipped entries are counted in the status bar by _install_mongodb_index)
+            sample_size = DEFAULT_SAMPLE_SIZE if self.mongodb_sampled_validation_var.get() else None
+            index = PowerAPIIndex.from_reports(data, sample_size=sample_size)
+            if not len(index):
                 messagebox.showerror("Error", 
-                    f"Invalid data format: Missing required fields in entries {invalid_entries[:5]}\n"
-                    f"Each entry must contain: {', '.join(required_fields)}")
+                    f"Invalid data format: None of the {len(data)} entries is a valid measurement\n"
+                    f"Each entry must contain: {', '.join(REQUIRED_FIELDS)}")
                 return
-            
-            # Get distinct targets
-            targets = {entry.get("target", "") for entry in data if entry.get("target")}
-            distinct_targets = list(targets)
+            distinct_targets = [target for target in index.targets if target]
             
             if not distinct_targets:
                 messagebox.showwarning("Warning", "No target services found in the data file")
                 return
             
-            # Update target service combobox
-            selected_target = None
-            if data_type == "api":
-                self.mongodb_api_target_combo['values'] = distinct_targets
-                if distinct_targets:
-                    # Try to auto-select based on container ID
-                    if self.api_container_id:
-                        for target in distinct_targets:
-                            if self.api_container_id in target:
-                                selected_target = target
-                                print(f"DEBUG: Auto-selected PowerAPI API target '{selected_target}' based on ID '{self.api_container_id}'") # DEBUG
-                                break
-                    # Fallback to first target if no match or ID not available
-                    if not selected_target:
-                        selected_target = distinct_targets[0]
-                    self.mongodb_api_target_combo.set(selected_target)
-            else: # data_type == "db"
-                self.mongodb_db_target_combo['values'] = distinct_targets
-                if distinct_targets:
-                    # Try to auto-select based on container ID
-                    if self.db_container_id:
-                        for target in distinct_targets:
-                            if self.db_container_id in target:
-                                selected_target = target
-                                print(f"DEBUG: Auto-selected PowerAPI DB target '{selected_target}' based on ID '{self.db_container_id}'") # DEBUG
-                                break
-                    # Fallback to first target if no match or ID not available
-                    if not selected_target:
-                        selected_target = distinct_targets[0]
-                    self.mongodb_db_target_combo.set(selected_target)
-            
-            # Store the raw data for later filtering
-            if data_type == "api":
-                self.mongodb_api_data = data
-            else:
-                self.mongodb_db_data = data
-            
-            self.status_var.set(f"Loaded PowerAPI {data_type.upper()} Server energy data with {len(distinct_targets)} target services")
-            self.force_plot_update()
+            self._install_mongodb_index(data_type, index)
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load PowerAPI data: {str(e)}")
             self.status_var.set(f"Error loading PowerAPI {data_type.upper()} Server data")
     
+    def _install_mongodb_index(self, data_type, index):
+        """Use a PowerAPIIndex as the PowerAPI data of the API or DB server and select one of its targets
+
+        Args:
+            data_type: "api" or "db"
+            index: PowerAPIIndex with at least one named target
+        """
+        distinct_targets = [target for target in index.targets if target]
+        
+        # Update target service combobox
+        selected_target = None
+        if data_type == "api":
+            self.mongodb_api_target_combo['values'] = distinct_targets
+            if distinct_targets:
+                # Try to auto-select based on container ID
+                if self.api_container_id:
+                    for target in distinct_targets:
+                        if self.api_container_id in target:
+                            selected_target = target
+                            break
+                # Fallback to first target if no match or ID not available
+                if not selected_target:
+                    selected_target = distinct_targets[0]
+                self.mongodb_api_target_combo.set(selected_target)
+        else: # data_type == "db"
+            self.mongodb_db_target_combo['values'] = distinct_targets
+            if distinct_targets:
+                # Try to auto-select based on container ID
+                if self.db_container_id:
+                    for target in distinct_targets:
+                        if self.db_container_id in target:
+                            selected_target = target
+                            break
+                # Fallback to first target if no match or ID not available
+                if not selected_target:
+                    selected_target = distinct_targets[0]
+                self.mongodb_db_target_combo.set(selected_target)
+
+        # Store the index for later filtering
+        if data_type == "api":
+            self.mongodb_api_data = index
+        else:
+            self.mongodb_db_data = index
+        self.series_cache.clear()
+
+        skipped = f" ({index.malformed} malformed entries skipped)" if index.malformed else ""
+        self.status_var.set(f"Loaded PowerAPI {data_type.upper()} Server energy data with {len(distinct_targets)} target services{skipped}")
+        self.force_plot_update()
+    
     def _get_filtered_mongodb_data(self, data, target_service, start_time_ms=None, end_time_ms=None):
         """
         Filters PowerAPI energy data for a specific target service and returns a pandas DataFrame
         
         Args:
-            data: PowerAPI energy data
+            data: PowerAPIIndex of the PowerAPI energy data
             target_service: Service name to filter by
             start_time_ms: Start time in milliseconds (inclusive)
             end_time_ms: End time in milliseconds (inclusive)
@@ -2272,40 +2969,49 @@ class ExperimentVisualizer:
         """
         if not data or not target_service:
             return None
-            
-        # Extract relevant data for the target service
-        filtered_data = [
-            {
-                "timestamp": entry["timestamp"]["$date"],
-                "power": entry["power"]  # Already in Watts, no conversion needed
-            }
-            for entry in data if entry.get("target") == target_service
-        ]
-        
-        if not filtered_data:
-            return None
-            
-        # Convert to DataFrame and parse timestamps
-        df = pd.DataFrame(filtered_data)
-        # PowerAPI timestamps are in ISO8601 format strings, not seconds
-        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', utc=True)
-        df.sort_values('timestamp', inplace=True)
         
         # Filter by time boundaries if provided
+        start_ns = end_ns = None
         if start_time_ms is not None and end_time_ms is not None:
-            # Convert millisecond timestamps to pandas datetime objects
-            start_time = pd.to_datetime(start_time_ms, unit='ms', utc=True)
-            end_time = pd.to_datetime(end_time_ms, unit='ms', utc=True)
-            
-            # Apply the time filter
-            df = df[(df['timestamp'] >= start_time) & (df['timestamp'] <= end_time)]
+            start_ns = pd.to_datetime(start_time_ms, unit='ms', utc=True).value
+            end_ns = pd.to_datetime(end_time_ms, unit='ms', utc=True).value
+        timestamps_ns, power = data.select(target_service, start_ns, end_ns)
+        
+        if not len(timestamps_ns):
+            if start_ns is not None and target_service in data:
+                self._set_status(f"No PowerAPI data found within the experiment time range")
+            return None
+        
+        # Power is already in Watts, no conversion needed
+        return pd.DataFrame({
+            "timestamp": pd.to_datetime(timestamps_ns, unit='ns', utc=True),
+            "power": power,
+        })
+
+    def _get_mongodb_series(self, data_type, target_service, window_size_ms, start_time_ms=None, end_time_ms=None):
+        """Get the windowed PowerAPI series of a target service, reusing earlier results
+        
+        Args:
+            data_type: Which PowerAPI file to use ("api" or "db")
+            target_service: Service name to filter by
+            window_size_ms: Size of accumulation window in milliseconds
+            start_time_ms: Start time in milliseconds (inclusive)
+            end_time_ms: End time in milliseconds (inclusive)
             
-            # If no data remains after filtering, return None
-            if df.empty:
-                self.status_var.set(f"No PowerAPI data found within the experiment time range")
+        Returns:
+            DataFrame with processed data, or None if there is no data for the target and time range
+        """
+        def compute():
+            data = self.mongodb_api_data if data_type == "api" else self.mongodb_db_data
+            df = self._get_filtered_mongodb_data(data, target_service, start_time_ms, end_time_ms)
+            if df is None:
                 return None
-                
-        return df
+            return self._process_mongodb_data(df, window_size_ms)
+        
+        key = (f"powerapi_{data_type}", target_service, window_size_ms, start_time_ms, end_time_ms)
+        processed_df = self.series_cache.get_or_compute(key, compute)
+        # Shallow copy so columns added while plotting do not end up in the cache
+        return processed_df.copy(deep=False) if processed_df is not None else None
 
     # Add a new function to process MongoDB data with windowing
     def _process_mongodb_data(self, df, window_size_ms):
@@ -2321,39 +3027,21 @@ class ExperimentVisualizer:
         if df is None or df.empty:
             return pd.DataFrame(columns=['timestamp', 'power', 'datetime'])
             
-        # Initialize variables for accumulation
-        processed_data = []
         # Convert timestamps to milliseconds for consistent handling
         df['timestamp_ms'] = df['timestamp'].astype(int) // 10**6  # Convert nanoseconds to milliseconds
         
         # Sort by timestamp
         df = df.sort_values('timestamp_ms')
         
-        # Apply windowing
-        current_window_start = None
-        accumulated_power = 0.0
-        
-        for _, row in df.iterrows():
-            milliseconds = row['timestamp_ms']
-            power = row['power']
-            
-            if current_window_start is None or milliseconds >= current_window_start + window_size_ms:
-                if current_window_start is not None:
-                    # Create datetime from milliseconds
-                    dt = pd.to_datetime(current_window_start, unit='ms', utc=True)
-                    processed_data.append((current_window_start, accumulated_power, dt))
-                current_window_start = milliseconds
-                accumulated_power = power
-            else:
-                accumulated_power += power
-        
-        # Add final point
-        if current_window_start is not None:
-            dt = pd.to_datetime(current_window_start, unit='ms', utc=True)
-            processed_data.append((current_window_start, accumulated_power, dt))
+        # Apply windowing: each window opens at its first sample (same engine as the scaphandre data)
+        window_starts, window_power = window_sums(df['timestamp_ms'].to_numpy(), df['power'].to_numpy(), window_size_ms)
         
-        # Convert processed data to DataFrame
-        result_df = pd.DataFrame(processed_data, columns=['timestamp_ms', 'power', 'datetime'])
+        # Convert processed data to DataFrame, creating all window datetimes in one call
+        result_df = pd.DataFrame({
+            'timestamp_ms': window_starts,
+            'power': window_power,
+            'datetime': pd.to_datetime(window_starts, unit='ms', utc=True)
+        })
         
         return result_df
 
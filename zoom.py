@@ -0,0 +1,182 @@
+"""
+Zoom-aware re-aggregation
+-------------------------
+The toolbar's zoom and pan only magnify the series that were windowed for
+the whole plot, so zooming into a two second spike showed a handful of
+coarse windows.  ZoomRefresher listens to ``xlim_changed`` on the plotted
+axes and, once the view settles, re-queries the visible time range of each
+tracked series at a window size matched to the zoom level (about one window
+per horizontal pixel, never coarser than the window size chosen in the
+control bar).  The queries run on a background worker and are served from the
+in-memory energy index and the series cache; only the data of the existing
+artists is replaced, so the x range of the view is left alone.  The series
+are sums per window, so a finer window is scaled up to the window size of the
+unzoomed plot and the y values keep their meaning; the y axis is rescaled to
+the new data unless it was set by the zoom.  A visible range without samples
+shows no data.  Returning to the original view (Home) restores the original
+series.
+"""
+
+import numpy as np
+import matplotlib.dates as mdates
+
+from background import BackgroundWorker
+
+DEFAULT_DELAY_MS = 200
+
+
+def zoom_window_ms(span_ms, width_px, window_size_ms):
+    """Window size for a visible span: about one window per pixel, rounded down to 1/2/5 x 10^k ms.
+
+    Args:
+        span_ms: Visible time span in milliseconds
+        width_px: Width of the axes in pixels
+        window_size_ms: Window size of the unzoomed plot (upper bound)
+
+    Returns:
+        Window size in milliseconds (at least 1)
+    """
+    target = span_ms / max(width_px, 1)
+    if target >= window_size_ms:
+        return window_size_ms
+    if target < 1:
+        return 1
+    magnitude = 10 ** int(np.floor(np.log10(target)))
+    for step in (5, 2, 1):
+        if step * magnitude <= target:
+            return int(step * magnitude)
+    return int(magnitude)
+
+
+class ZoomRefresher:
+    """Re-aggregates tracked series for the visible x range after zoom or pan.
+
+    Args:
+        root: Tk root window used to debounce view changes
+        plot_artists: FigureArtists used to decimate the new series
+        canvas: Figure canvas redrawn after an update
+        set_status: Callable showing a status message
+        delay_ms: Quiet period after the last view change before re-querying
+    """
+
+    def __init__(self, root, plot_artists, canvas, set_status, delay_ms=DEFAULT_DELAY_MS):
+        self.root = root
+        self.worker = BackgroundWorker(root, "zoom-data")
+        self.plot_artists = plot_artists
+        self.canvas = canvas
+        self.set_status = set_status
+        self.delay_ms = delay_ms
+        self._tracked = {}
+        self._callbacks = {}
+        self._home_xlim = {}
+        self._pending = {}
+        self._active = False
+        self._window_size_ms = None
+        self._start_time_ms = None
+        self._end_time_ms = None
+
+    def reset(self):
+        """Stop tracking (called when a new plot is drawn)"""
+        self._active = False
+        self.worker.cancel()
+        for ax, cid in self._callbacks.items():
+            ax.callbacks.disconnect(cid)
+        for after_id in self._pending.values():
+            self.root.after_cancel(after_id)
+        self._tracked = {}
+        self._callbacks = {}
+        self._home_xlim = {}
+        self._pending = {}
+
+    def track(self, ax, artist, fetch, column):
+        """Re-query artist's series when the view of ax changes.
+
+        Args:
+            ax: Axes the artist is drawn on
+            artist: Line2D or PathCollection showing the series
+            fetch: Callable (window_size_ms, start_time_ms, end_time_ms) -> DataFrame
+                   with a 'datetime' column, or None; empty when the range holds no samples
+            column: DataFrame column holding the y values (sums per window)
+        """
+        ax = getattr(ax, "ax", ax)  # Unwrap plot_artists axes
+        self._tracked.setdefault(ax, []).append((artist, fetch, column))
+        if ax not in self._callbacks:
+            self._callbacks[ax] = ax.callbacks.connect("xlim_changed", self._on_xlim_changed)
+
+    def activate(self, window_size_ms, start_time_ms, end_time_ms):
+        """Start reacting to view changes; call after the plot has been drawn.
+
+        Args:
+            window_size_ms: Window size of the drawn series
+            start_time_ms: Start of the drawn time range (None for all data)
+            end_time_ms: End of the drawn time range (None for all data)
+        """
+        self._window_size_ms = window_size_ms
+        self._start_time_ms = start_time_ms
+        self._end_time_ms = end_time_ms
+        self._home_xlim = {ax: tuple(ax.get_xlim()) for ax in self._tracked}
+        self._active = bool(self._tracked)
+
+    def _on_xlim_changed(self, ax):
+        if not self._active or ax not in self._tracked:
+            return
+        if ax in self._pending:
+            self.root.after_cancel(self._pending[ax])
+        self._pending[ax] = self.root.after(self.delay_ms, self._refresh, ax)
+
+    def _refresh(self, ax):
+        self._pending.pop(ax, None)
+        if not self._active:
+            return
+
+        xlim = tuple(ax.get_xlim())
+        if np.allclose(xlim, self._home_xlim.get(ax, ()), rtol=0, atol=1e-9):
+            window_size_ms, start_time_ms, end_time_ms = self._window_size_ms, self._start_time_ms, self._end_time_ms
+        else:
+            start_time_ms = mdates.num2date(xlim[0]).timestamp() * 1000
+            end_time_ms = mdates.num2date(xlim[1]).timestamp() * 1000
+            if self._start_time_ms is not None and self._end_time_ms is not None:
+                start_time_ms = max(start_time_ms, self._start_time_ms)
+                end_time_ms = min(end_time_ms, self._end_time_ms)
+            if end_time_ms <= start_time_ms:
+                return
+            window_size_ms = zoom_window_ms(end_time_ms - start_time_ms, ax.get_window_extent().width,
+                                            self._window_size_ms)
+        series = list(self._tracked[ax])
+
+        def query(job):
+            results = []
+            for artist, fetch, column in series:
+                job.check()
+                results.append((artist, fetch(window_size_ms, start_time_ms, end_time_ms), column))
+            return results
+
+        self.worker.submit(query, on_done=lambda results: self._apply(ax, results, window_size_ms))
+
+    def _apply(self, ax, results, window_size_ms):
+        if not self._active or ax not in self._tracked:
+            return
+        # Sums over finer windows, in the units of the unzoomed plot's windows
+        scale = self._window_size_ms / window_size_ms
+        point_offsets = []
+        for artist, df, column in results:
+            if df is None or df.empty:
+                x, y = [], []
+            else:
+                x, y = self.plot_artists.decimate(ax, df['datetime'], df[column])
+            y = np.asarray(y, dtype=float) * scale
+            if hasattr(artist, "set_offsets"):
+                offsets = np.column_stack([np.asarray(ax.convert_xunits(np.asarray(x)), dtype=float), y])
+                artist.set_offsets(offsets.reshape(-1, 2))
+                point_offsets.append(offsets.reshape(-1, 2))
+            else:
+                artist.set_data(np.asarray(x), y)
+
+        # relim() only looks at lines and patches, the scatter points are added separately
+        ax.relim()
+        for offsets in point_offsets:
+            if len(offsets):
+                ax.update_datalim(offsets)
+        ax.autoscale_view(scalex=False)
+        self.canvas.draw_idle()
+        self.set_status(f"Re-aggregated {len(results)} series for the visible range at {window_size_ms} ms windows")